@@ -1,5 +1,5 @@
 from django.contrib import admin
-from .models import Tag, Note, Task
+from .models import Tag, Note, Task, PomodoroSession, Reminder
 
 # Register your models here.
 
@@ -21,4 +21,14 @@ class TaskAdmin(admin.ModelAdmin):
     list_display    = ["name", "author", "due_date", "completed"]
     list_filter     = ["author", "completed", "tags"]
     search_fields   = ["name", "description"]
-    filter_horizontal = ["tags"]
\ No newline at end of file
+    filter_horizontal = ["tags"]
+
+@admin.register(PomodoroSession)
+class PomodoroSessionAdmin(admin.ModelAdmin):
+    list_display    = ["task", "author", "started_at", "duration"]
+    list_filter     = ["author"]
+
+@admin.register(Reminder)
+class ReminderAdmin(admin.ModelAdmin):
+    list_display    = ["task", "author", "due_date", "created_at", "delivered_at"]
+    list_filter     = ["author"]
@@ -1,6 +1,14 @@
 from django.apps import AppConfig
+from django.db.models.signals import post_migrate
 
 
 class ApiConfig(AppConfig):
     default_auto_field = 'django.db.models.BigAutoField'
     name = 'api'
+
+    def ready(self):
+        from . import signals  # noqa: F401
+        from .search import ensure_search_schema
+        from .storage import ensure_note_compression
+        post_migrate.connect(ensure_search_schema, sender=self)
+        post_migrate.connect(ensure_note_compression, sender=self)
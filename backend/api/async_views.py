@@ -0,0 +1,168 @@
+import asyncio
+
+from asgiref.sync import sync_to_async
+from django.db import close_old_connections
+from django.http import JsonResponse
+from django.utils.cache import get_conditional_response
+from django.utils.http import http_date, quote_etag
+from django.views.decorators.csrf import csrf_exempt
+from rest_framework.exceptions import APIException, NotAuthenticated
+from rest_framework.request import Request
+from rest_framework.utils.encoders import JSONEncoder
+
+from .authentication import CookieJWTAuthentication
+from .conditional import change_etag, get_change_marker, next_due_boundary
+from .serializers import FlatRowSerializer, TaskSerializer
+from .stats import summarize_task_stats, tag_stats, task_counts
+from .views import CalendarView, TaskStatsView, TaskViewSet, calendar_notes, calendar_tasks, calendar_window, with_facets
+
+authentication = CookieJWTAuthentication()
+
+# Django's async ORM runs every query on one thread-sensitive executor, so
+# gathering its coroutines would still issue them one at a time. Independent
+# queries instead run on their own pool threads and database connections.
+def run_query(func, *args):
+    def call():
+        try:
+            return func(*args)
+        finally:
+            close_old_connections()
+    return sync_to_async(call, thread_sensitive=False)()
+
+def json_response(data, status=200):
+    # Same bytes as DRF's JSONRenderer.
+    return JsonResponse(
+        data,
+        status=status,
+        safe=False,
+        encoder=JSONEncoder,
+        json_dumps_params={"ensure_ascii": False, "separators": (",", ":")},
+    )
+
+def exception_response(exc):
+    data = exc.detail if isinstance(exc.detail, (list, dict)) else {"detail": exc.detail}
+    response = json_response(data, status=exc.status_code)
+    if isinstance(exc, NotAuthenticated):
+        response["WWW-Authenticate"] = authentication.authenticate_header(request=None)
+    return response
+
+async def authenticate(request):
+    result = await run_query(authentication.authenticate, request)
+    if result is None:
+        raise NotAuthenticated()
+    request.user = result[0]
+    return request.user
+
+async def conditional_response(request, time_sensitive=False):
+    # Mirrors conditional_on_changes for async views: returns a 304/412
+    # response or None, plus the validators to put on the response.
+    if time_sensitive:
+        marker, next_due = await asyncio.gather(
+            run_query(get_change_marker, request),
+            run_query(next_due_boundary, request.user),
+        )
+        last_modified = None
+    else:
+        marker, next_due = await run_query(get_change_marker, request), None
+        last_modified = marker.updated_at
+
+    etag = quote_etag(change_etag(request, marker, next_due))
+    timestamp = int(last_modified.timestamp()) if last_modified else None
+    response = get_conditional_response(request, etag=etag, last_modified=timestamp)
+    return response, etag, timestamp
+
+def async_api_view(time_sensitive=None):
+    # Authenticates like the DRF views, turns API exceptions into their usual
+    # responses and, unless time_sensitive is None, answers conditional GETs.
+    def decorator(view):
+        async def wrapper(request, *args, **kwargs):
+            try:
+                await authenticate(request)
+                if time_sensitive is None:
+                    return await view(request, *args, **kwargs)
+
+                # Like Django's condition(), a 304 carries the validators too.
+                response, etag, timestamp = await conditional_response(request, time_sensitive)
+                if response is None:
+                    response = await view(request, *args, **kwargs)
+                if response.status_code in (200, 304):
+                    response["ETag"] = etag
+                    if timestamp is not None:
+                        response["Last-Modified"] = http_date(timestamp)
+                return response
+            except APIException as exc:
+                return exception_response(exc)
+        return wrapper
+    return decorator
+
+@async_api_view(time_sensitive=True)
+async def task_stats(request):
+    counts, tags = await asyncio.gather(
+        run_query(task_counts, request.user),
+        run_query(tag_stats, request.user),
+    )
+    return json_response(summarize_task_stats(counts, tags))
+
+@async_api_view(time_sensitive=False)
+async def calendar(request):
+    try:
+        start, end = calendar_window(request.GET)
+    except ValueError as e:
+        return json_response({"error": str(e)}, status=400)
+
+    tasks, notes = await asyncio.gather(
+        run_query(calendar_tasks, request.user, start, end),
+        run_query(calendar_notes, request.user, start, end),
+    )
+    return json_response({"tasks": tasks, "notes": notes})
+
+def task_list_view(request):
+    view = TaskViewSet(action="list", args=(), kwargs={}, format_kwarg=None, request=Request(request))
+    view.request.user = request.user
+    return view
+
+def filtered_task_rows(view, serializer):
+    return serializer.values(view.filter_queryset(view.get_queryset()))
+
+async def task_list_data(request, view, serializer, rows):
+    if {"cursor", "page_size"} & set(request.GET):
+        page = await run_query(view.paginate_queryset, rows)
+        data = await run_query(serializer.serialize, page)
+        return view.paginator.get_paginated_response(data).data
+
+    if not serializer.tag_mode or serializer.tag_array:
+        return await run_query(serializer.serialize, rows)
+
+    # The tags are joined against the same filter as a subquery, so both
+    # queries run at once instead of the tags waiting for the row ids.
+    page, links = await asyncio.gather(
+        run_query(list, rows),
+        run_query(serializer.tag_links, rows.values("id")),
+    )
+    return await run_query(serializer.serialize, page, links)
+
+@async_api_view(time_sensitive=True)
+async def task_list(request):
+    view = task_list_view(request)
+    serializer = FlatRowSerializer.from_request(TaskSerializer, view.request)
+    rows = await run_query(filtered_task_rows, view, serializer)
+    data, facets = await asyncio.gather(
+        task_list_data(request, view, serializer, rows),
+        run_query(view.get_facets, rows),
+    )
+    return json_response(with_facets(data, facets))
+
+task_list_sync = TaskViewSet.as_view({"get": "list", "post": "create"}, basename="task")
+
+# DRF's as_view() exempts its views from CsrfViewMiddleware; POSTs handed on
+# to the viewset from here need the same, or they are rejected with a 403.
+@csrf_exempt
+async def tasks(request):
+    # Only GET is served asynchronously; creating tasks stays on the viewset.
+    if request.method == "GET":
+        return await task_list(request)
+    return await sync_to_async(task_list_sync)(request)
+
+task_stats.sync_view = TaskStatsView.as_view()
+calendar.sync_view = CalendarView.as_view()
+tasks.sync_view = task_list_sync
@@ -1,5 +1,39 @@
+import time
+from django.conf import settings
+from django.contrib.auth import get_user_model
+from django.core.cache import cache
+from django.utils.functional import SimpleLazyObject, empty
 from rest_framework_simplejwt.authentication import JWTAuthentication
 from rest_framework_simplejwt.exceptions import InvalidToken, TokenError
+from rest_framework_simplejwt.settings import api_settings
+
+# Only what authentication and request.user consumers read is cached; other
+# fields (the password hash included) are left deferred and load on access.
+CACHED_USER_FIELDS = ("id", "username", "first_name", "last_name", "is_active", "is_staff", "is_superuser")
+
+
+def user_generation_key(user_id):
+    return f"auth:user:{user_id}:generation"
+
+def invalidate_cached_user(user_id):
+    # Every cached entry remembers the generation it was stored under, so
+    # moving the generation drops all of the user's cached tokens at once.
+    cache.set(user_generation_key(user_id), time.time_ns(), None)
+
+def loaded_user(request):
+    # request.user once something resolved it, else None. Middleware reading
+    # it after the view must not load the lazy session user itself: that is a
+    # query, and one the event loop can't run.
+    user = getattr(request, "user", None)
+    if isinstance(user, SimpleLazyObject) and user._wrapped is empty:
+        return None
+    return user
+
+def cached_user(data):
+    # from_db() takes the loaded values in model field order.
+    model = get_user_model()
+    fields = [field.attname for field in model._meta.concrete_fields if field.attname in data]
+    return model.from_db("default", fields, [data[field] for field in fields])
 
 class CookieJWTAuthentication(JWTAuthentication):
     def authenticate(self, request):
@@ -12,3 +46,25 @@ class CookieJWTAuthentication(JWTAuthentication):
             except (InvalidToken, TokenError):
                 return None
         return None
+
+    def get_user(self, validated_token):
+        timeout = getattr(settings, 'AUTH_USER_CACHE_TIMEOUT', 0)
+        user_id = validated_token.get(api_settings.USER_ID_CLAIM)
+        token_id = validated_token.get(api_settings.JTI_CLAIM)
+        if not timeout or user_id is None or token_id is None:
+            return super().get_user(validated_token)
+
+        user_key = f"auth:user:{user_id}:{token_id}"
+        generation_key = user_generation_key(user_id)
+        cached = cache.get_many([user_key, generation_key])
+        generation = cached.get(generation_key, 0)
+        entry = cached.get(user_key)
+        if entry is not None and entry[0] == generation:
+            return cached_user(entry[1])
+
+        from .replicas import use_primary
+
+        with use_primary():
+            user = super().get_user(validated_token)
+        cache.set(user_key, (generation, {field: getattr(user, field) for field in CACHED_USER_FIELDS}), timeout)
+        return user
@@ -0,0 +1,127 @@
+import json
+from io import BytesIO
+from urllib.parse import urlsplit
+
+from django.core.handlers.wsgi import WSGIRequest
+from django.db import transaction
+from django.urls import Resolver404, resolve
+from rest_framework.views import APIView
+
+MAX_BATCH_REQUESTS = 20
+BATCH_METHODS = ("GET", "POST", "PUT", "PATCH", "DELETE")
+FORWARDED_HEADERS = ("If-None-Match", "If-Modified-Since", "Accept")
+RETURNED_HEADERS = ("ETag", "Last-Modified", "Location")
+
+# Endpoints that set cookies, upload or stream files, or would recurse.
+UNBATCHABLE_URLS = {"batch", "login", "logout", "register", "token_refresh", "export", "import", "import-detail"}
+
+
+class BatchError(ValueError):
+    pass
+
+def parse_batch(data):
+    if not isinstance(data, dict) or not isinstance(data.get("requests"), list):
+        raise BatchError("requests must be a list")
+    items = data["requests"]
+    if not items:
+        raise BatchError("requests can't be empty")
+    if len(items) > MAX_BATCH_REQUESTS:
+        raise BatchError(f"A batch can't have more than {MAX_BATCH_REQUESTS} requests")
+
+    parsed = []
+    for index, item in enumerate(items):
+        if not isinstance(item, dict) or not isinstance(item.get("path"), str):
+            raise BatchError(f"Request {index}: path is required")
+        method = str(item.get("method", "GET")).upper()
+        if method not in BATCH_METHODS:
+            raise BatchError(f"Request {index}: method must be one of {', '.join(BATCH_METHODS)}")
+        headers = item.get("headers") or {}
+        if not isinstance(headers, dict):
+            raise BatchError(f"Request {index}: headers must be an object")
+        parsed.append({
+            "method": method,
+            "path": item["path"],
+            "body": item.get("body"),
+            "headers": {name: str(value) for name, value in headers.items() if name in FORWARDED_HEADERS},
+        })
+    return parsed, bool(data.get("atomic", False))
+
+def build_subrequest(request, item):
+    # A copy of the outer request's environment, so host, scheme and cookies
+    # carry over, with the sub-request's method, path, query and JSON body.
+    url = urlsplit(item["path"])
+    body = b"" if item["body"] is None else json.dumps(item["body"]).encode()
+    environ = {
+        key: value for key, value in request.META.items()
+        if not key.startswith("HTTP_IF_") and key not in ("CONTENT_TYPE", "CONTENT_LENGTH")
+    }
+    environ.update({
+        "REQUEST_METHOD": item["method"],
+        "PATH_INFO": url.path,
+        "QUERY_STRING": url.query,
+        "CONTENT_TYPE": "application/json",
+        "CONTENT_LENGTH": str(len(body)),
+        "wsgi.input": BytesIO(body),
+    })
+    environ.setdefault("wsgi.url_scheme", request.scheme)
+    for name, value in item["headers"].items():
+        environ["HTTP_" + name.upper().replace("-", "_")] = value
+
+    subrequest = WSGIRequest(environ)
+    # DRF picks these up instead of authenticating the sub-request again.
+    subrequest._force_auth_user = request.user
+    subrequest._force_auth_token = request.auth
+    return subrequest
+
+def response_body(response):
+    if hasattr(response, "data"):
+        return response.data
+    if not response.content:
+        return None
+    try:
+        return json.loads(response.content)
+    except ValueError:
+        return response.content.decode(errors="replace")
+
+def run_subrequest(request, item):
+    subrequest = build_subrequest(request, item)
+    try:
+        match = resolve(subrequest.path_info)
+    except Resolver404:
+        return {"status": 404, "body": {"detail": "Not found."}}
+    if match.url_name in UNBATCHABLE_URLS:
+        return {"status": 400, "body": {"detail": "This endpoint can't be batched."}}
+
+    # Async views run their queries on other threads; their sync twins keep
+    # the sub-request on this connection and inside the batch transaction.
+    view = getattr(match.func, "sync_view", match.func)
+    # Sub-requests skip the middleware stack, which only API views (with the
+    # user forced above) can do without.
+    if not issubclass(getattr(view, "cls", type(None)), APIView):
+        return {"status": 400, "body": {"detail": "Only API endpoints can be batched."}}
+    response = view(subrequest, *match.args, **match.kwargs)
+    if response.streaming:
+        return {"status": 400, "body": {"detail": "Streaming endpoints can't be batched."}}
+    result = {"status": response.status_code, "body": response_body(response)}
+    headers = {name: response[name] for name in RETURNED_HEADERS if response.has_header(name)}
+    if headers:
+        result["headers"] = headers
+    return result
+
+def run_batch(request, items, atomic=False):
+    # Sub-requests run in order on this thread, so they share its database
+    # connection. In atomic mode the first failure rolls everything back and
+    # the remaining requests are skipped.
+    if not atomic:
+        return [run_subrequest(request, item) for item in items], True
+
+    results = []
+    with transaction.atomic():
+        for item in items:
+            result = run_subrequest(request, item)
+            results.append(result)
+            if result["status"] >= 400:
+                transaction.set_rollback(True)
+                results.extend({"status": None, "body": None} for _ in items[len(results):])
+                return results, False
+    return results, True
@@ -0,0 +1,165 @@
+import random
+import time
+from datetime import timedelta
+from django.contrib.auth.models import User
+from django.db import connection
+from django.test.utils import CaptureQueriesContext
+from django.utils import timezone
+from rest_framework.test import APIClient
+from .models import Note, Tag, Task
+from .tagging import sync_tag_ids
+
+BENCHMARK_PASSWORD = "benchmark-password"
+
+# Query budgets per endpoint. They cover the change-marker lookup for
+# conditional GETs and the per-request auth lookup on a cold cache. Bulk
+# writes send 50 tasks and their budgets must not grow with that number; they
+# include the per-tag counter updates, which grow with neither.
+QUERY_BUDGETS = {
+    "calendar_month": 6,
+    "calendar_day": 6,
+    "stats": 5,
+    "tasks_list": 6,
+    "tasks_page": 6,
+    "tasks_completed": 6,
+    "tasks_tags": 6,
+    "tasks_tag_facets": 7,
+    "tasks_has_due_date": 6,
+    "tasks_overdue": 6,
+    "tasks_search": 6,
+    "bulk_complete": 6,
+    "bulk_uncomplete": 6,
+    "bulk_create": 15,
+    "bulk_update": 15,
+    "bulk_delete": 15,
+}
+
+
+def seed(users=1, tags=10, tasks=1000, notes=200, seed_value=0):
+    rng = random.Random(seed_value)
+    now = timezone.now()
+    words = ["plan", "review", "write", "call", "email", "report", "budget", "design", "fix", "meeting", "draft", "read"]
+    created = []
+
+    for index in range(users):
+        user = User.objects.create_user(username=f"benchmark-{index}", password=BENCHMARK_PASSWORD)
+        user_tags = Tag.objects.bulk_create([Tag(author=user, name=f"tag-{number}") for number in range(tags)])
+
+        task_objects = []
+        for number in range(tasks):
+            due = now + timedelta(days=rng.uniform(-60, 60)) if rng.random() < 0.8 else None
+            task_objects.append(Task(
+                author=user,
+                name=f"{rng.choice(words)} {rng.choice(words)} {number}",
+                description=" ".join(rng.choice(words) for _ in range(12)),
+                due_date=due,
+                completed=rng.random() < 0.4,
+            ))
+        task_objects = Task.objects.bulk_create(task_objects, batch_size=500)
+
+        note_objects = [
+            Note(author=user, name=f"note {number}", notes=" ".join(rng.choice(words) for _ in range(80)))
+            for number in range(notes)
+        ]
+        for note in note_objects:
+            note.update_summary()
+        note_objects = Note.objects.bulk_create(note_objects, batch_size=500)
+
+        for model, objects in ((Task, task_objects), (Note, note_objects)):
+            through = model.tags.through
+            owner = f"{model._meta.model_name}_id"
+            links = []
+            for obj in objects:
+                for tag in rng.sample(user_tags, min(len(user_tags), rng.randint(0, 3))):
+                    links.append(through(**{owner: obj.pk, "tag_id": tag.pk}))
+            through.objects.bulk_create(links, batch_size=500)
+        sync_tag_ids([task.pk for task in task_objects])
+
+        created.append(user)
+    return created
+
+def percentile(values, fraction):
+    ordered = sorted(values)
+    index = max(0, min(len(ordered) - 1, round(fraction * len(ordered) + 0.5) - 1))
+    return ordered[index]
+
+def login(user):
+    client = APIClient()
+    response = client.post("/api/login/", {"username": user.username, "password": BENCHMARK_PASSWORD}, format="json")
+    if response.status_code != 200:
+        raise RuntimeError(f"Could not log in as {user.username}: {response.status_code}")
+    return client
+
+def endpoint_cases(user):
+    now = timezone.localtime()
+    tag_id = Tag.objects.filter(author=user).values_list("id", flat=True).first()
+    task_ids = list(Task.objects.filter(author=user).order_by("id").values_list("id", flat=True)[:50])
+
+    def throwaway_tasks():
+        tasks = Task.objects.bulk_create([Task(author=user, name=f"throwaway {i}") for i in range(50)])
+        return {"task_ids": [task.pk for task in tasks]}
+
+    return [
+        ("calendar_month", "get", f"/api/calendar/?month={now.month}&year={now.year}", None),
+        ("calendar_day", "get", f"/api/calendar/?month={now.month}&year={now.year}&day={now.day}", None),
+        ("stats", "get", "/api/tasks/stats/", None),
+        ("tasks_list", "get", "/api/tasks/", None),
+        ("tasks_page", "get", "/api/tasks/?page_size=50", None),
+        ("tasks_completed", "get", "/api/tasks/?completed=false", None),
+        ("tasks_tags", "get", f"/api/tasks/?tags={tag_id}", None),
+        ("tasks_tag_facets", "get", f"/api/tasks/?tags={tag_id}&facets=tags&page_size=50", None),
+        ("tasks_has_due_date", "get", "/api/tasks/?has_due_date=true", None),
+        ("tasks_overdue", "get", "/api/tasks/?overdue=true", None),
+        ("tasks_search", "get", "/api/tasks/?search=rev", None),
+        ("bulk_create", "post", "/api/tasks/bulk_create/", lambda: {"tasks": [
+            {"name": f"bulk {i}", "due_date": now.isoformat(), "tag_ids": [tag_id] if i % 2 else []} for i in range(50)
+        ]}),
+        ("bulk_update", "post", "/api/tasks/bulk_update/", lambda: {"tasks": [
+            {"id": task_id, "description": f"updated {time.perf_counter_ns()}", "tag_ids": [tag_id]} for task_id in task_ids
+        ]}),
+        ("bulk_complete", "post", "/api/tasks/bulk_complete/", lambda: {"task_ids": task_ids}),
+        ("bulk_uncomplete", "post", "/api/tasks/bulk_uncomplete/", lambda: {"task_ids": task_ids}),
+        ("bulk_delete", "post", "/api/tasks/bulk_delete/", throwaway_tasks),
+    ]
+
+def run_benchmark(user, iterations=20, warmup=2, only=None):
+    client = login(user)
+    results = []
+    for name, method, path, payload in endpoint_cases(user):
+        if only and name not in only:
+            continue
+
+        timings = []
+        queries = []
+        statuses = set()
+        for iteration in range(warmup + iterations):
+            data = payload() if payload else None
+            with CaptureQueriesContext(connection) as captured:
+                start = time.perf_counter()
+                response = getattr(client, method)(path, data, format="json") if data is not None else getattr(client, method)(path)
+                elapsed = time.perf_counter() - start
+            if iteration < warmup:
+                continue
+            timings.append(elapsed * 1000)
+            queries.append(len(captured))
+            statuses.add(response.status_code)
+
+        budget = QUERY_BUDGETS.get(name)
+        failed = [code for code in statuses if not 200 <= code < 300]
+        results.append({
+            "endpoint": name,
+            "method": method.upper(),
+            "path": path,
+            "iterations": iterations,
+            "status_codes": sorted(statuses),
+            "p50_ms": round(percentile(timings, 0.50), 3),
+            "p95_ms": round(percentile(timings, 0.95), 3),
+            "p99_ms": round(percentile(timings, 0.99), 3),
+            "queries": max(queries),
+            "query_budget": budget,
+            "over_budget": budget is not None and max(queries) > budget,
+            # An endpoint that starts failing usually runs fewer queries, so
+            # errors must not pass as being within budget.
+            "failed": bool(failed),
+        })
+    return results
@@ -0,0 +1,71 @@
+import time
+from django.conf import settings
+from django.core.cache import cache
+from django.db.models import Q
+from .models import Tag
+
+BUILTIN_TAGS_KEY = "tags:builtin"
+
+
+def cache_is_shared():
+    return getattr(settings, "CACHE_SHARED", False)
+
+def tag_cache_timeout():
+    return getattr(settings, "TAG_CACHE_TIMEOUT", 300)
+
+def user_tags_key(user_id):
+    return f"tags:user:{user_id}"
+
+def generation_key(key):
+    return f"{key}:generation"
+
+def invalidate_tags(user_id=None):
+    # Entries remember the generation they were stored under, so moving the
+    # generation drops them. Only tag writes move it; task and note writes
+    # leave cached tags alone.
+    key = BUILTIN_TAGS_KEY if user_id is None else user_tags_key(user_id)
+    cache.set(generation_key(key), time.time_ns(), None)
+
+def serialize_tags(queryset):
+    from .serializers import FlatRowSerializer, TagSerializer
+
+    serializer = FlatRowSerializer(TagSerializer)
+    return serializer.serialize(serializer.values(queryset))
+
+def cached_tags(cached, key, queryset, missing):
+    generation = cached.get(generation_key(key))
+    if generation is None:
+        # Never cached, or evicted: start a generation no stored entry has.
+        generation = time.time_ns()
+        cache.add(generation_key(key), generation, None)
+    entry = cached.get(key)
+    if entry is not None and entry[0] == generation:
+        return entry[1]
+    # Read on the primary: a replica still missing the latest tag write would
+    # be cached under the generation that write started.
+    tags = serialize_tags(queryset.using("default"))
+    missing[key] = (generation, tags)
+    return tags
+
+def get_visible_tags(user):
+    # Invalidation has to reach every process, so with a per-process cache
+    # the tags are read straight from the database (one indexed query).
+    if not cache_is_shared():
+        return serialize_tags(Tag.objects.filter(Q(author=user) | Q(author__isnull=True)).order_by("is_builtin", "name"))
+
+    user_key = user_tags_key(user.pk)
+    keys = [BUILTIN_TAGS_KEY, user_key]
+    cached = cache.get_many(keys + [generation_key(key) for key in keys])
+    missing = {}
+    builtin = cached_tags(cached, BUILTIN_TAGS_KEY, Tag.objects.filter(author__isnull=True), missing)
+    own = cached_tags(cached, user_key, Tag.objects.filter(author=user), missing)
+    if missing:
+        cache.set_many(missing, tag_cache_timeout())
+    return sorted(builtin + own, key=lambda tag: (tag["is_builtin"], tag["name"]))
+
+def prime_builtin_tags():
+    if not cache_is_shared():
+        return
+    missing = {}
+    cached_tags(cache.get_many([generation_key(BUILTIN_TAGS_KEY)]), BUILTIN_TAGS_KEY, Tag.objects.filter(author__isnull=True), missing)
+    cache.set_many(missing, tag_cache_timeout())
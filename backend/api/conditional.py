@@ -0,0 +1,97 @@
+import hashlib
+from django.db import IntegrityError, transaction
+from django.contrib.auth.models import User
+from django.db.models import Exists, F, Subquery
+from django.utils import timezone
+from django.utils.decorators import method_decorator
+from django.views.decorators.http import condition
+from rest_framework.permissions import SAFE_METHODS
+from .events import publish_change
+from .models import ChangeMarker, Task
+from .recurrence import next_series_due
+
+
+def get_change_marker(request):
+    # Cached on the request so the ETag and Last-Modified checks share one query.
+    marker = getattr(request, "_change_marker", None)
+    if marker is None:
+        marker = ChangeMarker.objects.filter(author=request.user).first() or ChangeMarker(author=request.user)
+        request._change_marker = marker
+    return marker
+
+def touch_change_marker(user):
+    now = timezone.now()
+    if ChangeMarker.objects.filter(author=user).update(version=F("version") + 1, updated_at=now):
+        return
+    try:
+        with transaction.atomic():
+            ChangeMarker.objects.create(author=user, version=1, updated_at=now)
+    except IntegrityError:
+        ChangeMarker.objects.filter(author=user).update(version=F("version") + 1, updated_at=now)
+
+def next_due_boundary(user):
+    # Overdue counts and filters change when the clock passes the next open
+    # due date, even though nothing was written.
+    # Both lookups go in one query and each stays on its partial index.
+    now = timezone.now()
+    open_tasks = Task.objects.filter(author=user, completed=False)
+    bounds = User.objects.filter(pk=user.pk).values(
+        next_due=Subquery(open_tasks.filter(recurrence="", due_date__gt=now).order_by("due_date").values("due_date")[:1]),
+        open_series=Exists(open_tasks.exclude(recurrence="")),
+    ).get()
+    if not bounds["open_series"]:
+        return bounds["next_due"]
+    return min(filter(None, (bounds["next_due"], next_series_due(user, now))), default=None)
+
+def change_etag(request, marker, next_due=None):
+    parts = [
+        request.user.pk,
+        marker.version,
+        request.get_full_path(),
+        request.META.get("HTTP_ACCEPT", ""),
+    ]
+    if next_due is not None:
+        parts.append(next_due)
+    return hashlib.md5(repr(parts).encode(), usedforsecurity=False).hexdigest()
+
+def conditional_on_changes(time_sensitive=False):
+    def etag_func(request, *args, **kwargs):
+        next_due = next_due_boundary(request.user) if time_sensitive else None
+        return change_etag(request, get_change_marker(request), next_due)
+
+    def last_modified_func(request, *args, **kwargs):
+        if time_sensitive:
+            return None
+        return get_change_marker(request).updated_at
+
+    return method_decorator(condition(etag_func=etag_func, last_modified_func=last_modified_func))
+
+class ChangeTrackingMixin:
+    # Successful writes move the author's change marker so cached list,
+    # calendar and stats responses stop validating, and are pushed to the
+    # author's open event streams.
+    def finalize_response(self, request, response, *args, **kwargs):
+        response = super().finalize_response(request, response, *args, **kwargs)
+        if (
+            request.method not in SAFE_METHODS
+            and response.status_code < 400
+            and request.user.is_authenticated
+        ):
+            touch_change_marker(request.user)
+            publish_change(request.user, self.basename, self.action, self.changed_ids(request, response))
+        return response
+
+    def changed_ids(self, request, response):
+        # None when the ids aren't known; clients then refetch the type.
+        lookup = self.kwargs.get(self.lookup_url_kwarg or self.lookup_field)
+        if lookup is not None:
+            return [int(lookup)] if str(lookup).isdigit() else None
+        data = getattr(response, "data", None)
+        if isinstance(data, dict) and "id" in data:
+            return [data["id"]]
+        if isinstance(data, list):
+            return [item["id"] for item in data if isinstance(item, dict) and "id" in item]
+        ids = request.data.get("task_ids") if isinstance(request.data, dict) else None
+        if isinstance(ids, list) and all(isinstance(task_id, int) for task_id in ids):
+            return ids
+        return None
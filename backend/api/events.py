@@ -0,0 +1,237 @@
+import asyncio
+import json
+import logging
+import threading
+from functools import lru_cache
+from http.cookies import SimpleCookie
+
+from asgiref.sync import sync_to_async
+from django.conf import settings
+from django.core.exceptions import ImproperlyConfigured
+from django.db import close_old_connections, connection, transaction
+from django.utils.module_loading import import_string
+from rest_framework_simplejwt.exceptions import InvalidToken, TokenError
+
+from .authentication import CookieJWTAuthentication
+
+logger = logging.getLogger(__name__)
+
+EVENTS_PATH = "/api/events/"
+# Past this many ids an event only names the type, and clients resync through
+# /api/changes/; it also keeps NOTIFY payloads well under their size limit.
+MAX_EVENT_IDS = 100
+# Events buffered for a slow client before it's told to resync instead.
+MAX_QUEUED_EVENTS = 100
+RESYNC = {"type": "resync"}
+
+
+def change_event(kind, action, ids):
+    event = {"type": kind, "action": action}
+    if ids is not None and len(ids) <= MAX_EVENT_IDS:
+        event["ids"] = ids
+    return event
+
+def publish_change(user, kind, action, ids):
+    # Sent once the write commits, so a rolled-back batch or request never
+    # reaches subscribers.
+    event = change_event(kind, action, ids)
+    transaction.on_commit(lambda: get_broker().publish(user.pk, event))
+
+class Subscription:
+    def __init__(self, loop):
+        self.loop = loop
+        self.queue = asyncio.Queue(MAX_QUEUED_EVENTS)
+
+    def deliver(self, event):
+        # Runs on the subscriber's event loop.
+        try:
+            self.queue.put_nowait(event)
+        except asyncio.QueueFull:
+            while not self.queue.empty():
+                self.queue.get_nowait()
+            self.queue.put_nowait(RESYNC)
+
+class InProcessBroker:
+    # Fans events out to the streams held by this process. Publishing is
+    # thread-safe, so sync views running on worker threads can publish to
+    # streams served on the event loop.
+    cross_process = False
+
+    def __init__(self):
+        self.lock = threading.Lock()
+        self.subscribers = {}
+
+    def publish(self, user_id, event):
+        self.dispatch(user_id, event)
+
+    def dispatch(self, user_id, event):
+        with self.lock:
+            subscriptions = list(self.subscribers.get(user_id, ()))
+        for subscription in subscriptions:
+            subscription.loop.call_soon_threadsafe(subscription.deliver, event)
+
+    async def subscribe(self, user_id):
+        subscription = Subscription(asyncio.get_running_loop())
+        with self.lock:
+            self.subscribers.setdefault(user_id, set()).add(subscription)
+        return subscription
+
+    def unsubscribe(self, user_id, subscription):
+        with self.lock:
+            subscriptions = self.subscribers.get(user_id)
+            if subscriptions is not None:
+                subscriptions.discard(subscription)
+                if not subscriptions:
+                    del self.subscribers[user_id]
+
+class PostgresBroker(InProcessBroker):
+    # Publishes through NOTIFY so writes served by any process, WSGI workers
+    # included, reach streams held by every ASGI process. Each process keeps
+    # a single LISTEN connection, however many streams it holds.
+    channel = "agenda_events"
+    cross_process = True
+
+    def __init__(self):
+        super().__init__()
+        self.listener = None
+
+    def publish(self, user_id, event):
+        payload = json.dumps({"user": user_id, "event": event}, separators=(",", ":"))
+        with connection.cursor() as cursor:
+            cursor.execute("SELECT pg_notify(%s, %s)", [self.channel, payload])
+
+    async def subscribe(self, user_id):
+        if self.listener is None or self.listener.done():
+            self.listener = asyncio.create_task(self.listen())
+        return await super().subscribe(user_id)
+
+    async def listen(self):
+        import psycopg
+
+        params = connection.get_connection_params()
+        params.pop("cursor_factory", None)
+        params.pop("context", None)
+        while True:
+            try:
+                async with await psycopg.AsyncConnection.connect(autocommit=True, **params) as listener:
+                    await listener.execute(f"LISTEN {self.channel}")
+                    async for notify in listener.notifies():
+                        message = json.loads(notify.payload)
+                        self.dispatch(message["user"], message["event"])
+            except Exception:
+                logger.exception("Event listener lost its connection")
+            # Anything published while reconnecting was missed.
+            with self.lock:
+                user_ids = list(self.subscribers)
+            for user_id in user_ids:
+                self.dispatch(user_id, RESYNC)
+            await asyncio.sleep(1)
+
+def broker_class():
+    return import_string(getattr(settings, "EVENT_BROKER", "api.events.InProcessBroker"))
+
+@lru_cache(maxsize=None)
+def get_broker():
+    return broker_class()()
+
+def check_broker(workers):
+    # With several worker processes a write and the stream waiting for it
+    # usually land in different ones, and an in-process broker silently drops
+    # the event, so refuse to start instead.
+    broker = broker_class()
+    if workers > 1 and not broker.cross_process:
+        raise ImproperlyConfigured(
+            f"EVENT_BROKER {broker.__name__} only reaches streams in its own process, "
+            f"but {workers} workers are configured. Use api.events.PostgresBroker or a single worker."
+        )
+
+authentication = CookieJWTAuthentication()
+
+def authenticate_token(raw_token):
+    try:
+        return authentication.get_user(authentication.get_validated_token(raw_token))
+    except (InvalidToken, TokenError):
+        return None
+    finally:
+        close_old_connections()
+
+def request_headers(scope):
+    return {name.decode("latin-1").lower(): value.decode("latin-1") for name, value in scope["headers"]}
+
+def cors_headers(headers):
+    origin = headers.get("origin")
+    if origin is None or origin not in settings.CORS_ALLOWED_ORIGINS:
+        return []
+    return [
+        (b"access-control-allow-origin", origin.encode("latin-1")),
+        (b"access-control-allow-credentials", b"true"),
+        (b"vary", b"Origin"),
+    ]
+
+def encode_event(event):
+    return f"event: {event['type']}\ndata: {json.dumps(event, separators=(',', ':'))}\n\n".encode()
+
+async def send_error(send, status, detail, extra_headers):
+    body = json.dumps({"detail": detail}).encode()
+    await send({
+        "type": "http.response.start",
+        "status": status,
+        "headers": [(b"content-type", b"application/json"), *extra_headers],
+    })
+    await send({"type": "http.response.body", "body": body})
+
+async def event_stream(scope, receive, send):
+    # Server-Sent Events for the logged-in user's task, note and tag writes.
+    # A stream holds no database connection once authenticated; an idle one
+    # costs a queue and a heartbeat every EVENT_STREAM_HEARTBEAT seconds.
+    headers = request_headers(scope)
+    extra_headers = cors_headers(headers)
+    if scope["method"] != "GET":
+        await send_error(send, 405, 'Method "{}" not allowed.'.format(scope["method"]), extra_headers)
+        return
+
+    cookie = SimpleCookie(headers.get("cookie", ""))
+    user = None
+    if "access_token" in cookie:
+        user = await sync_to_async(authenticate_token)(cookie["access_token"].value)
+    if user is None or not user.is_active:
+        await send_error(send, 401, "Authentication credentials were not provided.", extra_headers)
+        return
+
+    broker = get_broker()
+    subscription = await broker.subscribe(user.pk)
+    disconnected = asyncio.ensure_future(wait_for_disconnect(receive))
+    try:
+        await send({
+            "type": "http.response.start",
+            "status": 200,
+            "headers": [
+                (b"content-type", b"text/event-stream"),
+                (b"cache-control", b"no-cache"),
+                (b"x-accel-buffering", b"no"),
+                *extra_headers,
+            ],
+        })
+        await send({"type": "http.response.body", "body": b"retry: 5000\n\n" + encode_event({"type": "ready"}), "more_body": True})
+
+        heartbeat = getattr(settings, "EVENT_STREAM_HEARTBEAT", 15)
+        while not disconnected.done():
+            next_event = asyncio.ensure_future(subscription.queue.get())
+            done, _ = await asyncio.wait({next_event, disconnected}, timeout=heartbeat, return_when=asyncio.FIRST_COMPLETED)
+            if next_event in done:
+                body = encode_event(next_event.result())
+            else:
+                next_event.cancel()
+                if disconnected in done:
+                    break
+                body = b": ping\n\n"
+            await send({"type": "http.response.body", "body": body, "more_body": True})
+    except OSError:
+        pass
+    finally:
+        disconnected.cancel()
+        broker.unsubscribe(user.pk, subscription)
+
+async def wait_for_disconnect(receive):
+    while (await receive())["type"] != "http.disconnect":
+        pass
@@ -0,0 +1,93 @@
+import csv
+import json
+from itertools import islice
+from asgiref.sync import sync_to_async
+from rest_framework.renderers import BaseRenderer
+from .models import Note, Task
+
+EXPORT_CHUNK_SIZE = 500
+
+TASK_COLUMNS = ["id", "name", "description", "due_date", "completed", "created_at", "updated_at", "total_pomodoro_time"]
+NOTE_COLUMNS = ["id", "name", "notes", "created_at", "updated_at"]
+CSV_COLUMNS = ["type", "id", "name", "description", "notes", "due_date", "completed", "created_at", "updated_at", "total_pomodoro_seconds", "tags"]
+
+
+class NDJSONRenderer(BaseRenderer):
+    media_type = "application/x-ndjson"
+    format = "ndjson"
+    charset = "utf-8"
+
+    def render(self, data, accepted_media_type=None, renderer_context=None):
+        return json.dumps(data) + "\n"
+
+class CSVRenderer(BaseRenderer):
+    media_type = "text/csv"
+    format = "csv"
+    charset = "utf-8"
+
+    def render(self, data, accepted_media_type=None, renderer_context=None):
+        if isinstance(data, dict):
+            return "\n".join(f"{key},{value}" for key, value in data.items()) + "\n"
+        return str(data)
+
+class LineBuffer:
+    def write(self, value):
+        return value
+
+def iter_chunks(queryset, columns, chunk_size=EXPORT_CHUNK_SIZE):
+    # Keyset iteration on the primary key keeps every query small and avoids
+    # holding a server-side cursor open for the whole download.
+    model = queryset.model
+    through = model.tags.through
+    owner = f"{model._meta.model_name}_id"
+    last_id = 0
+    while True:
+        rows = list(queryset.filter(id__gt=last_id).order_by("id").values(*columns)[:chunk_size])
+        if not rows:
+            return
+        tags = {row["id"]: [] for row in rows}
+        tag_rows = (
+            through.objects.filter(**{f"{owner}__in": list(tags)})
+            .order_by("tag__name")
+            .values_list(owner, "tag__name")
+        )
+        for object_id, tag_name in tag_rows:
+            tags[object_id].append(tag_name)
+        for row in rows:
+            row["tags"] = tags[row["id"]]
+            for key, value in row.items():
+                if hasattr(value, "isoformat"):
+                    row[key] = value.isoformat()
+        yield rows
+        last_id = rows[-1]["id"]
+
+def export_records(user, include):
+    if "tasks" in include:
+        for rows in iter_chunks(Task.objects.filter(author=user), TASK_COLUMNS):
+            for row in rows:
+                duration = row.pop("total_pomodoro_time")
+                row["total_pomodoro_seconds"] = int(duration.total_seconds()) if duration else 0
+                yield {"type": "task", **row}
+    if "notes" in include:
+        for rows in iter_chunks(Note.objects.filter(author=user), NOTE_COLUMNS):
+            for row in rows:
+                yield {"type": "note", **row}
+
+def stream_ndjson(records):
+    for record in records:
+        yield json.dumps(record) + "\n"
+
+def stream_csv(records):
+    writer = csv.DictWriter(LineBuffer(), fieldnames=CSV_COLUMNS, extrasaction="ignore")
+    yield writer.writerow(dict(zip(CSV_COLUMNS, CSV_COLUMNS)))
+    for record in records:
+        record["tags"] = ";".join(record["tags"])
+        yield writer.writerow(record)
+
+async def stream_async(lines, batch_size=EXPORT_CHUNK_SIZE):
+    # Under ASGI Django buffers a sync iterator whole before sending it, so
+    # the lines are pulled a batch per thread hop instead. The queries stay on
+    # the request's sync thread and connection.
+    take = sync_to_async(lambda: list(islice(lines, batch_size)), thread_sensitive=True)
+    while batch := await take():
+        yield "".join(batch)
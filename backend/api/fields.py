@@ -0,0 +1,64 @@
+import json
+from django.db import models
+
+
+class IntegerArrayField(models.Field):
+    # A list of integers: bigint[] on PostgreSQL, so it holds BigAutoField
+    # ids, and a JSON array in a text column elsewhere. Supports `contains` (has every value) and `overlap`
+    # (has any value) lookups on both.
+    description = "List of integers"
+
+    def db_type(self, connection):
+        if connection.vendor == "postgresql":
+            return "bigint[]"
+        return "text"
+
+    def from_db_value(self, value, expression, connection):
+        if value is None or isinstance(value, list):
+            return value
+        return json.loads(value)
+
+    def to_python(self, value):
+        if isinstance(value, str):
+            return json.loads(value)
+        return value
+
+    def get_db_prep_value(self, value, connection, prepared=False):
+        if value is None:
+            return None
+        value = [int(item) for item in value]
+        if connection.vendor == "postgresql":
+            return value
+        return json.dumps(value, separators=(",", ":"))
+
+    def value_to_string(self, obj):
+        return json.dumps(self.value_from_object(obj))
+
+class ArrayLookup(models.Lookup):
+    prepare_rhs = False
+
+    def as_sql(self, compiler, connection):
+        lhs, params = self.process_lhs(compiler, connection)
+        values = sorted({int(value) for value in self.rhs})
+        if connection.vendor == "postgresql":
+            return f"{lhs} {self.operator} %s::bigint[]", [*params, values]
+        placeholders = ", ".join(["%s"] * len(values))
+        return self.json_template.format(lhs=lhs, values=placeholders), [*params, *values, *self.json_params(values)]
+
+    def json_params(self, values):
+        return []
+
+@IntegerArrayField.register_lookup
+class ArrayContains(ArrayLookup):
+    lookup_name = "contains"
+    operator = "@>"
+    json_template = "(SELECT COUNT(DISTINCT value) FROM json_each({lhs}) WHERE value IN ({values})) = %s"
+
+    def json_params(self, values):
+        return [len(values)]
+
+@IntegerArrayField.register_lookup
+class ArrayOverlap(ArrayLookup):
+    lookup_name = "overlap"
+    operator = "&&"
+    json_template = "EXISTS (SELECT 1 FROM json_each({lhs}) WHERE value IN ({values}))"
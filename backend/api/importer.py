@@ -0,0 +1,230 @@
+import codecs
+import csv
+import json
+from datetime import datetime, time
+from django.db import transaction
+from django.db.models import Q
+from django.utils import timezone
+from django.utils.dateparse import parse_date, parse_datetime
+from .cache import invalidate_tags
+from .conditional import touch_change_marker
+from .events import publish_change
+from .models import ImportJob, Note, Tag, Task
+from .stats import adjust_tag_stats, adjust_task_stats
+
+IMPORT_BATCH_SIZE = 500
+IMPORT_FORMATS = ("ndjson", "csv")
+# Job counters reported as change events, by event type.
+CREATED_COUNTERS = {"task": "tasks_created", "note": "notes_created", "tag": "tags_created"}
+
+
+class ImportRecordError(ValueError):
+    pass
+
+class ImportFileError(ValueError):
+    pass
+
+def guess_format(filename, default="ndjson"):
+    extension = filename.rsplit(".", 1)[-1].lower() if "." in filename else ""
+    if extension in IMPORT_FORMATS:
+        return extension
+    if extension in ("jsonl", "json"):
+        return "ndjson"
+    return default
+
+def read_records(lines, format):
+    # Problems with the file as a whole end the import; bad records are only
+    # skipped (see ImportRecordError).
+    try:
+        yield from decode_records(lines, format)
+    except (UnicodeDecodeError, csv.Error) as e:
+        raise ImportFileError(f"The file can't be read as {format}: {e}") from e
+
+def decode_records(lines, format):
+    # `lines` is any iterable of byte lines (an upload or an open file), so
+    # only one line or CSV row is decoded and held at a time.
+    lines = codecs.iterdecode(lines, "utf-8-sig")
+    if format == "csv":
+        yield from csv.DictReader(lines)
+        return
+    for line in lines:
+        line = line.strip()
+        if not line:
+            continue
+        try:
+            yield json.loads(line)
+        except ValueError:
+            yield None
+
+def parse_text(record, key, default=""):
+    value = record.get(key)
+    if value is None or value == "":
+        return default
+    if not isinstance(value, str):
+        raise ImportRecordError(f"{key} must be a string")
+    return value
+
+def parse_tags(value):
+    if not value:
+        return []
+    if isinstance(value, str):
+        value = value.split(";")
+    elif not isinstance(value, list):
+        raise ImportRecordError("tags must be a list or a ;-separated string")
+    names = []
+    for name in value:
+        name = str(name).strip()[:100]
+        if name and name not in names:
+            names.append(name)
+    return names
+
+def parse_bool(value):
+    if isinstance(value, bool):
+        return value
+    return str(value or "").strip().lower() in ("1", "true", "yes")
+
+def parse_due_date(value):
+    if not value:
+        return None
+    try:
+        parsed = parse_datetime(value)
+        if parsed is None:
+            day = parse_date(value)
+            parsed = datetime.combine(day, time.min) if day else None
+    except (TypeError, ValueError):
+        parsed = None
+    if parsed is None:
+        raise ImportRecordError(f"Invalid due_date {value!r}")
+    return timezone.make_aware(parsed) if timezone.is_naive(parsed) else parsed
+
+def parse_record(record):
+    if not isinstance(record, dict):
+        raise ImportRecordError("Record is not an object")
+    kind = parse_text(record, "type", "task").strip().lower()
+    name = parse_text(record, "name").strip()
+    if not name:
+        raise ImportRecordError("name is required")
+    if len(name) > 100:
+        raise ImportRecordError("name can't be longer than 100 characters")
+
+    if kind == "task":
+        fields = {
+            "name": name,
+            "description": parse_text(record, "description"),
+            "due_date": parse_due_date(record.get("due_date")),
+            "completed": parse_bool(record.get("completed")),
+        }
+    elif kind == "note":
+        fields = {"name": name, "notes": parse_text(record, "notes")}
+    else:
+        raise ImportRecordError(f"Unknown record type {kind!r}")
+    return kind, fields, parse_tags(record.get("tags"))
+
+class Importer:
+    def __init__(self, job, batch_size=IMPORT_BATCH_SIZE, progress=None):
+        self.job = job
+        self.user = job.author
+        self.batch_size = batch_size
+        self.progress = progress
+        self.tags = {}
+
+    def run(self, lines):
+        # Records already committed by an earlier attempt are skipped, so a
+        # failed import can be resumed by feeding the same file again.
+        skip = self.job.records_processed
+        created = {kind: getattr(self.job, counter) for kind, counter in CREATED_COUNTERS.items()}
+        batch = []
+        try:
+            for index, record in enumerate(read_records(lines, self.job.format)):
+                if index < skip:
+                    continue
+                batch.append(record)
+                if len(batch) >= self.batch_size:
+                    self.flush(batch)
+                    batch = []
+            if batch:
+                self.flush(batch)
+        except Exception as e:
+            self.job.status = ImportJob.FAILED
+            self.job.last_error = str(e)
+            self.job.save(update_fields=["status", "last_error", "updated_at"])
+            self.publish(created)
+            raise
+        self.job.status = ImportJob.COMPLETED
+        self.job.save(update_fields=["status", "updated_at"])
+        self.publish(created)
+        return self.job
+
+    def publish(self, created):
+        # One event per type once the job stops, rather than one per batch;
+        # the ids aren't listed, so open clients refetch the type.
+        for kind, counter in CREATED_COUNTERS.items():
+            if getattr(self.job, counter) > created[kind]:
+                publish_change(self.user, kind, "import", None)
+
+    def resolve_tags(self, names):
+        missing = [name for name in names if name not in self.tags]
+        if not missing:
+            return 0
+
+        found = Tag.objects.filter(Q(author=self.user) | Q(author__isnull=True), name__in=missing)
+        for tag in sorted(found, key=lambda tag: tag.author_id is not None):
+            self.tags[tag.name] = tag
+
+        new_names = [name for name in missing if name not in self.tags]
+        if new_names:
+            Tag.objects.bulk_create([Tag(author=self.user, name=name) for name in new_names], ignore_conflicts=True)
+            for tag in Tag.objects.filter(author=self.user, name__in=new_names):
+                self.tags[tag.name] = tag
+        return len(new_names)
+
+    def flush(self, batch):
+        parsed = []
+        skipped = 0
+        last_error = self.job.last_error
+        for offset, record in enumerate(batch, start=self.job.records_processed + 1):
+            try:
+                parsed.append(parse_record(record))
+            except ImportRecordError as e:
+                skipped += 1
+                last_error = f"Record {offset}: {e}"
+
+        with transaction.atomic():
+            tags_created = self.resolve_tags({name for _, _, names in parsed for name in names})
+            if tags_created:
+                # bulk_create sends no post_save, so the tag cache is dropped here.
+                transaction.on_commit(lambda: invalidate_tags(self.user.pk))
+            tasks = [(Task(author=self.user, **fields), names) for kind, fields, names in parsed if kind == "task"]
+            notes = [(Note(author=self.user, **fields), names) for kind, fields, names in parsed if kind == "note"]
+            self.create(Task, tasks)
+            for note, _ in notes:
+                note.update_summary()
+            self.create(Note, notes)
+            adjust_task_stats(self.user, total=len(tasks), completed=sum(task.completed for task, _ in tasks))
+            adjust_tag_stats(self.user, added=[(tag_id, task.completed) for task, _ in tasks for tag_id in task.tag_id_array])
+
+            self.job.records_processed += len(batch)
+            self.job.records_skipped += skipped
+            self.job.tasks_created += len(tasks)
+            self.job.notes_created += len(notes)
+            self.job.tags_created += tags_created
+            self.job.last_error = last_error
+            self.job.save()
+            touch_change_marker(self.user)
+
+        if self.progress:
+            self.progress(self.job)
+
+    def create(self, model, objects):
+        if not objects:
+            return
+        if model is Task:
+            for obj, names in objects:
+                obj.tag_id_array = sorted(self.tags[name].pk for name in names)
+        model.objects.bulk_create([obj for obj, _ in objects], batch_size=self.batch_size)
+        through = model.tags.through
+        owner = f"{model._meta.model_name}_id"
+        through.objects.bulk_create(
+            [through(**{owner: obj.pk, "tag_id": self.tags[name].pk}) for obj, names in objects for name in names],
+            batch_size=self.batch_size,
+        )
@@ -0,0 +1,74 @@
+import json
+from django.core.management.base import BaseCommand, CommandError
+from django.db import connection
+from django.test.utils import setup_test_environment, teardown_test_environment
+from api.benchmark import QUERY_BUDGETS, run_benchmark, seed
+
+
+class Command(BaseCommand):
+    help = (
+        "Seed a throwaway test database with synthetic users, tags, tasks and notes, "
+        "then report latency percentiles and SQL query counts per API endpoint."
+    )
+
+    def add_arguments(self, parser):
+        parser.add_argument("--users", type=int, default=1)
+        parser.add_argument("--tags", type=int, default=10)
+        parser.add_argument("--tasks", type=int, default=1000)
+        parser.add_argument("--notes", type=int, default=200)
+        parser.add_argument("--iterations", type=int, default=20)
+        parser.add_argument("--warmup", type=int, default=2)
+        parser.add_argument("--endpoint", action="append", dest="endpoints", choices=sorted(QUERY_BUDGETS), help="Only run this endpoint (repeatable)")
+        parser.add_argument("--seed", type=int, default=0, help="Random seed for the synthetic data")
+        parser.add_argument("--json", action="store_true", help="Print machine-readable JSON")
+        parser.add_argument("--output", help="Also write the JSON results to this file")
+        parser.add_argument("--check", action="store_true", help="Fail when an endpoint errors or exceeds its query budget")
+        parser.add_argument("--keepdb", action="store_true", help="Keep the test database between runs")
+
+    def handle(self, *args, **options):
+        if options["iterations"] < 1:
+            raise CommandError("--iterations must be at least 1.")
+
+        setup_test_environment()
+        old_name = connection.settings_dict["NAME"]
+        connection.creation.create_test_db(verbosity=0, autoclobber=True, keepdb=options["keepdb"])
+        try:
+            users = seed(options["users"], options["tags"], options["tasks"], options["notes"], options["seed"])
+            results = []
+            for user in users:
+                for result in run_benchmark(user, options["iterations"], options["warmup"], options["endpoints"]):
+                    results.append({"user": user.username, **result})
+        finally:
+            connection.creation.destroy_test_db(old_name, verbosity=0, keepdb=options["keepdb"])
+            teardown_test_environment()
+
+        report = {
+            "config": {key: options[key] for key in ("users", "tags", "tasks", "notes", "iterations", "seed")},
+            "results": results,
+        }
+        if options["output"]:
+            with open(options["output"], "w") as file:
+                json.dump(report, file, indent=2)
+
+        if options["json"]:
+            self.stdout.write(json.dumps(report, indent=2))
+        else:
+            self.stdout.write(f"{'endpoint':<20} {'p50 ms':>9} {'p95 ms':>9} {'p99 ms':>9} {'queries':>8} {'budget':>7}")
+            for result in results:
+                flag = " FAILED" if result["failed"] else " OVER" if result["over_budget"] else ""
+                self.stdout.write(
+                    f"{result['endpoint']:<20} {result['p50_ms']:>9} {result['p95_ms']:>9} "
+                    f"{result['p99_ms']:>9} {result['queries']:>8} {str(result['query_budget']):>7}{flag}"
+                )
+
+        if not options["check"]:
+            return
+        failed = sorted({result["endpoint"] for result in results if result["failed"]})
+        over = sorted({result["endpoint"] for result in results if result["over_budget"]})
+        problems = []
+        if failed:
+            problems.append(f"Non-2xx responses: {', '.join(failed)}")
+        if over:
+            problems.append(f"Query budget exceeded: {', '.join(over)}")
+        if problems:
+            raise CommandError("; ".join(problems))
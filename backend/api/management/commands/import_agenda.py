@@ -0,0 +1,50 @@
+from django.contrib.auth.models import User
+from django.core.management.base import BaseCommand, CommandError
+from api.importer import IMPORT_BATCH_SIZE, IMPORT_FORMATS, Importer, guess_format
+from api.models import ImportJob
+
+
+class Command(BaseCommand):
+    help = "Import tasks and notes for a user from an NDJSON or CSV file."
+
+    def add_arguments(self, parser):
+        parser.add_argument("username")
+        parser.add_argument("path")
+        parser.add_argument("--format", choices=IMPORT_FORMATS)
+        parser.add_argument("--batch-size", type=int, default=IMPORT_BATCH_SIZE)
+        parser.add_argument("--resume", type=int, metavar="JOB_ID", help="Continue a failed import job")
+
+    def handle(self, *args, **options):
+        try:
+            user = User.objects.get(username=options["username"])
+        except User.DoesNotExist:
+            raise CommandError(f"User {options['username']!r} does not exist")
+
+        if options["resume"]:
+            try:
+                job = ImportJob.objects.get(pk=options["resume"], author=user)
+            except ImportJob.DoesNotExist:
+                raise CommandError(f"Import job {options['resume']} does not exist")
+            if job.status == ImportJob.COMPLETED:
+                raise CommandError(f"Import job {job.pk} already completed")
+            job.status = ImportJob.RUNNING
+            job.save(update_fields=["status", "updated_at"])
+        else:
+            job = ImportJob.objects.create(
+                author=user,
+                source=options["path"][-255:],
+                format=options["format"] or guess_format(options["path"]),
+            )
+
+        def progress(job):
+            self.stdout.write(f"Job {job.pk}: {job.records_processed} records processed ({job.records_skipped} skipped)")
+
+        with open(options["path"], "rb") as file:
+            try:
+                Importer(job, batch_size=options["batch_size"], progress=progress).run(file)
+            except Exception as e:
+                raise CommandError(f"Import failed after {job.records_processed} records: {e}. Resume with --resume {job.pk}")
+
+        self.stdout.write(self.style.SUCCESS(
+            f"Imported {job.tasks_created} tasks, {job.notes_created} notes and {job.tags_created} new tags"
+        ))
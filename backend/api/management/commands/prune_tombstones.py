@@ -0,0 +1,10 @@
+from django.core.management.base import BaseCommand
+from api.sync import prune_tombstones, tombstone_retention
+
+
+class Command(BaseCommand):
+    help = "Delete sync tombstones older than SYNC_TOMBSTONE_RETENTION_DAYS."
+
+    def handle(self, *args, **options):
+        deleted = prune_tombstones()
+        self.stdout.write(f"Deleted {deleted} tombstones older than {tombstone_retention().days} days")
@@ -0,0 +1,25 @@
+import time
+from datetime import timedelta
+from django.core.management.base import BaseCommand
+from django.db import close_old_connections
+from api.reminders import enqueue_reminders, reminder_window
+
+
+class Command(BaseCommand):
+    help = "Queue reminders for open tasks that become due within the reminder window."
+
+    def add_arguments(self, parser):
+        parser.add_argument("--interval", type=int, default=60, help="Seconds between scans.")
+        parser.add_argument("--window", type=int, help="Minutes ahead to look (default REMINDER_WINDOW_MINUTES).")
+        parser.add_argument("--once", action="store_true", help="Scan once and exit, e.g. from cron.")
+
+    def handle(self, *args, **options):
+        window = timedelta(minutes=options["window"]) if options["window"] else reminder_window()
+        while True:
+            close_old_connections()
+            queued = enqueue_reminders(window=window)
+            if queued or options["verbosity"] > 1:
+                self.stdout.write(f"Queued {queued} reminders")
+            if options["once"]:
+                return
+            time.sleep(options["interval"])
@@ -2,25 +2,39 @@
 
 from django.db import migrations
 
+class PostgreSQLOnly(migrations.RunSQL):
+    # The INTERVAL repair only applies to PostgreSQL; other backends already
+    # got the right column types from 0003. The guard was added after this
+    # migration shipped: it runs the same statements on PostgreSQL, so
+    # databases that applied it are unaffected, while SQLite could not parse
+    # the original SQL (DROP COLUMN IF EXISTS, INTERVAL) and failed here.
+    def database_forwards(self, app_label, schema_editor, from_state, to_state):
+        if schema_editor.connection.vendor == "postgresql":
+            super().database_forwards(app_label, schema_editor, from_state, to_state)
+
+    def database_backwards(self, app_label, schema_editor, from_state, to_state):
+        if schema_editor.connection.vendor == "postgresql":
+            super().database_backwards(app_label, schema_editor, from_state, to_state)
+
 class Migration(migrations.Migration):
     dependencies = [
         ('api', '0003_alter_task_last_pomodoro_duration_and_more'),
     ]
 
     operations = [
-        migrations.RunSQL(
+        PostgreSQLOnly(
             "ALTER TABLE api_task DROP COLUMN IF EXISTS last_pomodoro_duration;",
             reverse_sql="-- No reverse"
         ),
-        migrations.RunSQL(
+        PostgreSQLOnly(
             "ALTER TABLE api_task DROP COLUMN IF EXISTS total_pomodoro_time;",
             reverse_sql="-- No reverse"
         ),
-        migrations.RunSQL(
+        PostgreSQLOnly(
             "ALTER TABLE api_task ADD COLUMN last_pomodoro_duration INTERVAL;",
             reverse_sql="ALTER TABLE api_task DROP COLUMN last_pomodoro_duration;"
         ),
-        migrations.RunSQL(
+        PostgreSQLOnly(
             "ALTER TABLE api_task ADD COLUMN total_pomodoro_time INTERVAL DEFAULT INTERVAL '0';",
             reverse_sql="ALTER TABLE api_task DROP COLUMN total_pomodoro_time;"
         ),
@@ -0,0 +1,19 @@
+from django.db import migrations
+
+
+def install(apps, schema_editor):
+    from api.search import install_search_schema
+    install_search_schema(schema_editor.connection, rebuild=True)
+
+def uninstall(apps, schema_editor):
+    from api.search import uninstall_search_schema
+    uninstall_search_schema(schema_editor.connection)
+
+class Migration(migrations.Migration):
+    dependencies = [
+        ('api', '0007_taskstats'),
+    ]
+
+    operations = [
+        migrations.RunPython(install, uninstall),
+    ]
@@ -0,0 +1,37 @@
+# Generated by Django 5.2.18 on 2026-10-18 06:26
+
+from django.db import migrations, models
+from django.utils.text import Truncator
+
+
+def fill_excerpts(apps, schema_editor):
+    Note = apps.get_model('api', 'Note')
+    batch = []
+    for note in Note.objects.only('id', 'notes').iterator(chunk_size=500):
+        note.excerpt = Truncator(' '.join(note.notes.split())).chars(200)
+        note.body_length = len(note.notes)
+        batch.append(note)
+        if len(batch) == 500:
+            Note.objects.bulk_update(batch, ['excerpt', 'body_length'])
+            batch = []
+    Note.objects.bulk_update(batch, ['excerpt', 'body_length'])
+
+class Migration(migrations.Migration):
+
+    dependencies = [
+        ('api', '0013_reminder_task_api_task_open_due_idx_and_more'),
+    ]
+
+    operations = [
+        migrations.AddField(
+            model_name='note',
+            name='body_length',
+            field=models.IntegerField(default=0, editable=False),
+        ),
+        migrations.AddField(
+            model_name='note',
+            name='excerpt',
+            field=models.CharField(blank=True, editable=False, max_length=200),
+        ),
+        migrations.RunPython(fill_excerpts, migrations.RunPython.noop),
+    ]
@@ -0,0 +1,47 @@
+# Generated by Django 5.2.18 on 2026-10-18 06:37
+
+import api.fields
+from django.db import migrations
+
+
+def fill_tag_id_arrays(apps, schema_editor):
+    Task = apps.get_model('api', 'Task')
+    arrays = {}
+    links = Task.tags.through.objects.order_by('tag_id').values_list('task_id', 'tag_id')
+    for task_id, tag_id in links.iterator(chunk_size=2000):
+        arrays.setdefault(task_id, []).append(tag_id)
+    Task.objects.bulk_update(
+        [Task(pk=task_id, tag_id_array=tag_ids) for task_id, tag_ids in arrays.items()],
+        ['tag_id_array'],
+        batch_size=500,
+    )
+
+class PostgreSQLOnly(migrations.RunSQL):
+    # GIN indexes only exist on PostgreSQL; SQLite filters the JSON array
+    # within the rows already narrowed down by author.
+    def database_forwards(self, app_label, schema_editor, from_state, to_state):
+        if schema_editor.connection.vendor == "postgresql":
+            super().database_forwards(app_label, schema_editor, from_state, to_state)
+
+    def database_backwards(self, app_label, schema_editor, from_state, to_state):
+        if schema_editor.connection.vendor == "postgresql":
+            super().database_backwards(app_label, schema_editor, from_state, to_state)
+
+class Migration(migrations.Migration):
+
+    dependencies = [
+        ('api', '0015_task_recurrence'),
+    ]
+
+    operations = [
+        migrations.AddField(
+            model_name='task',
+            name='tag_id_array',
+            field=api.fields.IntegerArrayField(default=list, editable=False),
+        ),
+        migrations.RunPython(fill_tag_id_arrays, migrations.RunPython.noop),
+        PostgreSQLOnly(
+            "CREATE INDEX api_task_tag_id_array_gin ON api_task USING gin (tag_id_array);",
+            reverse_sql="DROP INDEX IF EXISTS api_task_tag_id_array_gin;",
+        ),
+    ]
@@ -0,0 +1,41 @@
+# Generated by Django 5.2.18 on 2026-10-18 06:58
+
+from django.db import migrations, models
+
+from api.recurrence import first_open_occurrence, parse_rule
+
+
+def fill_next_open_dues(apps, schema_editor):
+    Task = apps.get_model('api', 'Task')
+    TaskOccurrence = apps.get_model('api', 'TaskOccurrence')
+    touched = {}
+    for task_id, original_due in TaskOccurrence.objects.values_list('task_id', 'original_due').iterator(chunk_size=2000):
+        touched.setdefault(task_id, set()).add(original_due)
+    batch = []
+    for task in Task.objects.exclude(recurrence='').filter(due_date__isnull=False).only('id', 'due_date', 'recurrence').iterator(chunk_size=500):
+        try:
+            rule = parse_rule(task.recurrence)
+        except ValueError:
+            continue
+        task.next_open_due = first_open_occurrence(rule, task.due_date, touched.get(task.pk, set()))
+        batch.append(task)
+    Task.objects.bulk_update(batch, ['next_open_due'], batch_size=500)
+
+class Migration(migrations.Migration):
+
+    dependencies = [
+        ('api', '0016_task_tag_id_array'),
+    ]
+
+    operations = [
+        migrations.AddField(
+            model_name='task',
+            name='next_open_due',
+            field=models.DateTimeField(blank=True, editable=False, null=True),
+        ),
+        migrations.RunPython(fill_next_open_dues, migrations.RunPython.noop),
+        migrations.AddIndex(
+            model_name='taskoccurrence',
+            index=models.Index(condition=models.Q(('cancelled', False), ('completed', False)), fields=['task', 'original_due'], name='api_occurrence_open_idx'),
+        ),
+    ]
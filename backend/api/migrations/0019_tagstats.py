@@ -0,0 +1,51 @@
+# Generated by Django 5.2.18 on 2026-10-18 07:47
+
+import django.db.models.deletion
+from django.conf import settings
+from django.db import migrations, models
+from django.db.models import Count, Q
+
+
+def backfill(apps, schema_editor):
+    # Authors whose task counters already exist get their tag counters too;
+    # everyone else is counted when their stats row is first built.
+    Task = apps.get_model('api', 'Task')
+    TaskStats = apps.get_model('api', 'TaskStats')
+    TagStats = apps.get_model('api', 'TagStats')
+    links = (
+        Task.tags.through.objects.filter(task__author__in=TaskStats.objects.values('author'))
+        .values('task__author', 'tag')
+        .annotate(total=Count('id'), completed=Count('id', filter=Q(task__completed=True)))
+    )
+    TagStats.objects.bulk_create(
+        [
+            TagStats(author_id=row['task__author'], tag_id=row['tag'], total_tasks=row['total'], completed_tasks=row['completed'])
+            for row in links.iterator()
+        ],
+        batch_size=500,
+    )
+
+class Migration(migrations.Migration):
+
+    dependencies = [
+        ('api', '0018_tombstone_occurrence'),
+        migrations.swappable_dependency(settings.AUTH_USER_MODEL),
+    ]
+
+    operations = [
+        migrations.CreateModel(
+            name='TagStats',
+            fields=[
+                ('id', models.BigAutoField(auto_created=True, primary_key=True, serialize=False, verbose_name='ID')),
+                ('total_tasks', models.IntegerField(default=0)),
+                ('completed_tasks', models.IntegerField(default=0)),
+                ('updated_at', models.DateTimeField(auto_now=True)),
+                ('author', models.ForeignKey(on_delete=django.db.models.deletion.CASCADE, related_name='tag_stats', to=settings.AUTH_USER_MODEL)),
+                ('tag', models.ForeignKey(on_delete=django.db.models.deletion.CASCADE, related_name='stats', to='api.tag')),
+            ],
+            options={
+                'unique_together': {('author', 'tag')},
+            },
+        ),
+        migrations.RunPython(backfill, migrations.RunPython.noop),
+    ]
@@ -0,0 +1,27 @@
+from django.db import migrations
+
+
+class PostgreSQLOnly(migrations.RunSQL):
+    # Other backends store the array as JSON text, which has no element type.
+    def database_forwards(self, app_label, schema_editor, from_state, to_state):
+        if schema_editor.connection.vendor == "postgresql":
+            super().database_forwards(app_label, schema_editor, from_state, to_state)
+
+    def database_backwards(self, app_label, schema_editor, from_state, to_state):
+        if schema_editor.connection.vendor == "postgresql":
+            super().database_backwards(app_label, schema_editor, from_state, to_state)
+
+class Migration(migrations.Migration):
+
+    dependencies = [
+        ('api', '0019_tagstats'),
+    ]
+
+    operations = [
+        # Tag ids are BigAutoField, so integer[] overflows past 2**31. The GIN
+        # index is rebuilt along with the column.
+        PostgreSQLOnly(
+            "ALTER TABLE api_task ALTER COLUMN tag_id_array TYPE bigint[];",
+            reverse_sql="ALTER TABLE api_task ALTER COLUMN tag_id_array TYPE integer[];",
+        ),
+    ]
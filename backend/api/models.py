@@ -1,6 +1,9 @@
 from django.db import models
 from django.contrib.auth.models import User
+from django.utils import timezone
+from django.utils.text import Truncator
 from datetime import timedelta
+from .fields import IntegerArrayField
 
 # Create your models here.
 
@@ -8,24 +11,52 @@ class Tag(models.Model):
     name = models.CharField(max_length=100, unique=False)
     author = models.ForeignKey(User, on_delete=models.CASCADE, related_name="tag", null=True)
     is_builtin = models.BooleanField(default = False)
+    updated_at = models.DateTimeField(auto_now=True)
     
     class Meta:
         unique_together = (("author", "name"),)
         ordering = ["is_builtin", "name"]
+        indexes = [
+            models.Index(fields=["author", "updated_at"], name="api_tag_author_updated_idx"),
+        ]
 
     def __str__(self):
         return self.name
 
+NOTE_EXCERPT_LENGTH = 200
+
 class Note(models.Model):
     name = models.CharField(max_length=100)
     tags = models.ManyToManyField(Tag)
     notes = models.TextField()
+    # Stored so lists can show a snippet without loading the body.
+    excerpt = models.CharField(max_length=NOTE_EXCERPT_LENGTH, blank=True, editable=False)
+    body_length = models.IntegerField(default=0, editable=False)
     author = models.ForeignKey(User, on_delete=models.CASCADE, related_name="note")
     created_at = models.DateTimeField(auto_now_add=True)
     updated_at = models.DateTimeField(auto_now=True)
+
+    class Meta:
+        indexes = [
+            models.Index(fields=["author", "created_at", "id"], name="api_note_author_created_idx"),
+            models.Index(fields=["author", "updated_at", "id"], name="api_note_author_updated_idx"),
+        ]
     
     def __str__(self):
         return self.name
+
+    def update_summary(self):
+        # Called by save(); bulk_create callers call it themselves.
+        self.excerpt = Truncator(" ".join(self.notes.split())).chars(NOTE_EXCERPT_LENGTH)
+        self.body_length = len(self.notes)
+
+    def save(self, *args, **kwargs):
+        update_fields = kwargs.get("update_fields")
+        if update_fields is None or "notes" in update_fields:
+            self.update_summary()
+            if update_fields is not None:
+                kwargs["update_fields"] = {*update_fields, "excerpt", "body_length"}
+        super().save(*args, **kwargs)
     
 class Task(models.Model):
     name = models.CharField(max_length=100)
@@ -34,11 +65,200 @@ class Task(models.Model):
     completed = models.BooleanField(default=False)
     author = models.ForeignKey(User, on_delete=models.CASCADE, related_name="tasks")
     tags = models.ManyToManyField(Tag, blank=True, related_name="tasks")
+    # Sorted copy of the tag ids, kept in sync with `tags` so lists
+    # can filter and render tags without joining the link table.
+    tag_id_array = IntegerArrayField(default=list, editable=False)
     pomodoro_start = models.DateTimeField(null=True, blank=True)
     last_pomodoro_duration = models.DurationField(null=True, blank=True)
     total_pomodoro_time = models.DurationField(default=timedelta())
+    # RRULE-style rule (see api.recurrence) starting at due_date. Occurrences
+    # are expanded per window; only completed or edited ones are stored.
+    recurrence = models.CharField(max_length=255, blank=True)
+    recurrence_end = models.DateTimeField(null=True, blank=True, editable=False)
+    # Earliest occurrence without a stored override. Open and overdue checks
+    # start from it instead of walking the series' completed history.
+    next_open_due = models.DateTimeField(null=True, blank=True, editable=False)
     created_at = models.DateTimeField(auto_now_add=True)
     updated_at = models.DateTimeField(auto_now=True)
 
+    class Meta:
+        indexes = [
+            models.Index(fields=["author", "due_date", "-created_at", "-id"], name="api_task_author_due_idx"),
+            models.Index(fields=["author", "created_at", "id"], name="api_task_author_created_idx"),
+            models.Index(fields=["author", "updated_at", "id"], name="api_task_author_updated_idx"),
+            # Only open, dated tasks: overdue and due-soon lookups stay small
+            # no matter how much completed history piles up.
+            models.Index(
+                fields=["author", "due_date"],
+                name="api_task_open_due_idx",
+                condition=models.Q(completed=False, due_date__isnull=False),
+            ),
+            models.Index(
+                fields=["due_date"],
+                name="api_task_open_due_all_idx",
+                condition=models.Q(completed=False, due_date__isnull=False),
+            ),
+            models.Index(
+                fields=["author"],
+                name="api_task_recurring_idx",
+                condition=~models.Q(recurrence=""),
+            ),
+        ]
+
+    def __str__(self):
+        return self.name
+    
+class TaskOccurrence(models.Model):
+    task = models.ForeignKey(Task, on_delete=models.CASCADE, related_name="occurrences")
+    original_due = models.DateTimeField()
+    due_date = models.DateTimeField(null=True, blank=True)
+    completed = models.BooleanField(default=False)
+    cancelled = models.BooleanField(default=False)
+    updated_at = models.DateTimeField(auto_now=True)
+
+    class Meta:
+        unique_together = (("task", "original_due"),)
+        ordering = ["original_due"]
+        indexes = [
+            models.Index(
+                fields=["task", "original_due"],
+                name="api_occurrence_open_idx",
+                condition=models.Q(completed=False, cancelled=False),
+            ),
+        ]
+
+    def __str__(self):
+        return f"{self.task} @ {self.original_due}"
+
+    @property
+    def effective_due(self):
+        return self.due_date or self.original_due
+    
+class TaskStats(models.Model):
+    author = models.OneToOneField(User, on_delete=models.CASCADE, primary_key=True, related_name="task_stats")
+    total_tasks = models.IntegerField(default=0)
+    completed_tasks = models.IntegerField(default=0)
+    updated_at = models.DateTimeField(auto_now=True)
+
+    def __str__(self):
+        return f"Task stats for {self.author}"
+
+class TagStats(models.Model):
+    # Per-tag counters over the author's tasks, kept alongside TaskStats.
+    author = models.ForeignKey(User, on_delete=models.CASCADE, related_name="tag_stats")
+    tag = models.ForeignKey(Tag, on_delete=models.CASCADE, related_name="stats")
+    total_tasks = models.IntegerField(default=0)
+    completed_tasks = models.IntegerField(default=0)
+    updated_at = models.DateTimeField(auto_now=True)
+
+    class Meta:
+        unique_together = (("author", "tag"),)
+
+    def __str__(self):
+        return f"Tag stats for {self.tag} of {self.author}"
+    
+class ChangeMarker(models.Model):
+    author = models.OneToOneField(User, on_delete=models.CASCADE, primary_key=True, related_name="change_marker")
+    version = models.BigIntegerField(default=0)
+    updated_at = models.DateTimeField(null=True, blank=True)
+
+    def __str__(self):
+        return f"{self.author} @ {self.version}"
+    
+class Tombstone(models.Model):
+    TASK = "task"
+    NOTE = "note"
+    TAG = "tag"
+    OCCURRENCE = "occurrence"
+    KIND_CHOICES = [(TASK, "Task"), (NOTE, "Note"), (TAG, "Tag"), (OCCURRENCE, "Occurrence")]
+
+    author = models.ForeignKey(User, on_delete=models.CASCADE, related_name="tombstones")
+    kind = models.CharField(max_length=10, choices=KIND_CHOICES)
+    object_id = models.BigIntegerField()
+    deleted_at = models.DateTimeField(default=timezone.now)
+
+    class Meta:
+        indexes = [
+            models.Index(fields=["author", "deleted_at"], name="api_tombstone_author_idx"),
+        ]
+
+    def __str__(self):
+        return f"{self.kind} {self.object_id} deleted"
+    
+class PomodoroSession(models.Model):
+    task = models.ForeignKey(Task, on_delete=models.CASCADE, related_name="pomodoro_sessions")
+    author = models.ForeignKey(User, on_delete=models.CASCADE, related_name="pomodoro_sessions")
+    started_at = models.DateTimeField()
+    ended_at = models.DateTimeField()
+    duration = models.DurationField()
+
+    class Meta:
+        indexes = [
+            models.Index(fields=["author", "started_at"], name="api_pomodoro_author_idx"),
+        ]
+
+    def __str__(self):
+        return f"{self.task} ({self.duration})"
+    
+class PomodoroRollup(models.Model):
+    author = models.ForeignKey(User, on_delete=models.CASCADE, related_name="+")
+    start = models.DateField()
+    total_time = models.DurationField(default=timedelta())
+    session_count = models.IntegerField(default=0)
+
+    class Meta:
+        abstract = True
+        unique_together = (("author", "start"),)
+        ordering = ["start"]
+
+    def __str__(self):
+        return f"{self.author} {self.start}: {self.total_time}"
+    
+class PomodoroDailyRollup(PomodoroRollup):
+    pass
+    
+class PomodoroWeeklyRollup(PomodoroRollup):
+    pass
+    
+class ImportJob(models.Model):
+    RUNNING = "running"
+    COMPLETED = "completed"
+    FAILED = "failed"
+    STATUS_CHOICES = [(RUNNING, "Running"), (COMPLETED, "Completed"), (FAILED, "Failed")]
+
+    author = models.ForeignKey(User, on_delete=models.CASCADE, related_name="import_jobs")
+    source = models.CharField(max_length=255, blank=True)
+    format = models.CharField(max_length=10)
+    status = models.CharField(max_length=10, choices=STATUS_CHOICES, default=RUNNING)
+    records_processed = models.IntegerField(default=0)
+    records_skipped = models.IntegerField(default=0)
+    tasks_created = models.IntegerField(default=0)
+    notes_created = models.IntegerField(default=0)
+    tags_created = models.IntegerField(default=0)
+    last_error = models.TextField(blank=True)
+    created_at = models.DateTimeField(auto_now_add=True)
+    updated_at = models.DateTimeField(auto_now=True)
+
+    def __str__(self):
+        return f"Import {self.pk} ({self.status})"
+    
+class Reminder(models.Model):
+    task = models.ForeignKey(Task, on_delete=models.CASCADE, related_name="reminders")
+    author = models.ForeignKey(User, on_delete=models.CASCADE, related_name="reminders")
+    due_date = models.DateTimeField()
+    created_at = models.DateTimeField(auto_now_add=True)
+    delivered_at = models.DateTimeField(null=True, blank=True)
+
+    class Meta:
+        # One reminder per due date; moving the due date queues a new one.
+        unique_together = (("task", "due_date"),)
+        indexes = [
+            models.Index(
+                fields=["author", "created_at"],
+                name="api_reminder_pending_idx",
+                condition=models.Q(delivered_at__isnull=True),
+            ),
+        ]
+
     def __str__(self):
-        return self.name
\ No newline at end of file
+        return f"Reminder for {self.task} at {self.due_date}"
@@ -0,0 +1,63 @@
+from datetime import timedelta
+from django.db import IntegrityError, transaction
+from django.db.models import F
+from django.utils import timezone
+from .models import PomodoroDailyRollup, PomodoroSession, PomodoroWeeklyRollup
+
+ROLLUPS = {
+    "day": PomodoroDailyRollup,
+    "week": PomodoroWeeklyRollup,
+}
+
+
+def period_start(day, period):
+    if period == "week":
+        return day - timedelta(days=day.weekday())
+    return day
+
+def next_period(start, period):
+    return start + timedelta(days=7 if period == "week" else 1)
+
+def add_to_rollup(model, user, start, duration):
+    # Increment in the database so concurrent sessions never overwrite each
+    # other; the first session of a period creates the row.
+    increment = {"total_time": F("total_time") + duration, "session_count": F("session_count") + 1}
+    if model.objects.filter(author=user, start=start).update(**increment):
+        return
+    try:
+        with transaction.atomic():
+            model.objects.create(author=user, start=start, total_time=duration, session_count=1)
+    except IntegrityError:
+        model.objects.filter(author=user, start=start).update(**increment)
+
+def record_session(task, started_at, ended_at):
+    session = PomodoroSession.objects.create(
+        task=task,
+        author=task.author,
+        started_at=started_at,
+        ended_at=ended_at,
+        duration=ended_at - started_at,
+    )
+    day = timezone.localdate(started_at)
+    for period, model in ROLLUPS.items():
+        add_to_rollup(model, task.author, period_start(day, period), session.duration)
+    return session
+
+def focus_time(user, start, end, period):
+    start = period_start(start, period)
+    rollups = {
+        rollup.start: rollup
+        for rollup in ROLLUPS[period].objects.filter(author=user, start__gte=start, start__lte=end)
+    }
+
+    results = []
+    current = start
+    while current <= end:
+        rollup = rollups.get(current)
+        results.append({
+            "start": current.isoformat(),
+            "total_seconds": int(rollup.total_time.total_seconds()) if rollup else 0,
+            "session_count": rollup.session_count if rollup else 0,
+        })
+        current = next_period(current, period)
+    return results
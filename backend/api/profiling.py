@@ -0,0 +1,186 @@
+import json
+import logging
+import random
+import threading
+from contextlib import contextmanager
+from contextvars import ContextVar
+from time import perf_counter
+
+from asgiref.sync import iscoroutinefunction, markcoroutinefunction
+from django.conf import settings
+from django.core.exceptions import MiddlewareNotUsed
+from django.db import connections
+from django.db.backends.signals import connection_created
+
+from .authentication import loaded_user
+
+logger = logging.getLogger("api.profiling")
+
+# Both are context variables, so they follow the request onto the pool
+# threads sync_to_async runs its queries on (async views use several at once).
+current_profile = ContextVar("current_profile", default=None)
+# (name, [SQL seconds]) for the spans open in this context.
+active_spans = ContextVar("active_spans", default=())
+
+class RequestProfile:
+    def __init__(self):
+        self.started = perf_counter()
+        self.timings = {}
+        self.queries = []
+        self.db_time = 0.0
+        self.lock = threading.Lock()
+
+    def record(self, duration, sql):
+        # Parameters are never kept so the slow-request log doesn't leak user
+        # content.
+        with self.lock:
+            self.db_time += duration
+            self.queries.append((duration, sql))
+            for _, db_time in active_spans.get():
+                db_time[0] += duration
+
+    def add(self, name, duration):
+        with self.lock:
+            self.timings[name] = self.timings.get(name, 0.0) + duration
+
+def profile_queries(execute, sql, params, many, context):
+    # Installed on every connection, on whichever thread opens it, and only
+    # times queries made for a sampled request.
+    profile = current_profile.get()
+    if profile is None:
+        return execute(sql, params, many, context)
+    started = perf_counter()
+    try:
+        return execute(sql, params, many, context)
+    finally:
+        profile.record(perf_counter() - started, sql)
+
+def install_query_profiling(connection, **kwargs):
+    if profile_queries not in connection.execute_wrappers:
+        connection.execute_wrappers.append(profile_queries)
+
+@contextmanager
+def span(name):
+    # Time spent in SQL is reported under "db", so it is left out of the span.
+    # Nested spans of the same name (e.g. per-row serializers inside a list)
+    # only count once; spans on different threads are timed separately.
+    profile = current_profile.get()
+    spans = active_spans.get()
+    if profile is None or any(active == name for active, _ in spans):
+        yield
+        return
+    db_time = [0.0]
+    token = active_spans.set((*spans, (name, db_time)))
+    started = perf_counter()
+    try:
+        yield
+    finally:
+        active_spans.reset(token)
+        profile.add(name, perf_counter() - started - db_time[0])
+
+def server_timing(total, profile=None):
+    entries = []
+    if profile is not None:
+        entries.append(f'db;dur={profile.db_time * 1000:.1f};desc="{len(profile.queries)} queries"')
+        for name, duration in profile.timings.items():
+            entries.append(f"{name};dur={duration * 1000:.1f}")
+    entries.append(f"total;dur={total * 1000:.1f}")
+    return ", ".join(entries)
+
+class RequestProfilingMiddleware:
+    # Enabled with REQUEST_PROFILING. Every request gets its total time in
+    # Server-Timing and is logged when slower than SLOW_REQUEST_MS; only a
+    # REQUEST_PROFILING_SAMPLE_RATE share of requests also wrap the database
+    # cursors and time serialization and rendering. Runs in the handler's
+    # own mode, so ASGI requests don't hop threads here.
+    sync_capable = True
+    async_capable = True
+
+    def __init__(self, get_response):
+        if not settings.REQUEST_PROFILING:
+            raise MiddlewareNotUsed
+        self.get_response = get_response
+        self.sample_rate = settings.REQUEST_PROFILING_SAMPLE_RATE
+        self.slow_request = settings.SLOW_REQUEST_MS / 1000
+        connection_created.connect(install_query_profiling, dispatch_uid="api.profiling")
+        self.async_mode = iscoroutinefunction(get_response)
+        if self.async_mode:
+            markcoroutinefunction(self)
+
+    def __call__(self, request):
+        if self.async_mode:
+            return self.__acall__(request)
+        if random.random() >= self.sample_rate:
+            started = perf_counter()
+            response = self.get_response(request)
+            self.finish(request, response, perf_counter() - started)
+            return response
+
+        profile = self.start_profile()
+        token = current_profile.set(profile)
+        try:
+            response = self.get_response(request)
+        finally:
+            current_profile.reset(token)
+        self.finish(request, response, perf_counter() - profile.started, profile)
+        return response
+
+    async def __acall__(self, request):
+        if random.random() >= self.sample_rate:
+            started = perf_counter()
+            response = await self.get_response(request)
+            self.finish(request, response, perf_counter() - started)
+            return response
+
+        profile = self.start_profile()
+        token = current_profile.set(profile)
+        try:
+            response = await self.get_response(request)
+        finally:
+            current_profile.reset(token)
+        self.finish(request, response, perf_counter() - profile.started, profile)
+        return response
+
+    def start_profile(self):
+        # Connections opened before the middleware was loaded missed the
+        # signal; the ones already open on this thread are covered here.
+        for connection in connections.all(initialized_only=True):
+            install_query_profiling(connection)
+        return RequestProfile()
+
+    def process_template_response(self, request, response):
+        # DRF responses are rendered right after the template response
+        # middleware runs; the post-render callback closes the span.
+        profile = current_profile.get()
+        if profile is not None:
+            started = perf_counter()
+            response.add_post_render_callback(lambda rendered: profile.add("render", perf_counter() - started))
+        return response
+
+    def finish(self, request, response, total, profile=None):
+        response["Server-Timing"] = server_timing(total, profile)
+        if total >= self.slow_request:
+            self.log_slow_request(request, response, total, profile)
+
+    def log_slow_request(self, request, response, total, profile):
+        user = loaded_user(request)
+        record = {
+            "method": request.method,
+            "path": request.get_full_path(),
+            "status": response.status_code,
+            "user_id": user.pk if user is not None and user.is_authenticated else None,
+            "total_ms": round(total * 1000, 1),
+            "sampled": profile is not None,
+        }
+        if profile is not None:
+            slowest = sorted(profile.queries, key=lambda query: query[0], reverse=True)
+            record.update({
+                "db_ms": round(profile.db_time * 1000, 1),
+                "query_count": len(profile.queries),
+                **{f"{name}_ms": round(duration * 1000, 1) for name, duration in profile.timings.items()},
+                "slowest_queries": [
+                    {"ms": round(duration * 1000, 1), "sql": sql}
+                    for duration, sql in slowest[:settings.SLOW_REQUEST_LOG_QUERIES]
+                ],
+            })
+        logger.warning("Slow request %s", json.dumps(record), extra={"request_profile": record})
@@ -0,0 +1,256 @@
+import calendar
+from datetime import datetime, timedelta
+from django.db.models import Exists, OuterRef, Q
+from django.utils import timezone
+from django.utils.dateparse import parse_date, parse_datetime
+from .models import Task, TaskOccurrence
+
+# A subset of RFC 5545 RRULE: FREQ (DAILY, WEEKLY, MONTHLY, YEARLY), INTERVAL,
+# COUNT, UNTIL and BYDAY (weekly rules only). Occurrences are computed from the
+# task's due date in the server's local time, so they keep their wall-clock
+# time across DST changes, and dates that don't exist in a month are skipped.
+FREQUENCIES = ("DAILY", "WEEKLY", "MONTHLY", "YEARLY")
+WEEKDAYS = ("MO", "TU", "WE", "TH", "FR", "SA", "SU")
+MAX_COUNT = 1000
+MAX_INTERVAL = 1000
+
+# Upper bound on occurrences expanded for a single task in one window.
+MAX_EXPANSION = 1000
+
+
+def parse_until(value):
+    if len(value) in (8, 16) and value[:8].isdigit():
+        # Basic RFC 5545 form: 20261231 or 20261231T235959Z
+        value = f"{value[:4]}-{value[4:6]}-{value[6:8]}" + (
+            f"T{value[9:11]}:{value[11:13]}:{value[13:15]}" if len(value) == 16 else ""
+        )
+    parsed = parse_datetime(value)
+    if parsed is None:
+        parsed_date = parse_date(value)
+        if parsed_date is None:
+            return None
+        parsed = datetime.combine(parsed_date, datetime.max.time())
+    if timezone.is_naive(parsed):
+        parsed = timezone.make_aware(parsed)
+    return parsed
+
+def parse_rule(value):
+    parts = {}
+    value = value.strip()
+    if value.upper().startswith("RRULE:"):
+        value = value[6:]
+    for part in value.split(";"):
+        if not part:
+            continue
+        key, sep, part_value = part.partition("=")
+        if not sep:
+            raise ValueError(f"Invalid rule part: {part}")
+        parts[key.strip().upper()] = part_value.strip()
+
+    freq = parts.pop("FREQ", "").upper()
+    if freq not in FREQUENCIES:
+        raise ValueError(f"FREQ must be one of {', '.join(FREQUENCIES)}")
+    rule = {"freq": freq, "interval": 1, "count": None, "until": None, "byday": []}
+
+    try:
+        if "INTERVAL" in parts:
+            rule["interval"] = int(parts.pop("INTERVAL"))
+        if "COUNT" in parts:
+            rule["count"] = int(parts.pop("COUNT"))
+    except ValueError:
+        raise ValueError("INTERVAL and COUNT must be integers")
+    if not 1 <= rule["interval"] <= MAX_INTERVAL:
+        raise ValueError(f"INTERVAL must be between 1 and {MAX_INTERVAL}")
+    if rule["count"] is not None and not 1 <= rule["count"] <= MAX_COUNT:
+        raise ValueError(f"COUNT must be between 1 and {MAX_COUNT}")
+
+    if "UNTIL" in parts:
+        rule["until"] = parse_until(parts.pop("UNTIL"))
+        if rule["until"] is None:
+            raise ValueError("Invalid UNTIL date")
+    if rule["count"] is not None and rule["until"] is not None:
+        raise ValueError("COUNT and UNTIL can't be combined")
+
+    if "BYDAY" in parts:
+        if freq != "WEEKLY":
+            raise ValueError("BYDAY is only supported for weekly rules")
+        days = [day.strip().upper() for day in parts.pop("BYDAY").split(",")]
+        if not days or any(day not in WEEKDAYS for day in days):
+            raise ValueError(f"BYDAY must list days from {', '.join(WEEKDAYS)}")
+        rule["byday"] = sorted({WEEKDAYS.index(day) for day in days})
+
+    if parts:
+        raise ValueError(f"Unsupported rule parts: {', '.join(sorted(parts))}")
+    return rule
+
+def add_months(moment, months):
+    month_index = moment.month - 1 + months
+    year, month = moment.year + month_index // 12, month_index % 12 + 1
+    if moment.day > calendar.monthrange(year, month)[1]:
+        return None
+    return moment.replace(year=year, month=month)
+
+def periods_before(rule, base, moment):
+    # Whole periods between the rule start and `moment`, so expansion can
+    # start near a window instead of walking from the first occurrence.
+    if moment <= base:
+        return 0
+    if rule["freq"] == "DAILY":
+        elapsed = (moment - base).days
+    elif rule["freq"] == "WEEKLY":
+        elapsed = (moment - base).days // 7
+    elif rule["freq"] == "MONTHLY":
+        elapsed = (moment.year - base.year) * 12 + moment.month - base.month
+    else:
+        elapsed = moment.year - base.year
+    return max(0, elapsed // rule["interval"] - 1)
+
+def period_candidates(rule, base, period):
+    step = period * rule["interval"]
+    if rule["freq"] == "DAILY":
+        return [base + timedelta(days=step)]
+    if rule["freq"] == "WEEKLY":
+        if not rule["byday"]:
+            return [base + timedelta(weeks=step)]
+        monday = base - timedelta(days=base.weekday()) + timedelta(weeks=step)
+        return [monday + timedelta(days=day) for day in rule["byday"]]
+    months = step if rule["freq"] == "MONTHLY" else step * 12
+    candidate = add_months(base, months)
+    return [candidate] if candidate else []
+
+def occurrences(rule, dtstart, start=None, end=None, limit=MAX_EXPANSION):
+    # Yields occurrence datetimes in order, from `start` (inclusive) up to
+    # `end` (exclusive) when given. The first occurrence is dtstart itself.
+    tz = timezone.get_current_timezone()
+    base = timezone.localtime(dtstart, tz).replace(tzinfo=None)
+    until = rule["until"]
+    counted = rule["count"] is not None
+
+    period = 0
+    if start is not None and not counted:
+        period = periods_before(rule, base, timezone.localtime(start, tz).replace(tzinfo=None))
+
+    emitted = produced = 0
+    while True:
+        try:
+            candidates = period_candidates(rule, base, period)
+        except (OverflowError, ValueError):
+            # Past the last date a datetime can hold.
+            return
+        for candidate in candidates:
+            if candidate < base:
+                continue
+            moment = timezone.make_aware(candidate, tz)
+            if until is not None and moment > until:
+                return
+            produced += 1
+            if counted and produced > rule["count"]:
+                return
+            if end is not None and moment >= end:
+                return
+            if start is None or moment >= start:
+                yield moment
+                emitted += 1
+                if emitted >= limit:
+                    return
+        period += 1
+
+def recurrence_end(rule, dtstart):
+    # Last possible occurrence, used to skip finished series without parsing
+    # their rules; None means the series never ends.
+    if rule["until"] is not None:
+        return rule["until"]
+    if rule["count"] is not None:
+        produced = 0
+        last = None
+        for last in occurrences(rule, dtstart, limit=rule["count"]):
+            produced += 1
+        if produced < rule["count"]:
+            raise ValueError("COUNT runs past the last supported date")
+        return last
+    return None
+
+def is_occurrence(rule, dtstart, moment):
+    return any(occurrence == moment for occurrence in occurrences(rule, dtstart, start=moment, end=moment + timedelta(microseconds=1)))
+
+def task_rule(task):
+    try:
+        return parse_rule(task.recurrence)
+    except ValueError:
+        return None
+
+def series_in_window(start, end):
+    # Recurring tasks that may have occurrences in [start, end), either by
+    # their rule or because one was moved into it.
+    moved_in = TaskOccurrence.objects.filter(task=OuterRef("pk"), due_date__gte=start, due_date__lt=end)
+    by_rule = Q(due_date__lt=end) & (Q(recurrence_end__isnull=True) | Q(recurrence_end__gte=start))
+    return ~Q(recurrence="") & (by_rule | Exists(moved_in))
+
+def expand_series(tasks, start, end):
+    # (task, original due, override) for every occurrence shown in the window,
+    # including occurrences moved into it from elsewhere. Cancelled ones and
+    # ones moved out of the window are left out.
+    if not tasks:
+        return []
+    overrides = {
+        (override.task_id, override.original_due): override
+        for override in TaskOccurrence.objects.filter(task__in=tasks).filter(
+            Q(original_due__gte=start, original_due__lt=end) | Q(due_date__gte=start, due_date__lt=end)
+        )
+    }
+    tasks_by_id = {task.pk: task for task in tasks}
+    expanded = []
+    for task in tasks:
+        rule = task_rule(task)
+        if rule is None:
+            continue
+        for moment in occurrences(rule, task.due_date, start, end):
+            expanded.append((task, moment, overrides.pop((task.pk, moment), None)))
+    expanded.extend((tasks_by_id[task_id], original_due, override) for (task_id, original_due), override in overrides.items())
+    return [
+        (task, original_due, override) for task, original_due, override in expanded
+        if override is None or (not override.cancelled and start <= override.effective_due < end)
+    ]
+
+def first_open_occurrence(rule, dtstart, touched, start=None):
+    # Earliest occurrence from `start` on that has no stored override.
+    # `touched` holds the overridden original dues from `start` on, so at
+    # most one more occurrence than that is walked.
+    for moment in occurrences(rule, dtstart, start=start, limit=len(touched) + 1):
+        if moment not in touched:
+            return moment
+    return None
+
+def next_open_due_after(task, rule, original_due, stored):
+    # The series watermark (Task.next_open_due) once the override for
+    # `original_due` has been stored or dropped. Only overrides from the
+    # changed occurrence on are read, never the series' history.
+    current = task.next_open_due
+    if not stored:
+        return original_due if current is None or original_due < current else current
+    if original_due != current:
+        return current
+    touched = set(TaskOccurrence.objects.filter(task=task, original_due__gte=original_due).values_list("original_due", flat=True))
+    return first_open_occurrence(rule, task.due_date, touched, start=original_due)
+
+def open_series_dues(user):
+    # Due dates of each open series' earliest untouched occurrence (its
+    # stored watermark) and of its overridden occurrences still open.
+    # Completed and cancelled overrides are history and never read.
+    series = Task.objects.filter(author=user, completed=False, due_date__isnull=False).exclude(recurrence="")
+    dues = {task_id: [next_open_due] if next_open_due else [] for task_id, next_open_due in series.values_list("id", "next_open_due")}
+    if not dues:
+        return {}
+    open_overrides = TaskOccurrence.objects.filter(task__in=list(dues), completed=False, cancelled=False).order_by()
+    for task_id, due_date, original_due in open_overrides.values_list("task_id", "due_date", "original_due"):
+        dues[task_id].append(due_date or original_due)
+    return dues
+
+def overdue_series_ids(user, now=None):
+    now = now or timezone.now()
+    return [task_id for task_id, dues in open_series_dues(user).items() if any(due < now for due in dues)]
+
+def next_series_due(user, now=None):
+    now = now or timezone.now()
+    upcoming = [due for dues in open_series_dues(user).values() for due in dues if due > now]
+    return min(upcoming, default=None)
@@ -0,0 +1,42 @@
+from datetime import timedelta
+from django.conf import settings
+from django.db import connections, router
+from django.db.models import DateTimeField, Exists, OuterRef, Value
+from django.utils import timezone
+from .models import Reminder, Task
+
+
+def reminder_window():
+    return timedelta(minutes=getattr(settings, "REMINDER_WINDOW_MINUTES", 15))
+
+def open_tasks_due_between(start, end):
+    # Matches the api_task_open_due_all_idx predicate, so this is a range scan
+    # over open, dated tasks only.
+    return Task.objects.filter(completed=False, due_date__isnull=False, due_date__gte=start, due_date__lt=end)
+
+def enqueue_reminders(now=None, window=None):
+    # Scans overlap from run to run; the (task, due_date) constraint keeps a
+    # task from being queued twice for the same due date. One INSERT ... SELECT
+    # queues the whole scan, so its row count is what was actually inserted,
+    # even when another scanner queued some of the same tasks first.
+    now = now or timezone.now()
+    window = window or reminder_window()
+    queued = Reminder.objects.filter(task=OuterRef("pk"), due_date=OuterRef("due_date"))
+    db = router.db_for_write(Reminder)
+    rows = (
+        open_tasks_due_between(now, now + window)
+        .using(db)
+        .filter(~Exists(queued))
+        .order_by()
+        .values_list("id", "author_id", "due_date", Value(now, output_field=DateTimeField()))
+    )
+    connection = connections[db]
+    select, params = rows.query.get_compiler(db).as_sql()
+    columns = ", ".join(
+        connection.ops.quote_name(Reminder._meta.get_field(name).column)
+        for name in ("task", "author", "due_date", "created_at")
+    )
+    table = connection.ops.quote_name(Reminder._meta.db_table)
+    with connection.cursor() as cursor:
+        cursor.execute(f"INSERT INTO {table} ({columns}) {select} ON CONFLICT DO NOTHING", params)
+        return cursor.rowcount
@@ -0,0 +1,143 @@
+import random
+from contextlib import contextmanager
+from contextvars import ContextVar
+
+from asgiref.sync import iscoroutinefunction, markcoroutinefunction
+from django.conf import settings
+from django.core.cache import cache
+from django.core.exceptions import MiddlewareNotUsed
+from rest_framework.permissions import SAFE_METHODS
+from rest_framework_simplejwt.exceptions import InvalidToken, TokenError
+from rest_framework_simplejwt.settings import api_settings
+
+from .authentication import CookieJWTAuthentication, loaded_user
+
+STICKY_COOKIE = "db_primary"
+
+# The replica the current request reads from, or None for the primary.
+# Management commands and background jobs never set it.
+read_database = ContextVar("read_database", default=None)
+
+authentication = CookieJWTAuthentication()
+
+
+@contextmanager
+def use_primary():
+    # For reads whose result outlives the request (cached or written back),
+    # where replica lag would otherwise be kept around.
+    token = read_database.set(None)
+    try:
+        yield
+    finally:
+        read_database.reset(token)
+
+def replica_aliases():
+    return [alias for alias in settings.DATABASES if alias.startswith("replica")]
+
+def sticky_key(user_id):
+    return f"db:primary:{user_id}"
+
+def token_user_id(request):
+    # Only the token's signature and expiry are checked; the user row isn't
+    # loaded, since that read would itself have to pick a database.
+    raw_token = request.COOKIES.get("access_token")
+    if not raw_token:
+        return None
+    try:
+        return authentication.get_validated_token(raw_token).get(api_settings.USER_ID_CLAIM)
+    except (InvalidToken, TokenError):
+        return None
+
+class ReplicaRouter:
+    # Writes always go to the primary. Reads go to the replica picked for
+    # the request, if any, so one request never mixes replicas.
+    def db_for_read(self, model, **hints):
+        return read_database.get()
+
+    def db_for_write(self, model, **hints):
+        return "default"
+
+    def allow_relation(self, obj1, obj2, **hints):
+        return True
+
+class ReplicaRoutingMiddleware:
+    # Safe requests read from a random replica unless the client, or the
+    # same user on another device, wrote within DB_REPLICA_STICKY_SECONDS,
+    # so nobody reads data older than their own last write. The per-user
+    # mark needs a cache shared by all processes to work across them.
+    # Runs in the handler's own mode, so ASGI requests don't hop threads here.
+    sync_capable = True
+    async_capable = True
+
+    def __init__(self, get_response):
+        self.replicas = replica_aliases()
+        if not self.replicas:
+            raise MiddlewareNotUsed
+        self.get_response = get_response
+        self.sticky_seconds = settings.DB_REPLICA_STICKY_SECONDS
+        self.async_mode = iscoroutinefunction(get_response)
+        if self.async_mode:
+            markcoroutinefunction(self)
+
+    def __call__(self, request):
+        if self.async_mode:
+            return self.__acall__(request)
+        database = None
+        if request.method in SAFE_METHODS and not self.is_sticky(request):
+            database = random.choice(self.replicas)
+
+        token = read_database.set(database)
+        try:
+            response = self.get_response(request)
+        finally:
+            read_database.reset(token)
+
+        if request.method not in SAFE_METHODS:
+            user_id = self.stick(request, response)
+            if user_id is not None:
+                cache.set(sticky_key(user_id), 1, self.sticky_seconds)
+        return response
+
+    async def __acall__(self, request):
+        database = None
+        if request.method in SAFE_METHODS and not await self.ais_sticky(request):
+            database = random.choice(self.replicas)
+
+        token = read_database.set(database)
+        try:
+            response = await self.get_response(request)
+        finally:
+            read_database.reset(token)
+
+        if request.method not in SAFE_METHODS:
+            user_id = self.stick(request, response)
+            if user_id is not None:
+                await cache.aset(sticky_key(user_id), 1, self.sticky_seconds)
+        return response
+
+    def is_sticky(self, request):
+        if STICKY_COOKIE in request.COOKIES:
+            return True
+        user_id = token_user_id(request)
+        return user_id is not None and cache.get(sticky_key(user_id)) is not None
+
+    async def ais_sticky(self, request):
+        if STICKY_COOKIE in request.COOKIES:
+            return True
+        user_id = token_user_id(request)
+        return user_id is not None and await cache.aget(sticky_key(user_id)) is not None
+
+    def stick(self, request, response):
+        # Returns the writer's id for the per-user mark, if known.
+        response.set_cookie(
+            STICKY_COOKIE,
+            "1",
+            max_age=self.sticky_seconds,
+            httponly=True,
+            secure=not settings.DEBUG,
+            samesite="Lax",
+        )
+        user = loaded_user(request)
+        if user is not None and user.is_authenticated:
+            return user.pk
+        return None
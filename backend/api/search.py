@@ -0,0 +1,153 @@
+import re
+from django.db import connections
+from django.db.models import BooleanField, F, FloatField, Func, Q, Value
+from django.db.models.expressions import RawSQL
+from rest_framework import filters
+
+# Columns covered by the full-text index of each table. On PostgreSQL they feed
+# a stored, weighted tsvector column with a GIN index; on SQLite they are
+# mirrored into an external-content FTS5 table kept in sync by triggers.
+# Neither side stems words, so prefix queries keep matching while the user types.
+SEARCH_COLUMNS = {
+    "api_task": ("name", "description"),
+    "api_note": ("name", "notes"),
+}
+
+SEARCH_CONFIG = "simple"
+
+
+def postgresql_search_sql(table, columns):
+    weights = "ABCD"
+    vector = " || ".join(
+        f"setweight(to_tsvector('{SEARCH_CONFIG}', coalesce({column}, '')), '{weights[i]}')"
+        for i, column in enumerate(columns)
+    )
+    return [
+        f"ALTER TABLE {table} ADD COLUMN IF NOT EXISTS search_vector tsvector GENERATED ALWAYS AS ({vector}) STORED",
+        f"CREATE INDEX IF NOT EXISTS {table}_search_idx ON {table} USING GIN (search_vector)",
+    ]
+
+def sqlite_search_sql(table, columns):
+    fts = f"{table}_fts"
+    names = ", ".join(columns)
+    new_values = ", ".join(f"new.{column}" for column in columns)
+    old_values = ", ".join(f"old.{column}" for column in columns)
+    return [
+        f"CREATE VIRTUAL TABLE IF NOT EXISTS {fts} USING fts5({names}, content='{table}', content_rowid='id', tokenize='unicode61 remove_diacritics 2')",
+        f"CREATE TRIGGER IF NOT EXISTS {fts}_ai AFTER INSERT ON {table} BEGIN "
+        f"INSERT INTO {fts}(rowid, {names}) VALUES (new.id, {new_values}); END",
+        f"CREATE TRIGGER IF NOT EXISTS {fts}_ad AFTER DELETE ON {table} BEGIN "
+        f"INSERT INTO {fts}({fts}, rowid, {names}) VALUES ('delete', old.id, {old_values}); END",
+        f"CREATE TRIGGER IF NOT EXISTS {fts}_au AFTER UPDATE OF {names} ON {table} BEGIN "
+        f"INSERT INTO {fts}({fts}, rowid, {names}) VALUES ('delete', old.id, {old_values}); "
+        f"INSERT INTO {fts}(rowid, {names}) VALUES (new.id, {new_values}); END",
+    ]
+
+def install_search_schema(connection, rebuild=False):
+    with connection.cursor() as cursor:
+        for table, columns in SEARCH_COLUMNS.items():
+            if connection.vendor == "postgresql":
+                statements = postgresql_search_sql(table, columns)
+            elif connection.vendor == "sqlite":
+                statements = sqlite_search_sql(table, columns)
+                if rebuild:
+                    statements.append(f"INSERT INTO {table}_fts({table}_fts) VALUES ('rebuild')")
+            else:
+                continue
+            for statement in statements:
+                cursor.execute(statement)
+
+def uninstall_search_schema(connection):
+    with connection.cursor() as cursor:
+        for table in SEARCH_COLUMNS:
+            if connection.vendor == "postgresql":
+                cursor.execute(f"DROP INDEX IF EXISTS {table}_search_idx")
+                cursor.execute(f"ALTER TABLE {table} DROP COLUMN IF EXISTS search_vector")
+            elif connection.vendor == "sqlite":
+                for suffix in ("ai", "ad", "au"):
+                    cursor.execute(f"DROP TRIGGER IF EXISTS {table}_fts_{suffix}")
+                cursor.execute(f"DROP TABLE IF EXISTS {table}_fts")
+
+def ensure_search_schema(sender, using="default", **kwargs):
+    # SQLite rebuilds tables for most ALTERs, which silently drops the sync
+    # triggers, so they are recreated after every migrate run.
+    from django.db.migrations.recorder import MigrationRecorder
+
+    connection = connections[using]
+    if connection.vendor != "sqlite":
+        return
+    applied = MigrationRecorder(connection).applied_migrations()
+    if ("api", "0008_search_index") in applied:
+        install_search_schema(connection)
+
+class TableSQL(Func):
+    # Raw SQL on the searched table, with "{table}" standing for the alias the
+    # query gives it. A nested queryset renames the table (to U0 and so on),
+    # which a hard-coded table name would not follow.
+    def __init__(self, sql, params, output_field):
+        super().__init__(F("pk"), output_field=output_field)
+        self.sql = sql
+        self.sql_params = params
+
+    def as_sql(self, compiler, connection, **extra_context):
+        alias = self.get_source_expressions()[0].alias
+        return self.sql.format(table=compiler.quote_name_unless_alias(alias)), list(self.sql_params)
+
+def search_terms(value):
+    return re.findall(r"\w+", value)
+
+def search_queryset(queryset, value):
+    terms = search_terms(value)
+    if not terms:
+        return queryset
+
+    connection_vendor = connections[queryset.db].vendor
+    table = queryset.model._meta.db_table
+    columns = SEARCH_COLUMNS[table]
+
+    if connection_vendor == "postgresql":
+        query = " & ".join(f"{term}:*" for term in terms)
+        tsquery = f"to_tsquery('{SEARCH_CONFIG}', %s)"
+        return queryset.filter(
+            TableSQL(f"{{table}}.search_vector @@ {tsquery}", [query], output_field=BooleanField())
+        ).annotate(
+            search_rank=TableSQL(f"ts_rank({{table}}.search_vector, {tsquery})", [query], output_field=FloatField())
+        )
+
+    if connection_vendor == "sqlite":
+        # bm25() only works in the query that runs the MATCH, so the ranks are
+        # computed once in a subquery that LIMIT -1 keeps SQLite from
+        # flattening: it is materialized with an automatic index on rowid
+        # instead of re-running the MATCH for every matching row.
+        query = " ".join(f'"{term}"*' for term in terms)
+        fts = f"{table}_fts"
+        ranks = f"SELECT rowid, -bm25({fts}) AS rank FROM {fts} WHERE {fts} MATCH %s LIMIT -1"
+        return queryset.filter(
+            id__in=RawSQL(f"SELECT rowid FROM {fts} WHERE {fts} MATCH %s", [query])
+        ).annotate(
+            search_rank=TableSQL(
+                f"(SELECT ranks.rank FROM ({ranks}) AS ranks WHERE ranks.rowid = {{table}}.id)",
+                [query],
+                output_field=FloatField(),
+            )
+        )
+
+    condition = Q()
+    for term in terms:
+        term_condition = Q()
+        for column in columns:
+            term_condition |= Q(**{f"{column}__icontains": term})
+        condition &= term_condition
+    return queryset.filter(condition).annotate(search_rank=Value(0.0, output_field=FloatField()))
+
+class FullTextSearchFilter(filters.SearchFilter):
+    def filter_queryset(self, request, queryset, view):
+        value = request.query_params.get(self.search_param, "")
+        return search_queryset(queryset, value)
+
+class SearchRankOrderingFilter(filters.OrderingFilter):
+    # Ranked search results come first unless the client picked an ordering.
+    def get_ordering(self, request, queryset, view):
+        if not request.query_params.get(self.ordering_param) and "search_rank" in queryset.query.annotations:
+            return ["-search_rank", *(self.get_default_ordering(view) or [])]
+        return super().get_ordering(request, queryset, view)
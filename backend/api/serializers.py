@@ -1,8 +1,22 @@
 from rest_framework import serializers
-from .models import Tag, Note, Task
+from rest_framework.relations import MANY_RELATION_KWARGS
+from django.db import transaction
+from django.db.models import Q
+from django.utils import timezone
+from .models import Tag, Note, Task, TaskOccurrence, ImportJob
+from .recurrence import first_open_occurrence, parse_rule, recurrence_end
+from .profiling import span
+from .tagging import tag_array_enabled
 from django.contrib.auth.models import User
 
-class UserSerializer(serializers.ModelSerializer):
+BULK_BATCH_SIZE = 500
+
+class TimedSerializerMixin:
+    def to_representation(self, instance):
+        with span("serialize"):
+            return super().to_representation(instance)
+
+class UserSerializer(TimedSerializerMixin, serializers.ModelSerializer):
     class Meta:
         model = User
         fields = ['id', 'username', 'first_name', 'last_name', 'password']
@@ -25,7 +39,7 @@ class UserSerializer(serializers.ModelSerializer):
             raise serializers.ValidationError("A user with this username already exists.")
         return value
 
-class TagSerializer(serializers.ModelSerializer):
+class TagSerializer(TimedSerializerMixin, serializers.ModelSerializer):
     class Meta:
         model = Tag
         fields = "__all__"
@@ -35,9 +49,125 @@ class TagSerializer(serializers.ModelSerializer):
         validated_data["author"] = self.context["request"].user
         return super().create(validated_data)
         
-class NoteSerializer(serializers.ModelSerializer):
+def visible_tags(user):
+    return Tag.objects.filter(Q(author__isnull=True) | Q(author=user))
+
+def resolve_tag_ids(user, tag_ids):
+    if not tag_ids:
+        return {}
+    return {tag.pk: tag for tag in visible_tags(user).filter(pk__in=tag_ids)}
+
+def collect_tag_ids(items):
+    tag_ids = set()
+    for item in items:
+        if not isinstance(item, dict):
+            continue
+        for tag_id in item.get("tag_ids") or []:
+            try:
+                tag_ids.add(int(tag_id))
+            except (TypeError, ValueError):
+                pass
+    return tag_ids
+
+class TagIdListField(serializers.ManyRelatedField):
+    # Resolves the whole list with one query scoped to the user's visible
+    # tags. Bulk writes resolve every row up front and share the result
+    # through the serializer context.
+    def to_internal_value(self, data):
+        if isinstance(data, str) or not hasattr(data, "__iter__"):
+            self.fail("not_a_list", input_type=type(data).__name__)
+        if not self.allow_empty and len(data) == 0:
+            self.fail("empty")
+
+        tag_ids = []
+        for value in data:
+            if isinstance(value, bool):
+                self.child_relation.fail("incorrect_type", data_type=type(value).__name__)
+            try:
+                tag_id = int(value)
+            except (TypeError, ValueError):
+                self.child_relation.fail("incorrect_type", data_type=type(value).__name__)
+            if tag_id not in tag_ids:
+                tag_ids.append(tag_id)
+
+        lookup = self.context.get("tag_lookup")
+        if lookup is None:
+            lookup = resolve_tag_ids(self.context["request"].user, tag_ids)
+
+        tags = []
+        for tag_id in tag_ids:
+            if tag_id not in lookup:
+                self.child_relation.fail("does_not_exist", pk_value=tag_id)
+            tags.append(lookup[tag_id])
+        return tags
+
+class TagPrimaryKeyRelatedField(serializers.PrimaryKeyRelatedField):
+    @classmethod
+    def many_init(cls, *args, **kwargs):
+        list_kwargs = {"child_relation": cls(*args, **kwargs)}
+        for key in kwargs:
+            if key in MANY_RELATION_KWARGS:
+                list_kwargs[key] = kwargs[key]
+        return TagIdListField(**list_kwargs)
+
+class TaskListSerializer(serializers.ListSerializer):
+    def to_internal_value(self, data):
+        if isinstance(data, list):
+            self.context["tag_lookup"] = resolve_tag_ids(self.context["request"].user, collect_tag_ids(data))
+        self.child_index = 0
+        return super().to_internal_value(data)
+
+    def run_child_validation(self, data):
+        # For bulk updates `instance` is a list in the same order as the data.
+        if self.instance is not None:
+            self.child.instance = self.instance[self.child_index]
+        self.child_index += 1
+        return super().run_child_validation(data)
+
+    def set_tags(self, tag_sets):
+        Through = Task.tags.through
+        Through.objects.filter(task_id__in=[task.pk for task, _ in tag_sets]).delete()
+        Through.objects.bulk_create(
+            [Through(task_id=task.pk, tag_id=tag.pk) for task, tags in tag_sets for tag in tags],
+            batch_size=BULK_BATCH_SIZE,
+        )
+
+    @transaction.atomic
+    def create(self, validated_data):
+        tag_sets = [attrs.pop("tags", None) for attrs in validated_data]
+        tasks = [Task(**attrs, tag_id_array=sorted(tag.pk for tag in tags or [])) for attrs, tags in zip(validated_data, tag_sets)]
+        tasks = Task.objects.bulk_create(tasks, batch_size=BULK_BATCH_SIZE)
+        self.set_tags([(task, tags) for task, tags in zip(tasks, tag_sets) if tags])
+        return tasks
+
+    @transaction.atomic
+    def update(self, instances, validated_data):
+        # Each row only gets the fields its item sent, so a field another
+        # request just changed isn't overwritten with the value read earlier.
+        groups = {}
+        tag_sets = []
+        now = timezone.now()
+        for task, attrs in zip(instances, validated_data):
+            fields = {"updated_at"}
+            tags = attrs.pop("tags", None)
+            if tags is not None:
+                tag_sets.append((task, tags))
+                task.tag_id_array = sorted(tag.pk for tag in tags)
+                fields.add("tag_id_array")
+            for attr, value in attrs.items():
+                setattr(task, attr, value)
+                fields.add(attr)
+            task.updated_at = now
+            groups.setdefault(frozenset(fields), []).append(task)
+        for fields, tasks in groups.items():
+            Task.objects.bulk_update(tasks, sorted(fields), batch_size=BULK_BATCH_SIZE)
+        if tag_sets:
+            self.set_tags(tag_sets)
+        return instances
+
+class NoteSerializer(TimedSerializerMixin, serializers.ModelSerializer):
     tags = TagSerializer(many=True, read_only=True)
-    tag_ids = serializers.PrimaryKeyRelatedField(
+    tag_ids = TagPrimaryKeyRelatedField(
         many=True, 
         queryset=Tag.objects.all(), 
         source='tags', 
@@ -49,10 +179,17 @@ class NoteSerializer(serializers.ModelSerializer):
         model = Note
         fields = "__all__"
         read_only_fields = ["id", "author"]
+
+class NoteSummarySerializer(NoteSerializer):
+    # Lists and the calendar carry the excerpt and body length; the body is
+    # only returned by the detail endpoint.
+    class Meta(NoteSerializer.Meta):
+        fields = None
+        exclude = ["notes"]
     
-class TaskSerializer(serializers.ModelSerializer):
+class TaskSerializer(TimedSerializerMixin, serializers.ModelSerializer):
     tags = TagSerializer(many=True, read_only=True)
-    tag_ids = serializers.PrimaryKeyRelatedField(
+    tag_ids = TagPrimaryKeyRelatedField(
         many=True, 
         queryset=Tag.objects.all(), 
         source='tags', 
@@ -62,6 +199,151 @@ class TaskSerializer(serializers.ModelSerializer):
     
     class Meta:
         model = Task
+        exclude = ["tag_id_array"]
+        read_only_fields = ["id", "author", "created_at", "updated_at", "last_pomodoro_duration", "total_pomodoro_time"]
+        list_serializer_class = TaskListSerializer      
+
+    def validate(self, attrs):
+        if "recurrence" in attrs or "due_date" in attrs:
+            recurrence = attrs.get("recurrence", getattr(self.instance, "recurrence", ""))
+            due_date = attrs.get("due_date", getattr(self.instance, "due_date", None))
+            attrs["recurrence_end"] = None
+            attrs["next_open_due"] = None
+            if recurrence:
+                if due_date is None:
+                    raise serializers.ValidationError({"recurrence": "Recurring tasks need a due date."})
+                try:
+                    rule = parse_rule(recurrence)
+                    attrs["recurrence_end"] = recurrence_end(rule, due_date)
+                except ValueError as e:
+                    raise serializers.ValidationError({"recurrence": str(e)})
+                touched = set(self.instance.occurrences.values_list("original_due", flat=True)) if self.instance else set()
+                attrs["next_open_due"] = first_open_occurrence(rule, due_date, touched)
+        return attrs
+
+class TaskOccurrenceSerializer(TimedSerializerMixin, serializers.ModelSerializer):
+    class Meta:
+        model = TaskOccurrence
+        exclude = ["id", "task"]
+        read_only_fields = ["updated_at"]
+
+class TaskOccurrenceSyncSerializer(TaskOccurrenceSerializer):
+    # Sync responses name the series and the override id, which deletions
+    # are reported by.
+    class Meta(TaskOccurrenceSerializer.Meta):
+        exclude = None
         fields = "__all__"
-        read_only_fields = ["id", "author", "created_at", "updated_at", "last_pomodoro_duration", "total_pomodoro_time"]      
-        
\ No newline at end of file
+        
+class ImportJobSerializer(TimedSerializerMixin, serializers.ModelSerializer):
+    class Meta:
+        model = ImportJob
+        exclude = ["author"]
+        read_only_fields = [field.name for field in ImportJob._meta.fields]
+
+class FlatRowSerializer:
+    # Read-only fast path for list responses. Rows come from queryset.values()
+    # and every column is formatted with the matching ModelSerializer field's
+    # to_representation, so the output is identical to the full serializer
+    # without building a serializer (and a nested TagSerializer) per object.
+    def __init__(self, serializer_class, fields=None, expand=()):
+        serializer = serializer_class()
+        self.model = serializer.Meta.model
+        self.columns = []
+        self.tag_mode = None
+
+        for name, field in serializer.fields.items():
+            if field.write_only or (fields is not None and name not in fields):
+                continue
+            if name == "tags":
+                self.tag_mode = "nested" if fields is None or "tags" in expand else "ids"
+                self.columns.append((name, None, None))
+                continue
+            attname = self.model._meta.get_field(field.source).attname
+            if isinstance(field, serializers.RelatedField):
+                self.columns.append((name, attname, None))
+            else:
+                self.columns.append((name, attname, field.to_representation))
+
+        self.tag_serializer = FlatRowSerializer(TagSerializer) if self.tag_mode == "nested" else None
+        # Tag ids come with the rows instead of from the link table.
+        self.tag_array = bool(self.tag_mode) and hasattr(self.model, "tag_id_array") and tag_array_enabled()
+
+    @classmethod
+    def from_request(cls, serializer_class, request):
+        fields = request.query_params.get("fields")
+        expand = request.query_params.get("expand", "")
+        if fields:
+            fields = {name.strip() for name in fields.split(",") if name.strip()}
+        return cls(serializer_class, fields=fields or None, expand={name.strip() for name in expand.split(",")})
+
+    def values(self, queryset):
+        attnames = {"id"}
+        attnames.update(attname for _, attname, _ in self.columns if attname)
+        if self.tag_array:
+            attnames.add("tag_id_array")
+        for ordering in queryset.query.order_by:
+            if isinstance(ordering, str):
+                attnames.add(ordering.lstrip("-"))
+        return queryset.prefetch_related(None).values(*attnames)
+
+    def tag_links(self, owners):
+        # (object id, tag) pairs in tag order. `owners` is a list of ids or an
+        # id subquery, so the tags can be fetched alongside the rows.
+        through = self.model.tags.through
+        owner = f"{self.model._meta.model_name}_id"
+        links = through.objects.filter(**{f"{owner}__in": owners})
+        if self.tag_mode == "ids":
+            return list(links.values_list(owner, "tag_id"))
+
+        tag_columns = [attname for _, attname, _ in self.tag_serializer.columns]
+        rows = (
+            links.values(owner, *[f"tag__{attname}" for attname in tag_columns])
+            .order_by(*[f"tag__{ordering}" for ordering in Tag._meta.ordering])
+        )
+        return [
+            (row[owner], self.tag_serializer.to_representation({attname: row[f"tag__{attname}"] for attname in tag_columns}))
+            for row in rows
+        ]
+
+    def array_tags(self, rows):
+        # Nested tags still need the tag rows, fetched by primary key and
+        # ranked by the tag ordering; the ids mode needs no query at all.
+        if self.tag_mode == "ids":
+            return {row["id"]: list(row["tag_id_array"]) for row in rows}
+        tag_ids = {tag_id for row in rows for tag_id in row["tag_id_array"]}
+        tag_columns = [attname for _, attname, _ in self.tag_serializer.columns]
+        tag_rows = Tag.objects.filter(pk__in=tag_ids).values("id", *tag_columns) if tag_ids else []
+        tags = {row["id"]: self.tag_serializer.to_representation(row) for row in tag_rows}
+        rank = {tag_id: index for index, tag_id in enumerate(tags)}
+        return {
+            row["id"]: [tags[tag_id] for tag_id in sorted(row["tag_id_array"], key=lambda tag_id: rank.get(tag_id, -1)) if tag_id in tags]
+            for row in rows
+        }
+
+    def tags_for(self, ids, links=None):
+        tags = {object_id: [] for object_id in ids}
+        if links is None:
+            links = self.tag_links(ids) if ids else []
+        for object_id, tag in links:
+            if object_id in tags:
+                tags[object_id].append(tag)
+        return tags
+
+    def to_representation(self, row, tags=None):
+        data = {}
+        for name, attname, to_representation in self.columns:
+            if attname is None:
+                data[name] = tags[row["id"]]
+                continue
+            value = row[attname]
+            data[name] = value if value is None or to_representation is None else to_representation(value)
+        return data
+
+    def serialize(self, rows, links=None):
+        with span("serialize"):
+            rows = list(rows)
+            if self.tag_array:
+                tags = self.array_tags(rows)
+            else:
+                tags = self.tags_for([row["id"] for row in rows], links) if self.tag_mode else None
+            return [self.to_representation(row, tags) for row in rows]
@@ -0,0 +1,41 @@
+from django.contrib.auth.models import User
+from django.db import transaction
+from django.db.models.signals import m2m_changed, post_delete, post_save, pre_delete
+from django.dispatch import receiver
+from .authentication import invalidate_cached_user
+from .cache import invalidate_tags
+from .models import Tag, Task
+from .tagging import sync_tag_ids
+
+
+@receiver(post_save, sender=Tag)
+@receiver(post_delete, sender=Tag)
+def invalidate_tag_cache(sender, instance, **kwargs):
+    # Until the write commits other requests still read the old rows; moving
+    # the generation earlier would let them cache those rows as current.
+    author_id = instance.author_id
+    transaction.on_commit(lambda: invalidate_tags(author_id))
+
+@receiver(post_save, sender=User)
+@receiver(post_delete, sender=User)
+def invalidate_user_cache(sender, instance, **kwargs):
+    invalidate_cached_user(instance.pk)
+
+@receiver(m2m_changed, sender=Task.tags.through)
+def sync_task_tag_array(sender, instance, action, reverse, pk_set, **kwargs):
+    # Covers tags.set()/add()/remove()/clear() from either side, which is how
+    # the single-task serializer and the admin write tags.
+    if reverse and action == "pre_clear":
+        instance._cleared_task_ids = list(instance.tasks.values_list("id", flat=True))
+    if action == "post_clear":
+        sync_tag_ids(instance.__dict__.pop("_cleared_task_ids", []) if reverse else [instance.pk])
+    elif action in ("post_add", "post_remove") and pk_set:
+        sync_tag_ids(pk_set if reverse else [instance.pk])
+
+@receiver(pre_delete, sender=Tag)
+def remember_tagged_tasks(sender, instance, **kwargs):
+    instance._tagged_task_ids = list(Task.tags.through.objects.filter(tag_id=instance.pk).values_list("task_id", flat=True))
+
+@receiver(post_delete, sender=Tag)
+def untag_tasks(sender, instance, **kwargs):
+    sync_tag_ids(instance.__dict__.pop("_tagged_task_ids", []))
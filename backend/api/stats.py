@@ -0,0 +1,213 @@
+from django.conf import settings
+from django.db import IntegrityError, transaction
+from django.contrib.auth.models import User
+from django.db.models import Case, Count, Exists, F, IntegerField, OuterRef, Q, Subquery, Sum, Value, When
+from django.utils import timezone
+from .models import Tag, TagStats, Task, TaskStats
+from .recurrence import overdue_series_ids
+
+
+def stats_table_enabled():
+    return getattr(settings, "TASK_STATS_TABLE", False)
+
+def count_tasks(user):
+    # Recurring tasks are overdue per occurrence, which SQL can't see.
+    now = timezone.now()
+    counts = Task.objects.filter(author=user).aggregate(
+        total_tasks=Count("id"),
+        completed_tasks=Count("id", filter=Q(completed=True)),
+        overdue_tasks=Count("id", filter=Q(completed=False, recurrence="", due_date__lt=now)),
+        open_series=Count("id", filter=Q(completed=False) & ~Q(recurrence="")),
+    )
+    if counts.pop("open_series"):
+        counts["overdue_tasks"] += len(overdue_series_ids(user, now))
+    return counts
+
+def count_overdue_tasks(user):
+    now = timezone.now()
+    open_tasks = Task.objects.filter(author=user, completed=False)
+    counts = User.objects.filter(pk=user.pk).values(
+        overdue=Subquery(
+            open_tasks.filter(recurrence="", due_date__lt=now).values("author").annotate(count=Count("id")).values("count"),
+        ),
+        open_series=Exists(open_tasks.exclude(recurrence="")),
+    ).get()
+    overdue = counts["overdue"] or 0
+    if counts["open_series"]:
+        overdue += len(overdue_series_ids(user, now))
+    return overdue
+
+def tag_stats(user, backfill=True):
+    # Callers that already went through get_stats_row skip its lookup.
+    if stats_table_enabled():
+        if backfill:
+            get_stats_row(user)
+        rows = (
+            TagStats.objects.filter(author=user, total_tasks__gt=0)
+            .values("tag__name")
+            .annotate(count=Sum("total_tasks"), completed_count=Sum("completed_tasks"))
+            .order_by("tag__name")
+        )
+        return [
+            {"tags__name": row["tag__name"], "count": row["count"], "completed_count": row["completed_count"]}
+            for row in rows
+        ]
+    return list(
+        Task.objects.filter(author=user)
+        .values("tags__name")
+        .annotate(count=Count("id"), completed_count=Count("id", filter=Q(completed=True)))
+        .exclude(tags__name__isnull=True)
+    )
+
+def tag_facet_queryset(tasks):
+    # Per-tag counts over an already filtered task queryset, in one grouped
+    # query on the tag links with the filter as a subquery.
+    return (
+        Tag.objects.filter(tasks__in=tasks.values("id"))
+        .values("id", "name")
+        .annotate(count=Count("tasks"))
+        .order_by("-count", "name")
+    )
+
+def tag_facets(tasks):
+    return list(tag_facet_queryset(tasks))
+
+def count_stored_tasks(user):
+    return Task.objects.using("default").filter(author=user).aggregate(
+        total_tasks=Count("id"),
+        completed_tasks=Count("id", filter=Q(completed=True)),
+    )
+
+def count_stored_tag_tasks(user):
+    return (
+        Task.tags.through.objects.using("default").filter(task__author=user)
+        .values("tag_id")
+        .annotate(total_tasks=Count("id"), completed_tasks=Count("id", filter=Q(task__completed=True)))
+    )
+
+def rebuild_tag_stats(user):
+    stats = TagStats.objects.using("default")
+    rows = [TagStats(author=user, **counts) for counts in count_stored_tag_tasks(user)]
+    stats.filter(author=user).exclude(tag_id__in=[row.tag_id for row in rows]).delete()
+    stats.bulk_create(
+        rows,
+        update_conflicts=True,
+        unique_fields=["author", "tag"],
+        update_fields=["total_tasks", "completed_tasks", "updated_at"],
+    )
+
+def get_stats_row(user):
+    row = TaskStats.objects.filter(author=user).first()
+    if row is not None:
+        return row
+
+    # Backfilling happens on the primary even when the request reads from a
+    # replica: counts from a lagging replica would stay wrong in the row for
+    # good, and the row may exist on the primary before the replica sees it.
+    stats = TaskStats.objects.using("default")
+    row = stats.filter(author=user).first()
+    if row is not None:
+        return row
+    try:
+        with transaction.atomic(using="default"):
+            stats.create(author=user, **count_stored_tasks(user))
+    except IntegrityError:
+        return stats.get(author=user)
+
+    # A task committed between that count and the insert found no row to
+    # adjust. Writers update the row once it exists, so counting again while
+    # holding its lock picks up anything they missed.
+    with transaction.atomic(using="default"):
+        row = stats.select_for_update().get(author=user)
+        for field, value in count_stored_tasks(user).items():
+            setattr(row, field, value)
+        row.save(update_fields=["total_tasks", "completed_tasks", "updated_at"])
+        rebuild_tag_stats(user)
+    return row
+
+def task_counts(user):
+    if stats_table_enabled():
+        row = get_stats_row(user)
+        return {
+            "total_tasks": row.total_tasks,
+            "completed_tasks": row.completed_tasks,
+            "overdue_tasks": count_overdue_tasks(user),
+        }
+    return count_tasks(user)
+
+def summarize_task_stats(counts, tags):
+    return {
+        "total_tasks": counts["total_tasks"],
+        "completed_tasks": counts["completed_tasks"],
+        "pending_tasks": counts["total_tasks"] - counts["completed_tasks"],
+        "overdue_tasks": counts["overdue_tasks"],
+        "tag_stats": tags,
+    }
+
+def get_task_stats(user):
+    return summarize_task_stats(task_counts(user), tag_stats(user, backfill=False))
+
+def adjust_task_stats(user, total=0, completed=0):
+    # Rows are kept current even while the table is switched off, so turning
+    # it back on never serves stale counters. Missing rows are rebuilt lazily.
+    if not total and not completed:
+        return
+    TaskStats.objects.filter(author=user).update(
+        total_tasks=F("total_tasks") + total,
+        completed_tasks=F("completed_tasks") + completed,
+        updated_at=timezone.now(),
+    )
+
+def task_tag_links(task_ids):
+    # (tag id, completed) for every tag of the given tasks, taken before and
+    # after a write to move the per-tag counters by the difference.
+    return list(Task.tags.through.objects.filter(task_id__in=task_ids).values_list("tag_id", "task__completed"))
+
+def tag_deltas(removed, added):
+    deltas = {}
+    for links, sign in ((removed, -1), (added, 1)):
+        for tag_id, completed in links:
+            total, done = deltas.get(tag_id, (0, 0))
+            deltas[tag_id] = (total + sign, done + sign * int(completed))
+    return {tag_id: delta for tag_id, delta in deltas.items() if any(delta)}
+
+def adjust_tag_stats(user, removed=(), added=()):
+    # Like adjust_task_stats, rows are only kept for users whose TaskStats row
+    # exists; building that row counts the tags from scratch. All counters
+    # move in one UPDATE; a tag's first task creates its row at zero first.
+    deltas = tag_deltas(removed, added)
+    if not deltas:
+        return
+    rows = TagStats.objects.filter(author=user, tag_id__in=deltas)
+    existing = set(rows.values_list("tag_id", flat=True))
+    if len(existing) < len(deltas):
+        if not TaskStats.objects.filter(author=user).exists():
+            return
+        TagStats.objects.bulk_create(
+            [TagStats(author=user, tag_id=tag_id) for tag_id in deltas if tag_id not in existing],
+            ignore_conflicts=True,
+        )
+    rows.update(
+        total_tasks=F("total_tasks") + Case(
+            *[When(tag_id=tag_id, then=Value(total)) for tag_id, (total, _) in deltas.items()], default=Value(0),
+        ),
+        completed_tasks=F("completed_tasks") + Case(
+            *[When(tag_id=tag_id, then=Value(done)) for tag_id, (_, done) in deltas.items()], default=Value(0),
+        ),
+        updated_at=timezone.now(),
+    )
+
+def adjust_tag_completion(user, task_ids, completed):
+    # Tasks that flipped completion keep their tags, so only the completed
+    # counters of rows that already exist move, in one UPDATE.
+    if not task_ids:
+        return
+    links = Task.tags.through.objects.filter(task_id__in=task_ids)
+    flipped = Subquery(
+        links.filter(tag_id=OuterRef("tag_id")).values("tag_id").annotate(count=Count("id")).values("count"),
+        output_field=IntegerField(),
+    )
+    TagStats.objects.filter(author=user, tag_id__in=links.values("tag_id")).update(
+        completed_tasks=F("completed_tasks") + (flipped if completed else -flipped),
+        updated_at=timezone.now(),
+    )
@@ -0,0 +1,22 @@
+from django.conf import settings
+from django.db import connections
+
+NOTE_COMPRESSION_METHODS = ("pglz", "lz4")
+
+
+def ensure_note_compression(sender, using="default", **kwargs):
+    # PostgreSQL compresses TOASTed values itself. NOTE_BODY_COMPRESSION picks
+    # the method for note bodies and NOTE_COMPRESSION_MIN_BYTES lowers the row
+    # size at which bodies get compressed (the default is about 2 kB). Only
+    # rows written afterwards are affected. Other databases store bodies as is.
+    method = getattr(settings, "NOTE_BODY_COMPRESSION", "")
+    connection = connections[using]
+    if not method or connection.vendor != "postgresql":
+        return
+    if method not in NOTE_COMPRESSION_METHODS:
+        raise ValueError(f"NOTE_BODY_COMPRESSION must be one of {', '.join(NOTE_COMPRESSION_METHODS)}")
+
+    threshold = min(max(int(getattr(settings, "NOTE_COMPRESSION_MIN_BYTES", 2032)), 128), 8160)
+    with connection.cursor() as cursor:
+        cursor.execute(f"ALTER TABLE api_note ALTER COLUMN notes SET COMPRESSION {method}")
+        cursor.execute(f"ALTER TABLE api_note SET (toast_tuple_target = {threshold})")
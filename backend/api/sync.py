@@ -0,0 +1,40 @@
+from datetime import datetime, timedelta, timezone as dt_timezone
+from django.conf import settings
+from django.utils import timezone
+from .models import Tombstone
+
+# Cursors are handed out slightly in the past so rows committed by
+# transactions that were still open at sync time are picked up next time.
+# Clients apply changes by id, so the overlap is harmless.
+CURSOR_OVERLAP = timedelta(seconds=2)
+
+
+def tombstone_retention():
+    return timedelta(days=getattr(settings, "SYNC_TOMBSTONE_RETENTION_DAYS", 30))
+
+def encode_cursor(moment):
+    return str(int(moment.timestamp() * 1_000_000))
+
+def decode_cursor(cursor):
+    try:
+        return datetime.fromtimestamp(int(cursor) / 1_000_000, tz=dt_timezone.utc)
+    except (TypeError, ValueError, OverflowError, OSError):
+        raise ValueError("Invalid sync cursor")
+
+def next_cursor():
+    return encode_cursor(timezone.now() - CURSOR_OVERLAP)
+
+def record_deletions(user, kind, object_ids):
+    Tombstone.objects.bulk_create([
+        Tombstone(author=user, kind=kind, object_id=object_id) for object_id in object_ids
+    ])
+
+def deleted_since(user, since):
+    deleted = {kind: [] for kind, _ in Tombstone.KIND_CHOICES}
+    tombstones = Tombstone.objects.filter(author=user, deleted_at__gt=since).values_list("kind", "object_id")
+    for kind, object_id in tombstones:
+        deleted[kind].append(object_id)
+    return deleted
+
+def prune_tombstones():
+    return Tombstone.objects.filter(deleted_at__lt=timezone.now() - tombstone_retention()).delete()[0]
@@ -0,0 +1,24 @@
+from django.conf import settings
+from .models import Task
+
+SYNC_BATCH_SIZE = 500
+
+
+def tag_array_enabled():
+    return getattr(settings, "TASK_TAG_ARRAY", False)
+
+def sync_tag_ids(task_ids):
+    # Rewrites Task.tag_id_array from the link table for the given tasks.
+    # Writers that already know the new tags set the column directly.
+    task_ids = list(task_ids)
+    if not task_ids:
+        return
+    arrays = {task_id: [] for task_id in task_ids}
+    links = Task.tags.through.objects.filter(task_id__in=task_ids).order_by("tag_id").values_list("task_id", "tag_id")
+    for task_id, tag_id in links:
+        arrays[task_id].append(tag_id)
+    Task.objects.bulk_update(
+        [Task(pk=task_id, tag_id_array=tag_ids) for task_id, tag_ids in arrays.items()],
+        ["tag_id_array"],
+        batch_size=SYNC_BATCH_SIZE,
+    )
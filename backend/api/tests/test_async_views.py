@@ -0,0 +1,78 @@
+import json
+from unittest import mock
+from django.contrib.auth.models import User
+from django.test import AsyncClient, AsyncRequestFactory, TransactionTestCase, override_settings
+from django.urls import path
+from rest_framework_simplejwt.tokens import AccessToken
+from api import async_views
+from api.conditional import touch_change_marker
+from api.models import ChangeMarker, Tag, Task, TaskStats
+from backend import urls
+
+# The routes backend.urls swaps in when ASYNC_DASHBOARD_VIEWS is on.
+urlpatterns = [path("api/tasks/", async_views.tasks, name="task-list"), *urls.urlpatterns]
+
+
+# The async views run their queries on pool threads with their own
+# connections, which only see committed rows.
+class AsyncViewTests(TransactionTestCase):
+    def setUp(self):
+        self.user = User.objects.create_user(username="async", password="async-password")
+        errands = Tag.objects.create(author=self.user, name="errands")
+        Task.objects.create(author=self.user, name="buy milk").tags.set([errands])
+        Task.objects.create(author=self.user, name="write report")
+        touch_change_marker(self.user)
+        self.factory = AsyncRequestFactory()
+
+    def get(self, view, path, headers=None):
+        request = self.factory.get(path, headers=headers)
+        request.COOKIES["access_token"] = str(AccessToken.for_user(self.user))
+        return view(request)
+
+    async def test_not_modified_carries_the_validators(self):
+        for view, path in [(async_views.task_stats, "/api/tasks/stats/"), (async_views.calendar, "/api/calendar/?month=10&year=2026")]:
+            fresh = await self.get(view, path)
+            self.assertEqual(fresh.status_code, 200)
+            response = await self.get(view, path, headers={"If-None-Match": fresh["ETag"]})
+            self.assertEqual(response.status_code, 304)
+            self.assertEqual(response["ETag"], fresh["ETag"])
+            self.assertEqual(response.get("Last-Modified"), fresh.get("Last-Modified"))
+        self.assertIn("Last-Modified", response)
+
+    async def test_task_list_tags_follow_the_search(self):
+        response = await self.get(async_views.tasks, "/api/tasks/?search=buy&expand=tags&facets=tags")
+        self.assertEqual(response.status_code, 200)
+        data = json.loads(response.content)
+        self.assertEqual([(task["name"], [tag["name"] for tag in task["tags"]]) for task in data["results"]], [("buy milk", ["errands"])])
+        self.assertEqual([(tag["name"], tag["count"]) for tag in data["facets"]["tags"]], [("errands", 1)])
+
+
+@override_settings(ROOT_URLCONF=__name__)
+class AsyncTaskRouteTests(TransactionTestCase):
+    def setUp(self):
+        self.user = User.objects.create_user(username="creator", password="creator-password")
+        TaskStats.objects.create(author=self.user)
+        self.client = AsyncClient(enforce_csrf_checks=True)
+        self.client.cookies["access_token"] = str(AccessToken.for_user(self.user))
+        self.broker = mock.Mock()
+        patcher = mock.patch("api.events.get_broker", return_value=self.broker)
+        patcher.start()
+        self.addCleanup(patcher.stop)
+
+    async def test_create_goes_through_the_viewset(self):
+        response = await self.client.post("/api/tasks/", {"name": "new"}, content_type="application/json")
+        self.assertEqual(response.status_code, 201)
+        task = await Task.objects.aget(author=self.user)
+        self.assertEqual((await ChangeMarker.objects.aget(author=self.user)).version, 1)
+        self.assertEqual((await TaskStats.objects.aget(author=self.user)).total_tasks, 1)
+        self.broker.publish.assert_called_once_with(self.user.pk, {"type": "task", "action": "create", "ids": [task.pk]})
+
+    async def test_batch_create_publishes_a_task_event(self):
+        response = await self.client.post(
+            "/api/batch/",
+            {"requests": [{"method": "POST", "path": "/api/tasks/", "body": {"name": "batched"}}]},
+            content_type="application/json",
+        )
+        self.assertEqual(response.status_code, 200)
+        task = await Task.objects.aget(author=self.user)
+        self.broker.publish.assert_called_once_with(self.user.pk, {"type": "task", "action": "create", "ids": [task.pk]})
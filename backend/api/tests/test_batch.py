@@ -0,0 +1,38 @@
+from django.contrib.auth.models import User
+from rest_framework.test import APITestCase
+from api.models import Task
+
+
+class BatchTests(APITestCase):
+    def setUp(self):
+        self.user = User.objects.create_user(username="batcher", password="batcher-password")
+        self.client.force_authenticate(self.user)
+
+    def batch(self, *requests, **options):
+        return self.client.post("/api/batch/", {"requests": list(requests), **options}, format="json")
+
+    def test_runs_requests_in_order(self):
+        response = self.batch(
+            {"method": "POST", "path": "/api/tasks/", "body": {"name": "first"}},
+            {"path": "/api/tasks/?page_size=10"},
+        )
+        self.assertEqual(response.status_code, 200)
+        created, listed = response.data["responses"]
+        self.assertEqual(created["status"], 201)
+        self.assertEqual([task["name"] for task in listed["body"]["results"]], ["first"])
+
+    def test_non_api_views_are_refused(self):
+        response = self.batch({"path": "/admin/"}, {"path": "/api/tasks/"})
+        self.assertEqual(response.status_code, 200)
+        refused, listed = response.data["responses"]
+        self.assertEqual(refused["status"], 400)
+        self.assertEqual(listed["status"], 200)
+
+    def test_atomic_batch_rolls_back_on_failure(self):
+        response = self.batch(
+            {"method": "POST", "path": "/api/tasks/", "body": {"name": "kept?"}},
+            {"method": "POST", "path": "/api/tasks/", "body": {}},
+            atomic=True,
+        )
+        self.assertEqual([result["status"] for result in response.data["responses"]], [201, 400])
+        self.assertFalse(Task.objects.exists())
@@ -0,0 +1,27 @@
+import subprocess
+import sys
+from pathlib import Path
+from django.core.management import CommandError, call_command
+from django.test import SimpleTestCase
+
+BACKEND_DIR = Path(__file__).resolve().parent.parent.parent
+
+
+class BenchmarkTests(SimpleTestCase):
+    def test_endpoints_stay_within_query_budgets(self):
+        # The command creates and drops its own test database, so it runs in
+        # a separate process instead of inside the test runner's.
+        result = subprocess.run(
+            [
+                sys.executable, "manage.py", "benchmark",
+                "--tasks", "100", "--notes", "20", "--iterations", "2", "--warmup", "1", "--check",
+            ],
+            cwd=BACKEND_DIR,
+            capture_output=True,
+            text=True,
+        )
+        self.assertEqual(result.returncode, 0, result.stdout + result.stderr)
+
+    def test_rejects_runs_without_iterations(self):
+        with self.assertRaisesMessage(CommandError, "--iterations must be at least 1."):
+            call_command("benchmark", iterations=0)
@@ -0,0 +1,44 @@
+from unittest import mock
+from django.contrib.auth.models import User
+from django.test import override_settings
+from rest_framework.test import APITestCase
+from api.models import Task, TaskStats
+from api.serializers import TaskSerializer
+
+
+class BulkUpdateTests(APITestCase):
+    def setUp(self):
+        self.user = User.objects.create_user(username="bulk", password="bulk-password")
+        self.client.force_authenticate(self.user)
+        self.first = Task.objects.create(author=self.user, name="first")
+        self.second = Task.objects.create(author=self.user, name="second")
+
+    def bulk_update(self, *items):
+        return self.client.post("/api/tasks/bulk_update/", {"tasks": list(items)}, format="json")
+
+    def test_unsent_fields_are_not_written_back(self):
+        validate = TaskSerializer.validate
+
+        def complete_second_meanwhile(serializer, attrs):
+            # Another request completes the second task after the rows
+            # were read but before they are written.
+            Task.objects.filter(pk=self.second.pk).update(completed=True)
+            return validate(serializer, attrs)
+
+        with mock.patch.object(TaskSerializer, "validate", complete_second_meanwhile):
+            response = self.bulk_update(
+                {"id": self.first.pk, "completed": True},
+                {"id": self.second.pk, "name": "renamed"},
+            )
+        self.assertEqual(response.status_code, 200)
+        second = Task.objects.get(pk=self.second.pk)
+        self.assertEqual((second.name, second.completed), ("renamed", True))
+        self.assertTrue(Task.objects.get(pk=self.first.pk).completed)
+
+    @override_settings(TASK_STATS_TABLE=True)
+    def test_stats_follow_completed_changes(self):
+        self.client.get("/api/tasks/stats/")
+        self.bulk_update({"id": self.first.pk, "completed": True}, {"id": self.second.pk, "completed": True})
+        self.bulk_update({"id": self.first.pk, "completed": False}, {"id": self.second.pk, "name": "renamed"})
+        row = TaskStats.objects.get(author=self.user)
+        self.assertEqual((row.total_tasks, row.completed_tasks), (2, 1))
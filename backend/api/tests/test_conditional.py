@@ -0,0 +1,36 @@
+from django.contrib.auth.models import User
+from rest_framework.test import APITestCase
+
+
+class ConditionalGetTests(APITestCase):
+    def setUp(self):
+        self.user = User.objects.create_user(username="etag", password="etag-password")
+        self.client.force_authenticate(self.user)
+
+    def test_unchanged_list_is_not_modified(self):
+        response = self.client.get("/api/tasks/")
+        self.assertEqual(response.status_code, 200)
+        self.assertIn("ETag", response)
+        response = self.client.get("/api/tasks/", HTTP_IF_NONE_MATCH=response["ETag"])
+        self.assertEqual(response.status_code, 304)
+        self.assertEqual(response.content, b"")
+
+    def test_write_invalidates_etag(self):
+        etag = self.client.get("/api/notes/")["ETag"]
+        self.client.post("/api/tasks/", {"name": "new"}, format="json")
+        response = self.client.get("/api/notes/", HTTP_IF_NONE_MATCH=etag)
+        self.assertEqual(response.status_code, 200)
+
+    def test_etags_differ_per_query_and_user(self):
+        etag = self.client.get("/api/tasks/")["ETag"]
+        self.assertEqual(self.client.get("/api/tasks/?completed=true", HTTP_IF_NONE_MATCH=etag).status_code, 200)
+
+        other = User.objects.create_user(username="other", password="other-password")
+        self.client.force_authenticate(other)
+        self.assertEqual(self.client.get("/api/tasks/", HTTP_IF_NONE_MATCH=etag).status_code, 200)
+
+    def test_failed_write_keeps_etag(self):
+        etag = self.client.get("/api/tasks/")["ETag"]
+        response = self.client.post("/api/tasks/", {}, format="json")
+        self.assertEqual(response.status_code, 400)
+        self.assertEqual(self.client.get("/api/tasks/", HTTP_IF_NONE_MATCH=etag).status_code, 304)
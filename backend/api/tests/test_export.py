@@ -0,0 +1,42 @@
+import json
+from unittest import mock
+from django.contrib.auth.models import User
+from django.test import TestCase
+from rest_framework.test import APIClient
+from rest_framework_simplejwt.tokens import AccessToken
+from api import export
+from api.models import Task
+
+
+class ExportTests(TestCase):
+    def setUp(self):
+        self.user = User.objects.create_user(username="exporter", password="exporter-password")
+        Task.objects.bulk_create(Task(author=self.user, name=f"task {number}") for number in range(7))
+
+    def names(self, lines):
+        return [json.loads(line)["name"] for line in lines.decode().splitlines()]
+
+    def test_wsgi_streams_a_sync_iterator(self):
+        client = APIClient()
+        client.force_authenticate(self.user)
+        response = client.get("/api/export/?include=tasks")
+        self.assertEqual(response.status_code, 200)
+        self.assertFalse(response.is_async)
+        self.assertEqual(self.names(b"".join(response.streaming_content)), [f"task {number}" for number in range(7)])
+
+    async def test_asgi_streams_an_async_iterator(self):
+        self.async_client.cookies["access_token"] = str(AccessToken.for_user(self.user))
+        original = export.stream_async
+        batches = []
+
+        async def record_batches(lines, batch_size=export.EXPORT_CHUNK_SIZE):
+            async for chunk in original(lines, batch_size=3):
+                batches.append(chunk)
+                yield chunk
+
+        with mock.patch("api.views.stream_async", record_batches):
+            response = await self.async_client.get("/api/export/?include=tasks")
+            content = b"".join([chunk async for chunk in response.streaming_content])
+        self.assertEqual(response.status_code, 200)
+        self.assertEqual(self.names(content), [f"task {number}" for number in range(7)])
+        self.assertEqual([chunk.count("\n") for chunk in batches], [3, 3, 1])
@@ -0,0 +1,41 @@
+import re
+from unittest import mock
+from django.contrib.auth.models import User
+from django.db import connection
+from django.db.backends.postgresql.base import DatabaseWrapper
+from rest_framework.test import APITestCase
+from api import search
+from api.models import Tag, Task
+from api.stats import tag_facet_queryset
+
+
+class TagFacetTests(APITestCase):
+    def setUp(self):
+        self.user = User.objects.create_user(username="facets", password="facets-password")
+        self.client.force_authenticate(self.user)
+        errands = Tag.objects.create(author=self.user, name="errands")
+        work = Tag.objects.create(author=self.user, name="work")
+        Task.objects.create(author=self.user, name="buy milk").tags.set([errands])
+        Task.objects.create(author=self.user, name="buy paper").tags.set([errands, work])
+        Task.objects.create(author=self.user, name="write report").tags.set([work])
+
+    def test_facets_follow_the_search(self):
+        response = self.client.get("/api/tasks/?search=buy&facets=tags")
+        self.assertEqual(response.status_code, 200)
+        self.assertEqual([task["name"] for task in response.data["results"]], ["buy paper", "buy milk"])
+        self.assertEqual(
+            [(tag["name"], tag["count"]) for tag in response.data["facets"]["tags"]],
+            [("errands", 2), ("work", 1)],
+        )
+
+    def test_searched_subquery_follows_the_table_alias(self):
+        # The searched tasks are nested under an alias (U0), which raw SQL
+        # naming the task table directly would not resolve. The PostgreSQL
+        # query is only compiled, so no server is needed.
+        postgresql = DatabaseWrapper({**connection.settings_dict, "ENGINE": "django.db.backends.postgresql"}, "default")
+        with mock.patch.object(search, "connections", {"default": postgresql}):
+            facets = tag_facet_queryset(search.search_queryset(Task.objects.filter(author=self.user), "buy"))
+        sql, params = facets.query.get_compiler(connection=postgresql).as_sql()
+        subquery = sql[sql.index("(SELECT"):]
+        self.assertIn("search_vector @@", subquery)
+        self.assertIsNone(re.search(r'(?<!")\bapi_task\.', subquery))
@@ -0,0 +1,94 @@
+import io
+import json
+from django.contrib.auth.models import User
+from django.core.cache import cache
+from django.core.files.uploadedfile import SimpleUploadedFile
+from django.test import override_settings
+from rest_framework.test import APITestCase
+from api.importer import Importer
+from api.models import ImportJob, Note, Tag, Task
+
+
+def ndjson(*records):
+    return b"".join(json.dumps(record).encode() + b"\n" for record in records)
+
+
+class ImporterTests(APITestCase):
+    def setUp(self):
+        self.user = User.objects.create_user(username="importer", password="importer-password")
+        self.client.force_authenticate(self.user)
+
+    def upload(self, content, name="agenda.ndjson", pk=None):
+        url = "/api/import/" if pk is None else f"/api/import/{pk}/"
+        return self.client.post(url, {"file": SimpleUploadedFile(name, content)}, format="multipart")
+
+    def test_imports_tasks_notes_and_tags(self):
+        response = self.upload(ndjson(
+            {"type": "task", "name": "pay rent", "due_date": "2026-11-01", "tags": ["home", "money"]},
+            {"type": "note", "name": "ideas", "notes": "write more tests", "tags": ["home"]},
+        ))
+        self.assertEqual(response.status_code, 201)
+        self.assertEqual(response.data["status"], ImportJob.COMPLETED)
+        self.assertEqual((response.data["tasks_created"], response.data["notes_created"], response.data["tags_created"]), (1, 1, 2))
+        task = Task.objects.get(author=self.user)
+        self.assertEqual(sorted(task.tags.values_list("name", flat=True)), ["home", "money"])
+        self.assertEqual(task.tag_id_array, sorted(task.tags.values_list("id", flat=True)))
+        self.assertEqual(Note.objects.get(author=self.user).excerpt, "write more tests")
+
+    def test_bad_records_are_skipped(self):
+        response = self.upload(b'{"type": "task", "name": "ok"}\nnot json\n{"type": "task", "due_date": "soon"}\n')
+        self.assertEqual(response.status_code, 201)
+        self.assertEqual(response.data["records_processed"], 3)
+        self.assertEqual(response.data["records_skipped"], 2)
+        self.assertEqual(Task.objects.filter(author=self.user).count(), 1)
+
+    def test_non_string_fields_are_skipped(self):
+        response = self.upload(ndjson(
+            {"type": "task", "name": 5},
+            {"type": ["task"], "name": "list type"},
+            {"type": "task", "name": "bad description", "description": {"text": "x"}},
+            {"type": "note", "name": "bad notes", "notes": 1.5},
+            {"type": "task", "name": "bad tags", "tags": 7},
+            {"type": "task", "name": "fine"},
+        ))
+        self.assertEqual(response.status_code, 201)
+        self.assertEqual((response.data["records_skipped"], response.data["tasks_created"]), (5, 1))
+
+    @override_settings(CACHE_SHARED=True)
+    def test_new_tags_drop_the_tag_cache(self):
+        cache.clear()
+        self.assertEqual(self.client.get("/api/tags/").data, [])
+        with self.captureOnCommitCallbacks(execute=True):
+            self.upload(ndjson({"type": "task", "name": "tagged", "tags": ["newtag"]}))
+        self.assertEqual([tag["name"] for tag in self.client.get("/api/tags/").data], ["newtag"])
+
+    def test_csv(self):
+        response = self.upload(b"type,name,tags\ntask,first,a;b\nnote,second,\n", name="agenda.csv")
+        self.assertEqual(response.status_code, 201)
+        self.assertEqual(Task.objects.get(author=self.user).name, "first")
+        self.assertEqual(Tag.objects.filter(author=self.user).count(), 2)
+
+    def test_unreadable_file_fails_the_job(self):
+        response = self.upload(b'{"type": "task", "name": "ok"}\n\xff\xfe\n')
+        self.assertEqual(response.status_code, 400)
+        self.assertEqual(response.data["status"], ImportJob.FAILED)
+        self.assertTrue(response.data["last_error"])
+
+    def test_resume_skips_committed_records(self):
+        records = [{"type": "task", "name": f"task {number}"} for number in range(5)]
+        job = ImportJob.objects.create(author=self.user, source="agenda.ndjson", format="ndjson")
+        # The third batch can't be decoded; the first two stay committed.
+        broken = ndjson(*records[:4]) + b"\xff\n"
+        with self.assertRaises(ValueError):
+            Importer(job, batch_size=2).run(io.BytesIO(broken))
+        job.refresh_from_db()
+        self.assertEqual((job.status, job.records_processed), (ImportJob.FAILED, 4))
+
+        response = self.upload(ndjson(*records), pk=job.pk)
+        self.assertEqual(response.status_code, 200)
+        self.assertEqual(response.data["status"], ImportJob.COMPLETED)
+        self.assertEqual(response.data["tasks_created"], 5)
+        self.assertEqual(sorted(Task.objects.filter(author=self.user).values_list("name", flat=True)), [record["name"] for record in records])
+
+        response = self.upload(ndjson(*records), pk=job.pk)
+        self.assertEqual(response.status_code, 400)
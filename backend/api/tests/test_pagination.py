@@ -0,0 +1,59 @@
+from datetime import timedelta
+from django.contrib.auth.models import User
+from django.db.models import F
+from django.utils import timezone
+from rest_framework.test import APITestCase
+from api.models import Task
+
+
+class KeysetPaginationTests(APITestCase):
+    def setUp(self):
+        self.user = User.objects.create_user(username="pager", password="pager-password")
+        self.client.force_authenticate(self.user)
+        now = timezone.now()
+        # Repeated and missing due dates, so the id tie-breaker and NULL
+        # ordering are both exercised.
+        for number in range(23):
+            due = None if number % 5 == 0 else now + timedelta(days=number % 4)
+            Task.objects.create(author=self.user, name=f"task {number}", due_date=due)
+
+    def walk(self, url, link):
+        ids = []
+        while url:
+            response = self.client.get(url)
+            self.assertEqual(response.status_code, 200)
+            ids.append([task["id"] for task in response.data["results"]])
+            url = response.data[link]
+        return ids
+
+    def test_plain_list_is_not_paginated(self):
+        response = self.client.get("/api/tasks/")
+        self.assertIsInstance(response.data, list)
+        self.assertEqual(len(response.data), 23)
+
+    def test_pages_cover_every_row_once_in_order(self):
+        # Pages sort NULLs last and break ties by id.
+        expected = list(Task.objects.order_by(F("due_date").asc(nulls_last=True), "id").values_list("id", flat=True))
+        pages = self.walk("/api/tasks/?ordering=due_date&page_size=5", "next")
+        self.assertEqual([len(page) for page in pages], [5, 5, 5, 5, 3])
+        self.assertEqual([task_id for page in pages for task_id in page], expected)
+
+    def test_previous_links_walk_back(self):
+        url = "/api/tasks/?ordering=-due_date&page_size=4"
+        forward = self.walk(url, "next")
+        last = self.client.get(url)
+        while last.data["next"]:
+            last = self.client.get(last.data["next"])
+        backward = self.walk(last.data["previous"], "previous")
+        self.assertEqual(backward, forward[-2::-1])
+
+    def test_rows_inserted_mid_walk_do_not_shift_pages(self):
+        first = self.client.get("/api/tasks/?ordering=name&page_size=10")
+        seen = [task["id"] for task in first.data["results"]]
+        Task.objects.create(author=self.user, name="a task before every page")
+        second = self.client.get(first.data["next"])
+        self.assertFalse(set(seen) & {task["id"] for task in second.data["results"]})
+
+    def test_invalid_cursor_is_rejected(self):
+        response = self.client.get("/api/tasks/?cursor=not-a-cursor")
+        self.assertEqual(response.status_code, 404)
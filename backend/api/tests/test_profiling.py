@@ -0,0 +1,42 @@
+from asgiref.sync import async_to_sync, iscoroutinefunction
+from django.contrib.auth.models import User
+from django.http import HttpResponse
+from django.test import AsyncRequestFactory, RequestFactory, TransactionTestCase, override_settings
+from api.async_views import run_query
+from api.profiling import RequestProfilingMiddleware, current_profile
+
+
+@override_settings(REQUEST_PROFILING=True, REQUEST_PROFILING_SAMPLE_RATE=1.0, SLOW_REQUEST_MS=60000)
+class RequestProfilingTests(TransactionTestCase):
+    def profile(self, view):
+        profiles = []
+
+        def get_response(request):
+            profiles.append(current_profile.get())
+            view()
+            return HttpResponse()
+
+        response = RequestProfilingMiddleware(get_response)(RequestFactory().get("/"))
+        return profiles[0], response["Server-Timing"]
+
+    def test_counts_queries_run_on_pool_threads(self):
+        # How the async views run their queries.
+        def view():
+            async def queries():
+                await run_query(User.objects.count)
+                await run_query(User.objects.exists)
+            async_to_sync(queries)()
+
+        profile, timing = self.profile(view)
+        self.assertEqual(len(profile.queries), 2)
+        self.assertIn('desc="2 queries"', timing)
+
+    async def test_async_handler_stays_on_the_event_loop(self):
+        async def get_response(request):
+            await run_query(User.objects.count)
+            return HttpResponse()
+
+        middleware = RequestProfilingMiddleware(get_response)
+        self.assertTrue(iscoroutinefunction(middleware))
+        response = await middleware(AsyncRequestFactory().get("/"))
+        self.assertIn('desc="1 queries"', response["Server-Timing"])
@@ -0,0 +1,156 @@
+from datetime import datetime, timedelta, timezone as dt_timezone
+from django.contrib.auth.models import User
+from django.test import SimpleTestCase
+from django.utils import timezone
+from rest_framework.test import APITestCase
+from api.models import Task
+from api.recurrence import occurrences, parse_rule, recurrence_end
+
+
+def utc(*args):
+    return datetime(*args, tzinfo=dt_timezone.utc)
+
+def expand(value, dtstart, **kwargs):
+    return list(occurrences(parse_rule(value), dtstart, **kwargs))
+
+
+class ParseRuleTests(SimpleTestCase):
+    def test_parses_supported_parts(self):
+        rule = parse_rule("RRULE:FREQ=weekly;INTERVAL=2;BYDAY=FR,MO")
+        self.assertEqual((rule["freq"], rule["interval"], rule["byday"]), ("WEEKLY", 2, [0, 4]))
+        self.assertEqual(parse_rule("FREQ=DAILY;UNTIL=20261231")["until"].date().isoformat(), "2026-12-31")
+
+    def test_rejects_invalid_rules(self):
+        for value in (
+            "", "FREQ=HOURLY", "FREQ=DAILY;INTERVAL=0", "FREQ=DAILY;COUNT=1001",
+            "FREQ=DAILY;COUNT=2;UNTIL=20261231", "FREQ=DAILY;BYDAY=MO", "FREQ=WEEKLY;BYDAY=XX",
+            "FREQ=DAILY;UNTIL=soon", "FREQ=DAILY;BYMONTH=1", "FREQ",
+        ):
+            with self.subTest(value=value), self.assertRaises(ValueError):
+                parse_rule(value)
+
+
+class OccurrenceTests(SimpleTestCase):
+    def test_daily_window(self):
+        start = utc(2026, 1, 1, 9)
+        dues = expand("FREQ=DAILY;INTERVAL=3", start, start=utc(2026, 1, 5), end=utc(2026, 1, 14))
+        self.assertEqual(dues, [utc(2026, 1, 7, 9), utc(2026, 1, 10, 9), utc(2026, 1, 13, 9)])
+
+    def test_count_includes_the_first_occurrence(self):
+        dues = expand("FREQ=WEEKLY;COUNT=3", utc(2026, 1, 1, 9))
+        self.assertEqual(dues, [utc(2026, 1, 1, 9), utc(2026, 1, 8, 9), utc(2026, 1, 15, 9)])
+        self.assertEqual(expand("FREQ=WEEKLY;COUNT=3", utc(2026, 1, 1, 9), start=utc(2026, 1, 10)), [utc(2026, 1, 15, 9)])
+
+    def test_until_is_inclusive(self):
+        dues = expand("FREQ=DAILY;UNTIL=20260103T090000Z", utc(2026, 1, 1, 9))
+        self.assertEqual(dues, [utc(2026, 1, 1, 9), utc(2026, 1, 2, 9), utc(2026, 1, 3, 9)])
+
+    def test_byday_skips_days_before_the_start(self):
+        # 2026-01-07 is a Wednesday; Monday of that week is left out.
+        dues = expand("FREQ=WEEKLY;BYDAY=MO,WE,FR;COUNT=4", utc(2026, 1, 7, 9))
+        self.assertEqual(dues, [utc(2026, 1, 7, 9), utc(2026, 1, 9, 9), utc(2026, 1, 12, 9), utc(2026, 1, 14, 9)])
+
+    def test_month_end_dates_that_do_not_exist_are_skipped(self):
+        dues = expand("FREQ=MONTHLY;COUNT=4", utc(2026, 1, 31, 9))
+        self.assertEqual(dues, [utc(2026, 1, 31, 9), utc(2026, 3, 31, 9), utc(2026, 5, 31, 9), utc(2026, 7, 31, 9)])
+        dues = expand("FREQ=YEARLY;COUNT=2", utc(2028, 2, 29, 9))
+        self.assertEqual(dues, [utc(2028, 2, 29, 9), utc(2032, 2, 29, 9)])
+
+    def test_wall_clock_time_is_kept_across_dst(self):
+        with timezone.override("Europe/Berlin"):
+            dues = expand("FREQ=DAILY;COUNT=2", utc(2026, 3, 28, 8))
+        self.assertEqual(dues, [utc(2026, 3, 28, 8), utc(2026, 3, 29, 7)])
+
+    def test_expansion_stops_at_the_last_representable_date(self):
+        for value in ("FREQ=YEARLY;INTERVAL=1000", "FREQ=WEEKLY;INTERVAL=1000;BYDAY=MO,FR", "FREQ=MONTHLY;INTERVAL=1000"):
+            with self.subTest(value=value):
+                dues = expand(value, utc(2026, 1, 5, 9))
+                self.assertTrue(dues)
+                self.assertLessEqual(dues[-1].year, 9999)
+
+    def test_recurrence_end(self):
+        self.assertEqual(recurrence_end(parse_rule("FREQ=DAILY;COUNT=3"), utc(2026, 1, 1, 9)), utc(2026, 1, 3, 9))
+        self.assertIsNone(recurrence_end(parse_rule("FREQ=DAILY"), utc(2026, 1, 1, 9)))
+        with self.assertRaises(ValueError):
+            recurrence_end(parse_rule("FREQ=YEARLY;INTERVAL=1000;COUNT=10"), utc(2026, 1, 1, 9))
+
+
+class RecurringTaskTests(APITestCase):
+    def setUp(self):
+        self.user = User.objects.create_user(username="series", password="series-password")
+        self.client.force_authenticate(self.user)
+        self.start = (timezone.now() - timedelta(days=10)).replace(microsecond=0)
+        response = self.client.post("/api/tasks/", {"name": "water plants", "due_date": self.start.isoformat(), "recurrence": "FREQ=DAILY"}, format="json")
+        self.assertEqual(response.status_code, 201)
+        self.task_id = response.data["id"]
+
+    def day(self, number):
+        return self.start + timedelta(days=number)
+
+    def override(self, number, method="post", **values):
+        response = getattr(self.client, method)(f"/api/tasks/{self.task_id}/occurrence/", {"original_due": self.day(number).isoformat(), **values}, format="json")
+        self.assertIn(response.status_code, (200, 204))
+        return response
+
+    def watermark(self):
+        return Task.objects.get(pk=self.task_id).next_open_due
+
+    def overdue_ids(self):
+        return [task["id"] for task in self.client.get("/api/tasks/?overdue=true").data]
+
+    def test_rules_past_the_last_date_are_rejected(self):
+        for value in ("FREQ=YEARLY;INTERVAL=1000;COUNT=10", "FREQ=WEEKLY;INTERVAL=1000;COUNT=1000"):
+            with self.subTest(value=value):
+                response = self.client.post("/api/tasks/", {"name": "far", "due_date": self.start.isoformat(), "recurrence": value}, format="json")
+                self.assertEqual(response.status_code, 400)
+                self.assertIn("recurrence", response.data)
+
+    def test_watermark_follows_completed_occurrences(self):
+        self.assertEqual(self.watermark(), self.day(0))
+        self.override(1, completed=True)
+        self.assertEqual(self.watermark(), self.day(0))
+        self.override(0, completed=True)
+        self.assertEqual(self.watermark(), self.day(2))
+        self.override(2, cancelled=True)
+        self.assertEqual(self.watermark(), self.day(3))
+        self.override(1, method="delete")
+        self.assertEqual(self.watermark(), self.day(1))
+
+    def test_overdue_uses_the_watermark_and_open_overrides(self):
+        self.assertIn(self.task_id, self.overdue_ids())
+        for number in range(11):
+            self.override(number, completed=True)
+        self.assertEqual(self.watermark(), self.day(11))
+        self.assertNotIn(self.task_id, self.overdue_ids())
+
+        # Reopened history counts again at its original due date.
+        self.override(3, completed=False)
+        self.assertIn(self.task_id, self.overdue_ids())
+        self.override(3, due_date=(timezone.now() + timedelta(days=1)).isoformat())
+        self.assertNotIn(self.task_id, self.overdue_ids())
+
+    def test_rule_changes_recompute_the_watermark(self):
+        self.override(0, completed=True)
+        self.client.patch(f"/api/tasks/{self.task_id}/", {"recurrence": "FREQ=DAILY;INTERVAL=2"}, format="json")
+        self.assertEqual(self.watermark(), self.day(2))
+        self.client.patch(f"/api/tasks/{self.task_id}/", {"recurrence": ""}, format="json")
+        self.assertIsNone(self.watermark())
+
+    def test_overrides_reach_delta_sync(self):
+        cursor = self.client.get("/api/changes/").data["cursor"]
+        # The series was created within the cursor's overlap window; age it
+        # so only the override write can bring it back.
+        Task.objects.filter(pk=self.task_id).update(updated_at=self.start)
+        since = self.client.get(f"/api/changes/?since={cursor}").data
+        self.assertEqual(since["occurrences"], [])
+
+        self.override(2, completed=True)
+        changes = self.client.get(f"/api/changes/?since={cursor}").data
+        self.assertEqual([task["id"] for task in changes["tasks"]], [self.task_id])
+        [occurrence] = changes["occurrences"]
+        self.assertEqual((occurrence["task"], occurrence["completed"]), (self.task_id, True))
+
+        self.override(2, method="delete")
+        changes = self.client.get(f"/api/changes/?since={cursor}").data
+        self.assertEqual(changes["occurrences"], [])
+        self.assertEqual(changes["deleted"]["occurrences"], [occurrence["id"]])
@@ -0,0 +1,30 @@
+from datetime import timedelta
+from io import StringIO
+from django.contrib.auth.models import User
+from django.core.management import call_command
+from django.test import TestCase
+from django.utils import timezone
+from api.models import Reminder, Task
+from api.reminders import enqueue_reminders
+
+
+class ReminderTests(TestCase):
+    def setUp(self):
+        self.user = User.objects.create_user(username="reminded", password="reminded-password")
+        self.now = timezone.now()
+        soon = self.now + timedelta(minutes=5)
+        Task.objects.create(author=self.user, name="soon", due_date=soon)
+        Task.objects.create(author=self.user, name="done", due_date=soon, completed=True)
+        Task.objects.create(author=self.user, name="later", due_date=self.now + timedelta(days=1))
+
+    def test_counts_only_inserted_reminders(self):
+        self.assertEqual(enqueue_reminders(now=self.now), 1)
+        self.assertEqual(list(Reminder.objects.values_list("task__name", flat=True)), ["soon"])
+        self.assertEqual(enqueue_reminders(now=self.now), 0)
+        self.assertEqual(Reminder.objects.count(), 1)
+
+    def test_command_reports_queued_reminders(self):
+        out = StringIO()
+        call_command("run_reminders", "--once", stdout=out)
+        call_command("run_reminders", "--once", "--verbosity", "2", stdout=out)
+        self.assertEqual(out.getvalue().splitlines(), ["Queued 1 reminders", "Queued 0 reminders"])
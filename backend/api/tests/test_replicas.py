@@ -0,0 +1,43 @@
+from unittest import mock
+from asgiref.sync import iscoroutinefunction
+from django.core.cache import cache
+from django.contrib.auth.models import User
+from django.http import HttpResponse
+from django.test import AsyncRequestFactory, RequestFactory, TestCase
+from api.replicas import STICKY_COOKIE, ReplicaRoutingMiddleware, read_database, sticky_key
+
+
+@mock.patch("api.replicas.replica_aliases", return_value=["replica1"])
+class ReplicaRoutingTests(TestCase):
+    def setUp(self):
+        cache.clear()
+        self.user = User.objects.create_user(username="writer", password="writer-password")
+        self.databases_seen = []
+
+    def view(self, request):
+        self.databases_seen.append(read_database.get())
+        request.user = self.user
+        return HttpResponse()
+
+    def test_sync_reads_use_a_replica_until_a_write(self, replica_aliases):
+        middleware = ReplicaRoutingMiddleware(self.view)
+        middleware(RequestFactory().get("/api/tasks/"))
+        response = middleware(RequestFactory().post("/api/tasks/"))
+        self.assertEqual(self.databases_seen, ["replica1", None])
+        self.assertIn(STICKY_COOKIE, response.cookies)
+        self.assertIsNotNone(cache.get(sticky_key(self.user.pk)))
+
+    async def test_async_handler_routes_without_a_thread_hop(self, replica_aliases):
+        async def view(request):
+            return self.view(request)
+
+        middleware = ReplicaRoutingMiddleware(view)
+        self.assertTrue(iscoroutinefunction(middleware))
+        await middleware(AsyncRequestFactory().get("/api/tasks/"))
+        response = await middleware(AsyncRequestFactory().post("/api/tasks/"))
+        request = AsyncRequestFactory().get("/api/tasks/")
+        request.COOKIES[STICKY_COOKIE] = "1"
+        await middleware(request)
+        self.assertEqual(self.databases_seen, ["replica1", None, None])
+        self.assertIn(STICKY_COOKIE, response.cookies)
+        self.assertIsNotNone(await cache.aget(sticky_key(self.user.pk)))
@@ -0,0 +1,85 @@
+from unittest import mock
+from django.contrib.auth.models import User
+from django.db import connection
+from django.test import TestCase, override_settings
+from django.test.utils import CaptureQueriesContext
+from rest_framework.test import APITestCase
+from api import stats
+from api.models import Tag, Task, TaskStats
+
+
+class StatsRowTests(TestCase):
+    def setUp(self):
+        self.user = User.objects.create_user(username="counter", password="counter-password")
+        Task.objects.create(author=self.user, name="done", completed=True)
+
+    def test_backfill_keeps_writes_made_while_counting(self):
+        count_stored_tasks = stats.count_stored_tasks
+
+        def count_then_write(user):
+            counts = count_stored_tasks(user)
+            if not Task.objects.filter(name="late").exists():
+                # Lands after the first count, before the row exists.
+                Task.objects.create(author=user, name="late")
+                stats.adjust_task_stats(user, total=1)
+            return counts
+
+        with mock.patch.object(stats, "count_stored_tasks", count_then_write):
+            row = stats.get_stats_row(self.user)
+        self.assertEqual((row.total_tasks, row.completed_tasks), (2, 1))
+        self.assertEqual(TaskStats.objects.get(author=self.user).total_tasks, 2)
+
+
+@override_settings(TASK_STATS_TABLE=True)
+class TagStatsTests(APITestCase):
+    def setUp(self):
+        self.user = User.objects.create_user(username="tagcounter", password="tagcounter-password")
+        self.client.force_authenticate(self.user)
+        self.errands = Tag.objects.create(author=self.user, name="errands")
+        self.work = Tag.objects.create(author=self.user, name="work")
+
+    def grouped(self):
+        with override_settings(TASK_STATS_TABLE=False):
+            return sorted(stats.tag_stats(self.user), key=lambda row: row["tags__name"])
+
+    def assertCountersMatch(self):
+        self.assertEqual(stats.tag_stats(self.user), self.grouped())
+
+    def test_counters_follow_every_write(self):
+        first = self.client.post("/api/tasks/", {"name": "first", "tag_ids": [self.errands.pk]}, format="json").data["id"]
+        # Built from the tasks the first time the stats are read.
+        self.assertCountersMatch()
+
+        second = self.client.post("/api/tasks/", {"name": "second", "tag_ids": [self.work.pk], "completed": True}, format="json").data["id"]
+        self.client.patch(f"/api/tasks/{first}/", {"tag_ids": [self.work.pk], "completed": True}, format="json")
+        self.assertCountersMatch()
+        self.client.post(f"/api/tasks/{second}/uncomplete/")
+        self.client.patch(f"/api/tasks/{first}/", {"completed": False}, format="json")
+        self.assertCountersMatch()
+
+        created = self.client.post(
+            "/api/tasks/bulk_create/",
+            {"tasks": [{"name": "third", "tag_ids": [self.errands.pk, self.work.pk]}, {"name": "fourth", "tag_ids": [self.errands.pk]}]},
+            format="json",
+        ).data
+        ids = [task["id"] for task in created]
+        self.client.post("/api/tasks/bulk_complete/", {"task_ids": ids}, format="json")
+        self.assertCountersMatch()
+        self.client.post("/api/tasks/bulk_update/", {"tasks": [{"id": ids[0], "tag_ids": [self.errands.pk], "completed": False}]}, format="json")
+        self.client.post("/api/tasks/bulk_uncomplete/", {"task_ids": ids}, format="json")
+        self.assertCountersMatch()
+
+        self.client.delete(f"/api/tasks/{first}/")
+        self.client.post("/api/tasks/bulk_delete/", {"task_ids": [second, ids[1]]}, format="json")
+        self.assertCountersMatch()
+        self.assertEqual(
+            stats.tag_stats(self.user),
+            [{"tags__name": "errands", "count": 1, "completed_count": 0}],
+        )
+
+    def test_reading_does_not_group_the_tasks(self):
+        self.client.post("/api/tasks/", {"name": "first", "tag_ids": [self.errands.pk]}, format="json")
+        stats.get_stats_row(self.user)
+        with CaptureQueriesContext(connection) as queries:
+            stats.tag_stats(self.user)
+        self.assertFalse([query for query in queries if '"api_task"' in query["sql"]])
@@ -0,0 +1,30 @@
+from django.contrib.auth.models import User
+from django.core.cache import cache
+from django.test import override_settings
+from rest_framework.test import APITestCase
+from api.cache import generation_key, user_tags_key
+from api.models import Tag
+
+
+@override_settings(CACHE_SHARED=True)
+class TagCacheTests(APITestCase):
+    def setUp(self):
+        cache.clear()
+        self.user = User.objects.create_user(username="tagger", password="tagger-password")
+        self.client.force_authenticate(self.user)
+        self.tag = Tag.objects.create(author=self.user, name="errands")
+
+    def generation(self):
+        return cache.get(generation_key(user_tags_key(self.user.pk)))
+
+    def test_delete_moves_the_generation_after_commit(self):
+        self.assertEqual([tag["name"] for tag in self.client.get("/api/tags/").data], ["errands"])
+        generation = self.generation()
+        with self.captureOnCommitCallbacks() as callbacks:
+            response = self.client.delete(f"/api/tags/{self.tag.pk}/")
+            self.assertEqual(response.status_code, 204)
+            self.assertEqual(self.generation(), generation)
+        for callback in callbacks:
+            callback()
+        self.assertNotEqual(self.generation(), generation)
+        self.assertEqual(self.client.get("/api/tags/").data, [])
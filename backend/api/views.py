@@ -1,24 +1,50 @@
+import logging
 import os
+from datetime import datetime, time, timedelta
 from django.shortcuts import render
-from .models import Tag, Note, Task
-from .serializers import TagSerializer, NoteSerializer, TaskSerializer, UserSerializer
-from rest_framework import viewsets
+from django.core.handlers.asgi import ASGIRequest
+from django.http import StreamingHttpResponse
+from django.shortcuts import get_object_or_404
+from .models import Tag, Note, Task, TaskOccurrence, Tombstone, ImportJob
+from .authentication import invalidate_cached_user
+from .batch import BatchError, parse_batch, run_batch
+from .cache import get_visible_tags
+from .conditional import ChangeTrackingMixin, conditional_on_changes
+from .serializers import FlatRowSerializer, ImportJobSerializer, TagSerializer, NoteSerializer, NoteSummarySerializer, TaskOccurrenceSerializer, TaskOccurrenceSyncSerializer, TaskSerializer, UserSerializer, visible_tags
+from .export import CSVRenderer, NDJSONRenderer, export_records, stream_async, stream_csv, stream_ndjson
+from .importer import IMPORT_FORMATS, ImportFileError, Importer, guess_format
+from .pomodoro import focus_time, record_session
+from .recurrence import expand_series, is_occurrence, next_open_due_after, overdue_series_ids, series_in_window, task_rule
+from .search import FullTextSearchFilter, SearchRankOrderingFilter, search_queryset
+from .stats import adjust_tag_completion, adjust_tag_stats, adjust_task_stats, get_task_stats, tag_facets, task_tag_links
+from .tagging import tag_array_enabled
+from .sync import decode_cursor, deleted_since, next_cursor, record_deletions, tombstone_retention
+from rest_framework import serializers, viewsets
 from rest_framework.views import APIView
-from rest_framework.exceptions import PermissionDenied
+from rest_framework.exceptions import PermissionDenied, ValidationError
 from rest_framework.permissions import IsAuthenticated
 from rest_framework.response import Response
 from rest_framework import status
 from rest_framework.decorators import action, api_view, permission_classes
 from rest_framework.permissions import AllowAny
-from rest_framework import filters
+from rest_framework.parsers import MultiPartParser
 from django_filters.rest_framework import DjangoFilterBackend
 from django_filters import rest_framework as django_filters
 from django.utils import timezone
-from django.db.models import Q, Count
+from django.utils.dateparse import parse_date, parse_datetime
+from django.db import transaction
+from django.db.models import Exists, F, OuterRef, Q
 from django.contrib.auth.models import User
 from django.contrib.auth import authenticate
 from rest_framework_simplejwt.tokens import RefreshToken
 
+logger = logging.getLogger(__name__)
+
+MAX_CALENDAR_WINDOW = timedelta(days=366)
+MAX_BULK_TASKS = 5000
+MAX_FOCUS_RANGE_DAYS = {"day": 366, "week": 366 * 5}
+OCCURRENCE_DATETIME = serializers.DateTimeField()
+
 def set_jwt_cookies(response, refresh_token):
     is_secure = not os.getenv('DEBUG', 'False').lower() == 'true'
     
@@ -42,6 +68,31 @@ def set_jwt_cookies(response, refresh_token):
 
 # Create your views here.
 
+def with_facets(data, facets):
+    # Facets ride along with the page; plain lists are wrapped to make room.
+    if facets is None:
+        return data
+    if isinstance(data, dict):
+        return {**data, "facets": facets}
+    return {"results": data, "facets": facets}
+
+class FlatListMixin:
+    # Lists are serialized from flat rows and support `?fields=` and
+    # `?expand=tags` sparse fieldsets; detail views keep the full serializer.
+    def list(self, request, *args, **kwargs):
+        queryset = self.filter_queryset(self.get_queryset())
+        serializer = FlatRowSerializer.from_request(self.get_serializer_class(), request)
+        rows = serializer.values(queryset)
+        facets = self.get_facets(rows)
+
+        page = self.paginate_queryset(rows)
+        if page is not None:
+            return Response(with_facets(self.get_paginated_response(serializer.serialize(page)).data, facets))
+        return Response(with_facets(serializer.serialize(rows), facets))
+
+    def get_facets(self, rows):
+        return None
+
 class UserView(viewsets.ModelViewSet):
     queryset = User.objects.all()
     serializer_class = UserSerializer
@@ -117,6 +168,9 @@ def register_view(request):
 
 @api_view(['POST'])
 def logout_view(request):
+    if request.user.is_authenticated:
+        invalidate_cached_user(request.user.pk)
+
     response = Response({'message': 'Successfully logged out'})
         
     response.delete_cookie('access_token')
@@ -138,8 +192,10 @@ class TaskFilter(django_filters.FilterSet):
     tags = django_filters.ModelMultipleChoiceFilter(
         queryset=Tag.objects.all(),
         field_name='tags',
-        to_field_name='id'
+        to_field_name='id',
+        method='filter_tags'
     )
+    tag_match = django_filters.ChoiceFilter(choices=[('any', 'any'), ('all', 'all')], method='filter_tag_match')
     completed = django_filters.BooleanFilter()
     has_due_date = django_filters.BooleanFilter(method='filter_has_due_date')
     overdue = django_filters.BooleanFilter(method='filter_overdue')
@@ -149,6 +205,28 @@ class TaskFilter(django_filters.FilterSet):
         model = Task
         fields = ['completed', 'tags']
     
+    def filter_tags(self, queryset, name, value):
+        # Semi-joins instead of a join through the tag links, so a task
+        # matching several tags still comes back once; each check is a probe
+        # of the (task, tag) unique index. With TASK_TAG_ARRAY the check is
+        # on the task row itself (GIN-indexed on PostgreSQL).
+        tag_ids = {tag.pk for tag in value}
+        if not tag_ids:
+            return queryset
+        match_all = self.form.cleaned_data.get('tag_match') == 'all'
+        if tag_array_enabled():
+            if match_all:
+                return queryset.filter(tag_id_array__contains=tag_ids)
+            return queryset.filter(tag_id_array__overlap=tag_ids)
+        links = Task.tags.through.objects.filter(task=OuterRef('pk'))
+        if match_all:
+            return queryset.filter(*[Exists(links.filter(tag_id=tag_id)) for tag_id in tag_ids])
+        return queryset.filter(Exists(links.filter(tag_id__in=tag_ids)))
+
+    def filter_tag_match(self, queryset, name, value):
+        # Read by filter_tags.
+        return queryset
+
     def filter_has_due_date(self, queryset, name, value):
         if value:
             return queryset.exclude(due_date__isnull=True)
@@ -157,24 +235,28 @@ class TaskFilter(django_filters.FilterSet):
     
     def filter_overdue(self, queryset, name, value):
         if value:
-            return queryset.filter(due_date__lt=timezone.now(), completed=False)
+            now = timezone.now()
+            return queryset.filter(
+                Q(recurrence="", due_date__lt=now, completed=False)
+                | Q(id__in=overdue_series_ids(self.request.user, now))
+            )
         return queryset
     
     def filter_search(self, queryset, name, value):
-        return queryset.filter(
-            Q(name__icontains=value) | Q(description__icontains=value)
-        )
+        return search_queryset(queryset, value)
 
-class TagViewSet(viewsets.ModelViewSet):
+class TagViewSet(ChangeTrackingMixin, viewsets.ModelViewSet):
     queryset = Tag.objects.all()
     serializer_class = TagSerializer
     permission_classes = [IsAuthenticated]
     
     def get_queryset(self):
-        user = self.request.user
-        return Tag.objects.filter(
-            Q(author__isnull=True) | Q(author=user)
-        ).order_by('is_builtin', 'name')
+        return visible_tags(self.request.user).order_by('is_builtin', 'name')
+
+    def list(self, request, *args, **kwargs):
+        if {'cursor', 'page_size'} & set(request.query_params):
+            return super().list(request, *args, **kwargs)
+        return Response(get_visible_tags(request.user))
 
     def perform_create(self, serializer):
         serializer.save(author=self.request.user)
@@ -184,57 +266,186 @@ class TagViewSet(viewsets.ModelViewSet):
             raise PermissionDenied("You can't delete built-in tags.")
         if instance.author != self.request.user:
             raise PermissionDenied("You can only delete your own tags.")
-        return super().perform_destroy(instance)
+        with transaction.atomic():
+            record_deletions(self.request.user, Tombstone.TAG, [instance.pk])
+            return super().perform_destroy(instance)
     
-class NoteViewSet(viewsets.ModelViewSet):
+class NoteViewSet(ChangeTrackingMixin, FlatListMixin, viewsets.ModelViewSet):
     permission_classes = [IsAuthenticated]
     serializer_class = NoteSerializer
+    filter_backends = [FullTextSearchFilter, SearchRankOrderingFilter]
+    ordering_fields = ['created_at', 'updated_at', 'name']
+    ordering = ['created_at']
     
     def get_queryset(self):
         return Note.objects.filter(author=self.request.user).order_by("created_at")
+
+    def get_serializer_class(self):
+        if self.action == "list":
+            return NoteSummarySerializer
+        return NoteSerializer
+
+    @conditional_on_changes()
+    def list(self, request, *args, **kwargs):
+        return super().list(request, *args, **kwargs)
     
     def perform_create(self, serializer):
         serializer.save(author=self.request.user)
+
+    @transaction.atomic
+    def perform_destroy(self, instance):
+        record_deletions(self.request.user, Tombstone.NOTE, [instance.pk])
+        instance.delete()
         
-class TaskViewSet(viewsets.ModelViewSet):
+class TaskViewSet(ChangeTrackingMixin, FlatListMixin, viewsets.ModelViewSet):
     permission_classes = [IsAuthenticated]
     serializer_class = TaskSerializer
-    filter_backends = [DjangoFilterBackend, filters.SearchFilter, filters.OrderingFilter]
+    filter_backends = [DjangoFilterBackend, SearchRankOrderingFilter]
     filterset_class = TaskFilter
-    search_fields = ['name', 'description']
     ordering_fields = ['created_at', 'updated_at', 'due_date', 'name', 'completed']
     ordering = ['due_date', '-created_at']
 
     def get_queryset(self):
         return Task.objects.filter(author=self.request.user).prefetch_related('tags').order_by(*self.ordering)
 
+    @conditional_on_changes(time_sensitive=True)
+    def list(self, request, *args, **kwargs):
+        return super().list(request, *args, **kwargs)
+
+    def get_facets(self, rows):
+        # `?facets=tags` adds how many of the filtered tasks carry each tag.
+        facets = self.request.query_params.get('facets')
+        if facets is None:
+            return None
+        if facets != 'tags':
+            raise ValidationError({'facets': ['Only tags facets are supported.']})
+        return {'tags': tag_facets(rows)}
+
+    @transaction.atomic
     def perform_create(self, serializer):
-        serializer.save(author=self.request.user)
+        task = serializer.save(author=self.request.user)
+        adjust_task_stats(self.request.user, total=1, completed=int(task.completed))
+        adjust_tag_stats(self.request.user, added=task_tag_links([task.pk]))
+
+    @transaction.atomic
+    def perform_update(self, serializer):
+        # Compare against the locked row, not the copy loaded by get_object(),
+        # so concurrent updates can't both count the same completion.
+        was_completed = Task.objects.select_for_update().values_list('completed', flat=True).get(pk=serializer.instance.pk)
+        tags_sent = 'tags' in serializer.validated_data
+        links = task_tag_links([serializer.instance.pk]) if tags_sent else None
+        task = serializer.save()
+        adjust_task_stats(self.request.user, completed=int(task.completed) - int(was_completed))
+        if tags_sent:
+            adjust_tag_stats(self.request.user, removed=links, added=task_tag_links([task.pk]))
+        elif task.completed != was_completed:
+            adjust_tag_completion(self.request.user, [task.pk], task.completed)
+
+    @transaction.atomic
+    def perform_destroy(self, instance):
+        adjust_task_stats(self.request.user, total=-1, completed=-int(instance.completed))
+        adjust_tag_stats(self.request.user, removed=task_tag_links([instance.pk]))
+        record_deletions(self.request.user, Tombstone.TASK, [instance.pk])
+        instance.delete()
+
+    def set_completed(self, task, completed):
+        # Conditional write like bulk_complete: of two concurrent calls only
+        # the one that flips the row adjusts the counters.
+        now = timezone.now()
+        with transaction.atomic():
+            changed = Task.objects.filter(pk=task.pk, completed=not completed).update(completed=completed, updated_at=now)
+            adjust_task_stats(self.request.user, completed=changed if completed else -changed)
+            if changed:
+                adjust_tag_completion(self.request.user, [task.pk], completed)
+        task.completed = completed
+        if changed:
+            task.updated_at = now
 
     @action(detail=True, methods=['post'])
     def complete(self, request, pk=None):
         task = self.get_object()
-        task.completed = True
-        task.save(update_fields=['completed'])
+        self.set_completed(task, True)
         serializer = self.get_serializer(task)
         return Response(serializer.data)
     
     @action(detail=True, methods=['post'])
     def uncomplete(self, request, pk=None):
         task = self.get_object()
-        task.completed = False
-        task.save(update_fields=['completed'])
+        self.set_completed(task, False)
         serializer = self.get_serializer(task)
         return Response(serializer.data)
     
+    def get_bulk_items(self, request):
+        items = request.data.get('tasks') if isinstance(request.data, dict) else None
+        if not items or not isinstance(items, list):
+            return None, Response({"detail": "tasks is required"}, status=status.HTTP_400_BAD_REQUEST)
+        if len(items) > MAX_BULK_TASKS:
+            return None, Response({"detail": f"At most {MAX_BULK_TASKS} tasks can be sent at once"}, status=status.HTTP_400_BAD_REQUEST)
+        return items, None
+
+    @action(detail=False, methods=['post'])
+    def bulk_create(self, request):
+        items, error = self.get_bulk_items(request)
+        if error:
+            return error
+        
+        serializer = self.get_serializer(data=items, many=True)
+        serializer.is_valid(raise_exception=True)
+        
+        with transaction.atomic():
+            tasks = serializer.save(author=request.user)
+            adjust_task_stats(request.user, total=len(tasks), completed=sum(task.completed for task in tasks))
+            adjust_tag_stats(request.user, added=[(tag_id, task.completed) for task in tasks for tag_id in task.tag_id_array])
+        
+        created = self.get_queryset().filter(id__in=[task.id for task in tasks])
+        return Response(self.get_serializer(created, many=True).data, status=status.HTTP_201_CREATED)
+
+    @action(detail=False, methods=['post'])
+    def bulk_update(self, request):
+        items, error = self.get_bulk_items(request)
+        if error:
+            return error
+        
+        try:
+            task_ids = [int(item['id']) for item in items]
+        except (TypeError, KeyError, ValueError):
+            return Response({"detail": "Every task needs an id"}, status=status.HTTP_400_BAD_REQUEST)
+        if len(set(task_ids)) != len(task_ids):
+            return Response({"detail": "Each task can only appear once"}, status=status.HTTP_400_BAD_REQUEST)
+        
+        # The rows stay locked from the read to the write, so the completed
+        # counts the stats delta is based on can't change in between.
+        with transaction.atomic():
+            tasks = Task.objects.select_for_update().filter(id__in=task_ids, author=request.user).in_bulk()
+            missing = [task_id for task_id in task_ids if task_id not in tasks]
+            if missing:
+                return Response({"detail": "Tasks not found", "task_ids": missing}, status=status.HTTP_404_NOT_FOUND)
+
+            instances = [tasks[task_id] for task_id in task_ids]
+            was_completed = sum(task.completed for task in instances)
+            serializer = self.get_serializer(instances, data=items, many=True, partial=True)
+            serializer.is_valid(raise_exception=True)
+            links = task_tag_links(task_ids)
+            instances = serializer.save()
+            adjust_task_stats(request.user, completed=sum(task.completed for task in instances) - was_completed)
+            adjust_tag_stats(request.user, removed=links, added=task_tag_links(task_ids))
+        
+        updated = self.get_queryset().filter(id__in=task_ids)
+        return Response(self.get_serializer(updated, many=True).data)
+
     @action(detail=False, methods=['post'])
     def bulk_complete(self, request):
         task_ids = request.data.get('task_ids', [])
         if not task_ids:
             return Response({"detail": "task_ids is required"}, status=status.HTTP_400_BAD_REQUEST)
         
-        tasks = Task.objects.filter(id__in=task_ids, author=request.user)
-        updated_count = tasks.update(completed=True)
+        # The flipped rows are locked and named, so their tags' counters move
+        # by exactly the tasks this request changed.
+        with transaction.atomic():
+            flipped = list(Task.objects.select_for_update().filter(id__in=task_ids, author=request.user, completed=False).values_list('id', flat=True))
+            updated_count = Task.objects.filter(id__in=flipped).update(completed=True, updated_at=timezone.now())
+            adjust_task_stats(request.user, completed=updated_count)
+            adjust_tag_completion(request.user, flipped, True)
         
         return Response({"detail": f"{updated_count} tasks marked as completed", "updated_count": updated_count})
     
@@ -244,8 +455,11 @@ class TaskViewSet(viewsets.ModelViewSet):
         if not task_ids:
             return Response({"detail": "task_ids is required"}, status=status.HTTP_400_BAD_REQUEST)
         
-        tasks = Task.objects.filter(id__in=task_ids, author=request.user)
-        updated_count = tasks.update(completed=False)
+        with transaction.atomic():
+            flipped = list(Task.objects.select_for_update().filter(id__in=task_ids, author=request.user, completed=True).values_list('id', flat=True))
+            updated_count = Task.objects.filter(id__in=flipped).update(completed=False, updated_at=timezone.now())
+            adjust_task_stats(request.user, completed=-updated_count)
+            adjust_tag_completion(request.user, flipped, False)
         
         return Response({"detail": f"{updated_count} tasks marked as uncompleted", "updated_count": updated_count})
 
@@ -255,100 +469,348 @@ class TaskViewSet(viewsets.ModelViewSet):
         if not task_ids:
             return Response({"detail": "task_ids is required"}, status=status.HTTP_400_BAD_REQUEST)
         
-        tasks = Task.objects.filter(id__in=task_ids, author=request.user)
-        deleted_count, _ = tasks.delete()
+        with transaction.atomic():
+            rows = list(Task.objects.filter(id__in=task_ids, author=request.user).values_list('id', 'completed'))
+            deleted_ids = [task_id for task_id, _ in rows]
+            completed_count = sum(completed for _, completed in rows)
+            links = task_tag_links(deleted_ids)
+            record_deletions(request.user, Tombstone.TASK, deleted_ids)
+            _, deleted = Task.objects.filter(id__in=deleted_ids).delete()
+            deleted_count = deleted.get(Task._meta.label, 0)
+            adjust_task_stats(request.user, total=-deleted_count, completed=-completed_count)
+            adjust_tag_stats(request.user, removed=links)
         
         return Response({"detail": f"{deleted_count} tasks deleted", "deleted_count": deleted_count})
 
+    @action(detail=True, methods=['post', 'delete'])
+    def occurrence(self, request, pk=None):
+        # Stores the completion state or new due date of one occurrence of a
+        # recurring task; DELETE drops the override so the rule applies again.
+        task = self.get_object()
+        rule = task_rule(task) if task.recurrence else None
+        if rule is None:
+            return Response({"detail": "This task doesn't recur."}, status=status.HTTP_400_BAD_REQUEST)
+
+        serializer = TaskOccurrenceSerializer(data=request.data, partial=request.method == "DELETE")
+        serializer.is_valid(raise_exception=True)
+        original_due = serializer.validated_data.get("original_due")
+        if original_due is None or not is_occurrence(rule, task.due_date, original_due):
+            return Response({"original_due": ["Not an occurrence of this task."]}, status=status.HTTP_400_BAD_REQUEST)
+
+        # The task row is locked so concurrent overrides move the series
+        # watermark one after the other.
+        with transaction.atomic():
+            task.next_open_due = Task.objects.select_for_update().values_list("next_open_due", flat=True).get(pk=task.pk)
+            if request.method == "DELETE":
+                dropped = list(TaskOccurrence.objects.filter(task=task, original_due=original_due).values_list("id", flat=True))
+                TaskOccurrence.objects.filter(id__in=dropped).delete()
+                record_deletions(request.user, Tombstone.OCCURRENCE, dropped)
+                override = None
+            else:
+                values = {key: value for key, value in serializer.validated_data.items() if key != "original_due"}
+                override, _ = TaskOccurrence.objects.update_or_create(task=task, original_due=original_due, defaults=values)
+            # The series counts as changed too, so clients syncing tasks by
+            # updated_at refetch it along with its overrides.
+            task.next_open_due = next_open_due_after(task, rule, original_due, stored=override is not None)
+            task.updated_at = timezone.now()
+            Task.objects.filter(pk=task.pk).update(next_open_due=task.next_open_due, updated_at=task.updated_at)
+
+        if override is None:
+            return Response(status=status.HTTP_204_NO_CONTENT)
+        return Response(TaskOccurrenceSerializer(override).data)
+
     @action(detail=True, methods=['post'])
     def start_pomodoro(self, request, pk=None):
         task = self.get_object()
         task.pomodoro_start = timezone.now()
-        task.save(update_fields=["pomodoro_start"])
+        task.save(update_fields=["pomodoro_start", "updated_at"])
         return Response({"status": "started", "pomodoro_start": task.pomodoro_start})
     
     @action(detail=True, methods=['post'])
     def end_pomodoro(self, request, pk=None):
         task = self.get_object()
-        if not task.pomodoro_start:
+        started_at = task.pomodoro_start
+        if not started_at:
             return Response({"detail": "There is no pomodoro timer active."}, status=status.HTTP_400_BAD_REQUEST)
 
         now = timezone.now()
-        duration = now - task.pomodoro_start
+        duration = now - started_at
 
-        task.last_pomodoro_duration = duration
-        task.total_pomodoro_time += duration
-        task.pomodoro_start = None
-        task.save(update_fields=["last_pomodoro_duration", "total_pomodoro_time", "pomodoro_start"])
+        with transaction.atomic():
+            # Only the request that still sees this start time ends the
+            # session, so two tabs ending the same timer can't double count.
+            ended = Task.objects.filter(pk=task.pk, pomodoro_start=started_at).update(
+                pomodoro_start=None,
+                last_pomodoro_duration=duration,
+                total_pomodoro_time=F("total_pomodoro_time") + duration,
+                updated_at=now,
+            )
+            if not ended:
+                return Response({"detail": "There is no pomodoro timer active."}, status=status.HTTP_400_BAD_REQUEST)
+            record_session(task, started_at, now)
 
+        task.refresh_from_db(fields=["total_pomodoro_time"])
         return Response({"status": "ended", "last_pomodoro_duration": duration, "total_pomodoro_time": task.total_pomodoro_time})
 
 class TaskStatsView(APIView):
     permission_classes = [IsAuthenticated]
     
+    @conditional_on_changes(time_sensitive=True)
     def get(self, request, *args, **kwargs):
-        user_tasks = Task.objects.filter(author=request.user)
-        total_tasks = user_tasks.count()
-        completed_tasks = user_tasks.filter(completed=True).count()
-        pending_tasks = total_tasks - completed_tasks
-        overdue_tasks = user_tasks.filter(due_date__lt=timezone.now(), completed=False).count()
-        tag_stats = user_tasks.values('tags__name').annotate(count=Count('id'), completed_count=Count('id', filter=Q(completed=True))).exclude(tags__name__isnull=True)
-        
-        return Response({"total_tasks": total_tasks, "completed_tasks": completed_tasks, "pending_tasks": pending_tasks, "overdue_tasks": overdue_tasks, "tag_stats": list(tag_stats)})
+        return Response(get_task_stats(request.user))
     
+def calendar_window(params):
+    start = params.get("start")
+    end = params.get("end")
+
+    if start or end:
+        if not start or not end:
+            raise ValueError("Both start and end parameters are required")
+        start = parse_window_bound(start)
+        end = parse_window_bound(end)
+        if start is None or end is None:
+            raise ValueError("Invalid date parameters")
+        if end <= start:
+            raise ValueError("end must be after start")
+        if end - start > MAX_CALENDAR_WINDOW:
+            raise ValueError(f"The date range can't be longer than {MAX_CALENDAR_WINDOW.days} days")
+        return start, end
+
+    month = params.get("month")
+    year = params.get("year")
+    day = params.get("day")
+
+    if not month or not year:
+        raise ValueError("Month and year parameters are required")
+
+    try:
+        month = int(month)
+        year = int(year)
+        if day:
+            start = datetime(year, month, int(day))
+            end = start + timedelta(days=1)
+        else:
+            start = datetime(year, month, 1)
+            end = datetime(year + month // 12, month % 12 + 1, 1)
+    except (ValueError, OverflowError):
+        raise ValueError("Invalid date parameters")
+
+    return timezone.make_aware(start), timezone.make_aware(end)
+
+def parse_window_bound(value):
+    try:
+        parsed = parse_datetime(value)
+        if parsed is None:
+            parsed = parse_date(value)
+            if parsed is None:
+                return None
+            parsed = datetime.combine(parsed, time.min)
+    except ValueError:
+        return None
+    if timezone.is_naive(parsed):
+        parsed = timezone.make_aware(parsed)
+    return parsed
+
+def group_by_date(entries):
+    grouped = {}
+    for moment, data in entries:
+        grouped.setdefault(moment.date().isoformat(), []).append(data)
+    return grouped
+
+def occurrence_data(task_data, original_due, override):
+    # A recurring task's occurrence is rendered as the task itself, moved to
+    # the occurrence's due date and carrying its own completion state.
+    data = dict(task_data)
+    data["occurrence"] = OCCURRENCE_DATETIME.to_representation(original_due)
+    if override is not None:
+        data["due_date"] = OCCURRENCE_DATETIME.to_representation(override.effective_due)
+        data["completed"] = task_data["completed"] or override.completed
+    else:
+        data["due_date"] = data["occurrence"]
+    return data
+
+def calendar_tasks(user, start, end):
+    tasks = list(Task.objects.filter(author=user).filter(
+        Q(recurrence="", due_date__gte=start, due_date__lt=end) | series_in_window(start, end)
+    ).prefetch_related("tags").order_by("due_date"))
+    single = [task for task in tasks if not task.recurrence]
+    series = [task for task in tasks if task.recurrence]
+    entries = list(zip([task.due_date for task in single], TaskSerializer(single, many=True).data))
+
+    if series:
+        series_data = {task.pk: data for task, data in zip(series, TaskSerializer(series, many=True).data)}
+        for task, original_due, override in expand_series(series, start, end):
+            due = override.effective_due if override is not None else original_due
+            entries.append((due, occurrence_data(series_data[task.pk], original_due, override)))
+        entries.sort(key=lambda entry: entry[0])
+    return group_by_date(entries)
+
+def calendar_notes(user, start, end):
+    notes = list(Note.objects.filter(
+        author=user,
+        created_at__gte=start,
+        created_at__lt=end
+    ).defer("notes").prefetch_related("tags").order_by("created_at"))
+    return group_by_date(zip([note.created_at for note in notes], NoteSummarySerializer(notes, many=True).data))
+
 class CalendarView(APIView):
     permission_classes = [IsAuthenticated]
     
+    @conditional_on_changes()
     def get(self, request, *args, **kwargs):
-        from datetime import datetime
-        
-        month = request.GET.get("month")
-        year = request.GET.get("year")
-        day = request.GET.get("day")
-        
-        if not month or not year:
-            return Response({"error": "Month and year parameters are required"}, status=status.HTTP_400_BAD_REQUEST)
+        try:
+            start, end = calendar_window(request.GET)
+        except ValueError as e:
+            return Response({"error": str(e)}, status=status.HTTP_400_BAD_REQUEST)
         
+        return Response({
+            "tasks": calendar_tasks(request.user, start, end),
+            "notes": calendar_notes(request.user, start, end),
+        })
+
+class ChangesView(APIView):
+    permission_classes = [IsAuthenticated]
+
+    @conditional_on_changes()
+    def get(self, request, *args, **kwargs):
+        user = request.user
+        cursor = next_cursor()
+        since = request.GET.get("since")
+
+        if since:
+            try:
+                since = decode_cursor(since)
+            except ValueError as e:
+                return Response({"error": str(e)}, status=status.HTTP_400_BAD_REQUEST)
+            if since < timezone.now() - tombstone_retention():
+                since = None
+
+        tasks = Task.objects.filter(author=user).prefetch_related("tags").order_by("updated_at", "id")
+        notes = Note.objects.filter(author=user).prefetch_related("tags").order_by("updated_at", "id")
+        tags = visible_tags(user).order_by("updated_at", "id")
+        occurrences = TaskOccurrence.objects.filter(task__author=user).order_by("updated_at", "id")
+
+        if since is None:
+            deleted = {kind: [] for kind, _ in Tombstone.KIND_CHOICES}
+        else:
+            tasks = tasks.filter(updated_at__gt=since)
+            notes = notes.filter(updated_at__gt=since)
+            tags = tags.filter(updated_at__gt=since)
+            occurrences = occurrences.filter(updated_at__gt=since)
+            deleted = deleted_since(user, since)
+
+        return Response({
+            "cursor": cursor,
+            "full_resync": since is None,
+            "tasks": TaskSerializer(tasks, many=True).data,
+            "notes": NoteSerializer(notes, many=True).data,
+            "tags": TagSerializer(tags, many=True).data,
+            "occurrences": TaskOccurrenceSyncSerializer(occurrences, many=True).data,
+            "deleted": {
+                "tasks": deleted[Tombstone.TASK],
+                "notes": deleted[Tombstone.NOTE],
+                "tags": deleted[Tombstone.TAG],
+                "occurrences": deleted[Tombstone.OCCURRENCE],
+            },
+        })
+
+class FocusTimeView(APIView):
+    permission_classes = [IsAuthenticated]
+
+    def get(self, request, *args, **kwargs):
+        period = request.GET.get("period", "day")
+        if period not in ("day", "week"):
+            return Response({"error": "period must be day or week"}, status=status.HTTP_400_BAD_REQUEST)
+
+        today = timezone.localdate()
+        start = request.GET.get("start")
+        end = request.GET.get("end")
         try:
-            month = int(month)
-            year = int(year)
-            if day:
-                day = int(day)
+            end = parse_date(end) if end else today
+            start = parse_date(start) if start else end - timedelta(days=6 if period == "day" else 7 * 11)
         except ValueError:
+            start = end = None
+        if start is None or end is None:
             return Response({"error": "Invalid date parameters"}, status=status.HTTP_400_BAD_REQUEST)
-        
-        result = {"tasks": {}, "notes": {}}
-        
-        tasks = Task.objects.filter(
-            author=self.request.user,
-            due_date__isnull=False
-        ).order_by("due_date")
-        
-        notes = Note.objects.filter(author=self.request.user).order_by("created_at")
-        
-        for task in tasks:
-            if task.due_date:
-                task_month = task.due_date.month
-                task_year = task.due_date.year
-                
-                if year == task_year and month == task_month:
-                    task_data = TaskSerializer(task).data
-                    date_key = task.due_date.date().isoformat()
-                    
-                    if date_key not in result["tasks"]:
-                        result["tasks"][date_key] = []
-                    result["tasks"][date_key].append(task_data)
-        
-        for note in notes:
-            note_month = note.created_at.month
-            note_year = note.created_at.year
-            
-            if year == note_year and month == note_month:
-                note_data = NoteSerializer(note).data
-                date_key = note.created_at.date().isoformat()
-                
-                if date_key not in result["notes"]:
-                    result["notes"][date_key] = []
-                result["notes"][date_key].append(note_data)
-        
-        return Response(result)
\ No newline at end of file
+        if end < start:
+            return Response({"error": "end must be after start"}, status=status.HTTP_400_BAD_REQUEST)
+        if (end - start).days > MAX_FOCUS_RANGE_DAYS[period]:
+            return Response({"error": f"The date range can't be longer than {MAX_FOCUS_RANGE_DAYS[period]} days"}, status=status.HTTP_400_BAD_REQUEST)
+
+        results = focus_time(request.user, start, end, period)
+        return Response({
+            "period": period,
+            "total_seconds": sum(result["total_seconds"] for result in results),
+            "session_count": sum(result["session_count"] for result in results),
+            "results": results,
+        })
+
+class ExportView(APIView):
+    permission_classes = [IsAuthenticated]
+    renderer_classes = [NDJSONRenderer, CSVRenderer]
+
+    def get(self, request, *args, **kwargs):
+        include = {part.strip() for part in request.GET.get("include", "tasks,notes").split(",")}
+        if not include or not include <= {"tasks", "notes"}:
+            return Response({"error": "include must list tasks and/or notes"}, status=status.HTTP_400_BAD_REQUEST)
+
+        records = export_records(request.user, include)
+        if request.accepted_renderer.format == "csv":
+            content, extension = stream_csv(records), "csv"
+        else:
+            content, extension = stream_ndjson(records), "ndjson"
+        if isinstance(request._request, ASGIRequest):
+            content = stream_async(content)
+
+        response = StreamingHttpResponse(content, content_type=request.accepted_renderer.media_type)
+        response["Content-Disposition"] = f'attachment; filename="agenda-export.{extension}"'
+        return response
+
+class BatchView(APIView):
+    permission_classes = [IsAuthenticated]
+
+    def post(self, request, *args, **kwargs):
+        try:
+            items, atomic = parse_batch(request.data)
+        except BatchError as e:
+            return Response({"error": str(e)}, status=status.HTTP_400_BAD_REQUEST)
+
+        responses, committed = run_batch(request, items, atomic)
+        return Response({"committed": committed, "responses": responses})
+
+class ImportView(APIView):
+    permission_classes = [IsAuthenticated]
+    parser_classes = [MultiPartParser]
+
+    def get(self, request, pk=None, *args, **kwargs):
+        if pk is None:
+            jobs = ImportJob.objects.filter(author=request.user).order_by("-created_at")
+            return Response(ImportJobSerializer(jobs, many=True).data)
+        job = get_object_or_404(ImportJob, pk=pk, author=request.user)
+        return Response(ImportJobSerializer(job).data)
+
+    def post(self, request, pk=None, *args, **kwargs):
+        upload = request.FILES.get("file")
+        if upload is None:
+            return Response({"error": "A file upload is required"}, status=status.HTTP_400_BAD_REQUEST)
+
+        if pk is not None:
+            job = get_object_or_404(ImportJob, pk=pk, author=request.user)
+            if job.status == ImportJob.COMPLETED:
+                return Response({"error": "This import already completed"}, status=status.HTTP_400_BAD_REQUEST)
+            job.status = ImportJob.RUNNING
+            job.save(update_fields=["status", "updated_at"])
+        else:
+            format = request.data.get("format") or guess_format(upload.name)
+            if format not in IMPORT_FORMATS:
+                return Response({"error": "format must be ndjson or csv"}, status=status.HTTP_400_BAD_REQUEST)
+            job = ImportJob.objects.create(author=request.user, source=upload.name[-255:], format=format)
+
+        try:
+            Importer(job).run(upload)
+        except ImportFileError:
+            # The job is marked failed with the error; anything unexpected
+            # propagates as a server error instead.
+            logger.exception("Import %s failed", job.pk)
+            return Response(ImportJobSerializer(job).data, status=status.HTTP_400_BAD_REQUEST)
+        return Response(ImportJobSerializer(job).data, status=status.HTTP_201_CREATED if pk is None else status.HTTP_200_OK)
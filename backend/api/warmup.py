@@ -0,0 +1,54 @@
+from django.db import connections
+from django.urls import get_resolver, resolve
+from rest_framework.settings import api_settings
+
+from .cache import prime_builtin_tags
+from .serializers import FlatRowSerializer, ImportJobSerializer, NoteSerializer, TagSerializer, TaskSerializer, UserSerializer
+
+WARMUP_PATHS = [
+    "/api/tasks/",
+    "/api/tasks/1/",
+    "/api/tasks/stats/",
+    "/api/notes/",
+    "/api/tags/",
+    "/api/calendar/",
+    "/api/changes/",
+]
+
+def warm_urls():
+    get_resolver().url_patterns
+    for path in WARMUP_PATHS:
+        resolve(path)
+
+def warm_serializers():
+    # Builds field mappings and imports everything DRF loads lazily on the
+    # first request: settings-referenced classes, field and relation modules.
+    for name in (
+        "DEFAULT_AUTHENTICATION_CLASSES",
+        "DEFAULT_PERMISSION_CLASSES",
+        "DEFAULT_RENDERER_CLASSES",
+        "DEFAULT_PARSER_CLASSES",
+        "DEFAULT_PAGINATION_CLASS",
+    ):
+        getattr(api_settings, name)
+    for serializer_class in (TaskSerializer, NoteSerializer, TagSerializer, UserSerializer, ImportJobSerializer):
+        serializer_class().fields
+    for serializer_class in (TaskSerializer, NoteSerializer, TagSerializer):
+        FlatRowSerializer(serializer_class)
+
+def warm_connections():
+    for connection in connections.all():
+        connection.ensure_connection()
+
+def release_connections():
+    # Connections and pools can't be shared with forked workers.
+    for connection in connections.all():
+        connection.close()
+        close_pool = getattr(connection, "close_pool", None)
+        if close_pool is not None:
+            close_pool()
+
+def warm_up():
+    warm_urls()
+    warm_serializers()
+    prime_builtin_tags()
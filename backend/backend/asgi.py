@@ -13,4 +13,15 @@ from django.core.asgi import get_asgi_application
 
 os.environ.setdefault('DJANGO_SETTINGS_MODULE', 'backend.settings')
 
-application = get_asgi_application()
+django_application = get_asgi_application()
+
+from api.events import EVENTS_PATH, event_stream  # noqa: E402  (needs settings loaded)
+
+
+async def application(scope, receive, send):
+    # The event stream bypasses Django's request handling, so an open stream
+    # holds no request, middleware state or database connection.
+    if scope['type'] == 'http' and scope['path'] == EVENTS_PATH:
+        await event_stream(scope, receive, send)
+    else:
+        await django_application(scope, receive, send)
@@ -11,6 +11,7 @@ https://docs.djangoproject.com/en/5.2/ref/settings/
 """
 
 from pathlib import Path
+import copy
 import os
 from datetime import timedelta
 
@@ -49,6 +50,8 @@ INSTALLED_APPS = [
 ]
 
 MIDDLEWARE = [
+    'api.profiling.RequestProfilingMiddleware',
+    'api.replicas.ReplicaRoutingMiddleware',
     'corsheaders.middleware.CorsMiddleware',
     'django.middleware.security.SecurityMiddleware',
     'whitenoise.middleware.WhiteNoiseMiddleware',
@@ -105,9 +108,68 @@ else:
             'PASSWORD': DB_PASSWORD,
             'HOST': DB_HOST,
             'PORT': DB_PORT,
+            'CONN_MAX_AGE': int(os.getenv('DB_CONN_MAX_AGE', '60')),
+            'CONN_HEALTH_CHECKS': True,
         }
     }
 
+    # PostgreSQL connection pool (psycopg 3). Connections are checked before
+    # being handed out, and the pool replaces persistent connections.
+    if DB_ENGINE == 'django.db.backends.postgresql' and os.getenv('DB_POOL', 'True').lower() == 'true':
+        from psycopg_pool import ConnectionPool
+
+        DATABASES['default']['CONN_MAX_AGE'] = 0
+        DATABASES['default']['OPTIONS'] = {
+            'pool': {
+                'min_size': int(os.getenv('DB_POOL_MIN_SIZE', '2')),
+                'max_size': int(os.getenv('DB_POOL_MAX_SIZE', '10')),
+                'timeout': int(os.getenv('DB_POOL_TIMEOUT', '10')),
+                'max_idle': 300,
+                'check': ConnectionPool.check_connection,
+            },
+        }
+
+# Read replicas: a comma-separated list of database files (SQLite) or hosts
+# (PostgreSQL) that mirror the primary. Safe requests read from one of them
+# unless the user wrote within DB_REPLICA_STICKY_SECONDS. Locally, point
+# DB_REPLICAS at a copy of the database file and refresh the copy to
+# simulate replication.
+DB_REPLICAS = [value.strip() for value in os.getenv('DB_REPLICAS', '').split(',') if value.strip()]
+DB_REPLICA_STICKY_SECONDS = int(os.getenv('DB_REPLICA_STICKY_SECONDS', '10'))
+
+for index, replica in enumerate(DB_REPLICAS, 1):
+    replica_config = copy.deepcopy(DATABASES['default'])
+    replica_config['NAME' if DB_ENGINE == 'django.db.backends.sqlite3' else 'HOST'] = replica
+    replica_config['TEST'] = {'MIRROR': 'default'}
+    DATABASES[f'replica{index}'] = replica_config
+
+if DB_REPLICAS:
+    DATABASE_ROUTERS = ['api.replicas.ReplicaRouter']
+
+# Cache
+# https://docs.djangoproject.com/en/5.2/topics/cache/
+
+CACHES = {
+    'default': {
+        'BACKEND': os.getenv('CACHE_BACKEND', 'django.core.cache.backends.locmem.LocMemCache'),
+        'LOCATION': os.getenv('CACHE_LOCATION', ''),
+    }
+}
+
+# Whether every process sees the same cache. Caches that must be invalidated
+# across workers (users, tags) are only used when it is.
+CACHE_SHARED = CACHES['default']['BACKEND'] not in (
+    'django.core.cache.backends.locmem.LocMemCache',
+    'django.core.cache.backends.dummy.DummyCache',
+)
+
+TAG_CACHE_TIMEOUT = int(os.getenv('TAG_CACHE_TIMEOUT', '300'))
+
+# Seconds an authenticated user is cached per access token (0 disables). Saving
+# or deleting a user invalidates it, which only reaches every worker through a
+# shared cache, so it is off by default with a per-process one.
+AUTH_USER_CACHE_TIMEOUT = int(os.getenv('AUTH_USER_CACHE_TIMEOUT', '60' if CACHE_SHARED else '0'))
+
 # Password validation
 # https://docs.djangoproject.com/en/5.2/ref/settings/#auth-password-validators
 
@@ -159,8 +221,68 @@ REST_FRAMEWORK = {
     'DEFAULT_PERMISSION_CLASSES': [
         'rest_framework.permissions.IsAuthenticated',
     ],
+    'DEFAULT_PAGINATION_CLASS': 'api.pagination.KeysetPagination',
+    'PAGE_SIZE': 50,
 }
 
+# Serve dashboard counters from the incrementally maintained api_taskstats and
+# api_tagstats tables instead of grouping over the user's tasks.
+TASK_STATS_TABLE = os.getenv('TASK_STATS_TABLE', 'False').lower() == 'true'
+
+# Filter and render task tags from the denormalized api_task.tag_id_array
+# column instead of joining api_task_tags. The column is always kept in sync.
+TASK_TAG_ARRAY = os.getenv('TASK_TAG_ARRAY', 'False').lower() == 'true'
+
+# Deletions older than this can't be synced incrementally; clients get a full resync
+SYNC_TOMBSTONE_RETENTION_DAYS = int(os.getenv('SYNC_TOMBSTONE_RETENTION_DAYS', '30'))
+
+# Serve the stats, calendar and task list endpoints from async views that run
+# their independent queries concurrently. Meant for ASGI deployments.
+ASYNC_DASHBOARD_VIEWS = os.getenv('ASYNC_DASHBOARD_VIEWS', 'False').lower() == 'true'
+
+# Change events pushed over /api/events/ (ASGI only). PostgresBroker fans out
+# through LISTEN/NOTIFY when writes and streams are served by different
+# processes and is the default on PostgreSQL; InProcessBroker only reaches
+# streams in the same process, so gunicorn refuses to start it with more than
+# one ASGI worker.
+EVENT_BROKER = os.getenv(
+    'EVENT_BROKER',
+    'api.events.PostgresBroker' if DB_ENGINE == 'django.db.backends.postgresql' else 'api.events.InProcessBroker',
+)
+EVENT_STREAM_HEARTBEAT = int(os.getenv('EVENT_STREAM_HEARTBEAT', '15'))
+
+# Per-request profiling: Server-Timing headers and a slow-request log. Only the
+# sampled share of requests pays for SQL, serializer and render timing.
+REQUEST_PROFILING = os.getenv('REQUEST_PROFILING', 'False').lower() == 'true'
+REQUEST_PROFILING_SAMPLE_RATE = float(os.getenv('REQUEST_PROFILING_SAMPLE_RATE', '0.05'))
+SLOW_REQUEST_MS = int(os.getenv('SLOW_REQUEST_MS', '500'))
+SLOW_REQUEST_LOG_QUERIES = int(os.getenv('SLOW_REQUEST_LOG_QUERIES', '10'))
+
+LOGGING = {
+    'version': 1,
+    'disable_existing_loggers': False,
+    'handlers': {
+        'console': {
+            'class': 'logging.StreamHandler',
+        },
+    },
+    'loggers': {
+        'api.profiling': {
+            'handlers': ['console'],
+            'level': 'WARNING',
+            'propagate': False,
+        },
+    },
+}
+
+# How far ahead `manage.py run_reminders` queues reminders for open tasks
+REMINDER_WINDOW_MINUTES = int(os.getenv('REMINDER_WINDOW_MINUTES', '15'))
+
+# PostgreSQL only: compression method for note bodies ('pglz' or 'lz4') and the
+# row size in bytes above which they are compressed, applied after migrate.
+NOTE_BODY_COMPRESSION = os.getenv('NOTE_BODY_COMPRESSION', '')
+NOTE_COMPRESSION_MIN_BYTES = int(os.getenv('NOTE_COMPRESSION_MIN_BYTES', '2032'))
+
 # JWT Settings
 JWT_ACCESS_TOKEN_LIFETIME = 60
 JWT_REFRESH_TOKEN_LIFETIME = 1440
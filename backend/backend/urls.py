@@ -14,11 +14,12 @@ Including another URLconf
     1. Import the include() function: from django.urls import include, path
     2. Add a URL to urlpatterns:  path('blog/', include('blog.urls'))
 """
+from django.conf import settings
 from django.contrib import admin
 from django.urls import path, include
 from rest_framework.routers import DefaultRouter
 from rest_framework_simplejwt.views import TokenRefreshView
-from api.views import TagViewSet, NoteViewSet, TaskViewSet, CalendarView, TaskStatsView, UserView, login_view, register_view, logout_view, user_profile_view
+from api.views import TagViewSet, NoteViewSet, TaskViewSet, BatchView, CalendarView, ChangesView, ExportView, FocusTimeView, ImportView, TaskStatsView, UserView, login_view, register_view, logout_view, user_profile_view
 
 router = DefaultRouter()
 router.register(r'tags', TagViewSet, basename='tag')
@@ -26,6 +27,17 @@ router.register(r'notes', NoteViewSet, basename='note')
 router.register(r'tasks', TaskViewSet, basename='task')
 router.register(r'users', UserView, basename='user')
 
+task_stats_view = TaskStatsView.as_view()
+calendar_view = CalendarView.as_view()
+task_list_urls = []
+
+if settings.ASYNC_DASHBOARD_VIEWS:
+    from api import async_views
+
+    task_stats_view = async_views.task_stats
+    calendar_view = async_views.calendar
+    task_list_urls = [path('api/tasks/', async_views.tasks, name='task-list')]
+
 urlpatterns = [
     path('admin/', admin.site.urls),
     path('api/login/', login_view, name='login'),
@@ -33,7 +45,14 @@ urlpatterns = [
     path('api/register/', register_view, name='register'),
     path('api/token/refresh/', TokenRefreshView.as_view(), name='token_refresh'),
     path('api/profile/', user_profile_view, name='user_profile'),
-    path('api/tasks/stats/', TaskStatsView.as_view(), name='task-stats'),
-    path('api/calendar/', CalendarView.as_view(), name='calendar'),
+    path('api/tasks/stats/', task_stats_view, name='task-stats'),
+    path('api/calendar/', calendar_view, name='calendar'),
+    path('api/batch/', BatchView.as_view(), name='batch'),
+    path('api/changes/', ChangesView.as_view(), name='changes'),
+    path('api/export/', ExportView.as_view(), name='export'),
+    path('api/import/', ImportView.as_view(), name='import'),
+    path('api/import/<int:pk>/', ImportView.as_view(), name='import-detail'),
+    path('api/pomodoro/focus/', FocusTimeView.as_view(), name='pomodoro-focus'),
+    *task_list_urls,
     path('api/', include(router.urls)),
 ]
@@ -0,0 +1,57 @@
+import multiprocessing
+import os
+
+# Production server profile: gunicorn -c gunicorn.conf.py backend.wsgi
+# (or backend.asgi with GUNICORN_WORKER_CLASS=uvicorn.workers.UvicornWorker).
+
+bind = os.getenv("GUNICORN_BIND", "127.0.0.1:8000")
+workers = int(os.getenv("GUNICORN_WORKERS", multiprocessing.cpu_count() * 2 + 1))
+worker_class = os.getenv("GUNICORN_WORKER_CLASS", "sync")
+threads = int(os.getenv("GUNICORN_THREADS", "1"))
+timeout = int(os.getenv("GUNICORN_TIMEOUT", "30"))
+graceful_timeout = 30
+keepalive = 5
+
+# Recycle workers now and then so slow leaks can't build up; the jitter keeps
+# them from restarting all at once.
+max_requests = int(os.getenv("GUNICORN_MAX_REQUESTS", "2000"))
+max_requests_jitter = 200
+
+# Django is imported and warmed once in the master, and workers share the
+# loaded code copy-on-write instead of each paying for it on the first request.
+preload_app = True
+
+accesslog = os.getenv("GUNICORN_ACCESS_LOG", "-")
+errorlog = "-"
+
+def serves_asgi(server):
+    worker = server.cfg.worker_class_str.lower()
+    return worker == "asgi" or "uvicorn" in worker
+
+def on_starting(server):
+    # /api/events/ is only served under ASGI, so WSGI workers never hold a
+    # stream an in-process broker could miss.
+    if not serves_asgi(server):
+        return
+    from api.events import check_broker
+
+    check_broker(server.cfg.workers)
+
+def when_ready(server):
+    from api.warmup import release_connections, warm_up
+
+    try:
+        warm_up()
+    except Exception:
+        server.log.exception("Warm-up failed")
+    finally:
+        release_connections()
+
+def post_worker_init(worker):
+    # Open the worker's own connection (or pool) before it accepts requests.
+    from api.warmup import warm_connections
+
+    try:
+        warm_connections()
+    except Exception:
+        worker.log.exception("Could not open database connections")
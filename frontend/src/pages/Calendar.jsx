@@ -295,7 +295,7 @@ const Calendar = () => {
                       {note.name}
                     </div>
                     <div className="text-sm mt-1 line-clamp-3" style={{color: 'var(--text-light)'}}>
-                      {note.notes}
+                      {note.excerpt}
                     </div>
                     <div className="text-xs mt-2" style={{color: 'var(--text-gray)'}}>
                       Created: {new Date(note.created_at).toLocaleTimeString('en-US', { 
@@ -34,10 +34,16 @@ const Notes = () => {
     setIsNoteModalOpen(true);
   };
 
-  const handleEditNote = (note) => {
-    setModalMode('edit');
-    setSelectedNote(note);
-    setIsNoteModalOpen(true);
+  const handleEditNote = async (note) => {
+    // The list only carries an excerpt, so load the full body for the editor.
+    try {
+      const response = await api.get(`/api/notes/${note.id}/`);
+      setModalMode('edit');
+      setSelectedNote(response.data);
+      setIsNoteModalOpen(true);
+    } catch (error) {
+      console.error('Error fetching note:', error);
+    }
   };
 
   const handleDeleteNote = (note) => {
@@ -164,7 +170,7 @@ const Notes = () => {
                 
                 <div className="mb-4">
                   <p className="body leading-relaxed line-clamp-6 whitespace-pre-wrap" style={{color: 'var(--text-light)'}}>
-                    {note.notes}
+                    {note.excerpt}
                   </p>
                 </div>
                 
@@ -191,7 +197,7 @@ const Notes = () => {
                 
                 <div className="flex items-center justify-between caption pt-3" style={{borderTop: '1px solid var(--border)'}}>
                   <span>{new Date(note.created_at).toLocaleDateString()}</span>
-                  <span>{note.notes.length} chars</span>
+                  <span>{note.body_length} chars</span>
                 </div>
               </div>
             ))}